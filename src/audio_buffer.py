@@ -0,0 +1,270 @@
+"""
+audio_buffer.py
+
+NumPy (float32) による合成音声の後処理
+
+音量調整・前後の無音追加・リサンプリング・形式変換を、あらかじめ確保した
+1つのバッファ上で行う。pydub / ffmpeg はMP3のエンコードにだけ使う。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from collections import namedtuple
+import io
+import wave
+
+import numpy as np
+
+
+class Waveform(namedtuple('Waveform', ['samples', 'sample_rate'])):
+    """
+    float32のモノラル波形
+
+    Coqui TTSの出力をファイルやWAVエンコードを介さずに後処理へ渡すために使う。
+    """
+
+    __slots__ = ()
+
+    def peak_gain(self):
+        """Coqui TTSのsave_wavと同じピーク正規化の倍率"""
+        samples = np.asarray(self.samples, dtype=np.float32)
+        return 1.0 / max(0.01, float(np.max(np.abs(samples)))) if samples.size else 1.0
+
+    def to_pcm16(self):
+        """
+        16bit PCMに変換 (ピークで正規化する)
+
+        Returns:
+            numpy.ndarray: int16の波形
+        """
+        samples = np.asarray(self.samples, dtype=np.float32)
+        return (samples * (32767 * self.peak_gain())).astype('<i2')
+
+    def to_wav_bytes(self):
+        """
+        WAVデータに変換 (キャッシュ保存用)
+
+        Returns:
+            bytes: WAVデータ
+        """
+        return encode_wav(self.to_pcm16(), self.sample_rate, 1)
+
+
+def concat_waveforms(waves, gap=0.0):
+    """
+    Waveformを間に無音を挟んでつなぐ (出力バッファは1回だけ確保する)
+
+    Args:
+        waves: 同じサンプリングレートのWaveformのリスト
+        gap: 間に入れる無音 (秒)
+
+    Returns:
+        Waveform: 連結した波形
+    """
+    sample_rate = waves[0].sample_rate
+    arrays = [np.asarray(w.samples, dtype=np.float32).ravel() for w in waves]
+    gap_frames = int(round(max(gap, 0) * sample_rate))
+
+    total = sum(a.size for a in arrays) + gap_frames * (len(arrays) - 1)
+    samples = np.zeros(total, dtype=np.float32)
+    pos = 0
+    for a in arrays:
+        samples[pos:pos + a.size] = a
+        pos += a.size + gap_frames
+    return Waveform(samples, sample_rate)
+
+
+def concat_wav_bytes(wavs):
+    """
+    同じ形式のWAVデータをつなぐ (デコード・再エンコードせずにフレームをそのまま連結)
+
+    Args:
+        wavs: チャンネル数・サンプル幅・サンプリングレートが同じWAVデータのリスト
+
+    Returns:
+        bytes: 連結したWAVデータ
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as out:
+        for i, wav_bytes in enumerate(wavs):
+            with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+                if i == 0:
+                    out.setparams(w.getparams())
+                out.writeframes(w.readframes(w.getnframes()))
+    return buffer.getvalue()
+
+
+def encode_wav(pcm16, sample_rate, channels):
+    """
+    16bit PCMをWAVデータに変換
+
+    Args:
+        pcm16: int16の波形 (インターリーブ済み)
+        sample_rate: サンプリングレート
+        channels: チャンネル数
+
+    Returns:
+        bytes: WAVデータ
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(np.ascontiguousarray(pcm16, dtype='<i2').tobytes())
+    return buffer.getvalue()
+
+
+def decode_wav(wav_bytes):
+    """
+    WAVデータを整数PCMの配列に変換 (コピーせずにバイト列を参照する)
+
+    Args:
+        wav_bytes: WAVデータ (8/16/24/32bit PCM)
+
+    Returns:
+        tuple: (PCM配列 (フレーム数, チャンネル数), サンプリングレート, フルスケール値)
+    """
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        sample_rate = w.getframerate()
+        frames = w.readframes(w.getnframes())
+
+    if width == 1:
+        # 8bitは符号なし
+        pcm = np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128
+    elif width == 2:
+        pcm = np.frombuffer(frames, dtype='<i2')
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        pcm = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+               | (raw[:, 2].astype(np.int8).astype(np.int32) << 16))
+    elif width == 4:
+        pcm = np.frombuffer(frames, dtype='<i4')
+    else:
+        raise ValueError(f"未対応のWAV形式です (sample width: {width})")
+
+    full_scale = float(1 << (8 * width - 1))
+    return pcm.reshape(-1, channels), sample_rate, full_scale
+
+
+def _resample(samples, source_rate, target_rate):
+    """線形補間でリサンプリング (samples: (フレーム数, チャンネル数))"""
+    frames = samples.shape[0]
+    new_frames = int(round(frames * target_rate / source_rate))
+    positions = np.arange(new_frames, dtype=np.float64) * (source_rate / target_rate)
+    source_index = np.arange(frames, dtype=np.float64)
+    return np.stack(
+        [np.interp(positions, source_index, samples[:, ch]) for ch in range(samples.shape[1])],
+        axis=1
+    )
+
+
+class AudioBuffer:
+    """
+    後処理済みの音声 (float32, 形状は (フレーム数, チャンネル数))
+
+    from_sourceで前後の無音込みのバッファを1回だけ確保し、
+    PCM→float変換と音量調整を同じパスでその中に書き込む。
+    """
+
+    MP3_BITRATE = "192k"
+
+    def __init__(self, samples, sample_rate):
+        """
+        初期化
+
+        Args:
+            samples: float32の配列 (フレーム数, チャンネル数)
+            sample_rate: サンプリングレート
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_source(cls, wav, volume=1.0, pre=0.0, post=0.0, sample_rate=None, normalize=True):
+        """
+        合成結果から後処理済みのバッファを作成
+
+        Args:
+            wav: WAVデータ (bytes) またはWaveform
+            volume: 音量倍率
+            pre: 前の無音 (秒)
+            post: 後の無音 (秒)
+            sample_rate: 出力のサンプリングレート (Noneなら元のまま)
+            normalize: Waveformをピークで正規化するか
+                       (ストリーミングでは全体のピークが分からないためFalse)
+
+        Returns:
+            AudioBuffer: 処理済み音声
+        """
+        if isinstance(wav, Waveform):
+            source = np.asarray(wav.samples, dtype=np.float32).reshape(-1, 1)
+            source_rate = wav.sample_rate
+            scale = wav.peak_gain() if normalize else 1.0
+        else:
+            source, source_rate, full_scale = decode_wav(wav)
+            scale = 1.0 / full_scale
+
+        if volume > 0:
+            scale *= volume
+
+        if sample_rate and sample_rate != source_rate:
+            source = _resample(source, source_rate, sample_rate)
+        rate = sample_rate or source_rate
+
+        pre_frames = int(round(max(pre, 0) * rate))
+        post_frames = int(round(max(post, 0) * rate))
+        frames, channels = source.shape
+
+        samples = np.zeros((pre_frames + frames + post_frames, channels), dtype=np.float32)
+        body = samples[pre_frames:pre_frames + frames]
+        np.multiply(source, scale, out=body, casting='unsafe')
+        return cls(samples, rate)
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def duration_seconds(self):
+        return self.samples.shape[0] / self.sample_rate
+
+    def to_pcm16(self):
+        """
+        16bit PCMに変換 (範囲外はクリップ)
+
+        Returns:
+            numpy.ndarray: int16の配列 (フレーム数, チャンネル数)
+        """
+        pcm = np.empty(self.samples.shape, dtype='<i2')
+        scaled = np.multiply(self.samples, 32768.0)
+        np.rint(scaled, out=scaled)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        np.copyto(pcm, scaled, casting='unsafe')
+        return pcm
+
+    def to_wav_bytes(self):
+        """WAVデータ (16bit PCM) に変換"""
+        return encode_wav(self.to_pcm16(), self.sample_rate, self.channels)
+
+    def export(self, path, format="wav", bitrate=None):
+        """
+        ファイルに保存
+
+        Args:
+            path: 保存先パス
+            format: 'wav' または 'mp3'
+            bitrate: MP3のビットレート (省略時は192k)
+        """
+        if format == "mp3":
+            # MP3のエンコードだけpydub (ffmpeg) に任せる
+            from pydub import AudioSegment
+            segment = AudioSegment(data=self.to_pcm16().tobytes(), sample_width=2,
+                                   frame_rate=self.sample_rate, channels=self.channels)
+            segment.export(path, format="mp3", bitrate=bitrate or self.MP3_BITRATE)
+        else:
+            with open(path, 'wb') as f:
+                f.write(self.to_wav_bytes())
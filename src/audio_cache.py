@@ -0,0 +1,110 @@
+"""
+audio_cache.py
+
+合成済み音声のキャッシュ
+
+エンジン・話者・テキスト・音声パラメータのハッシュをキーに、
+エンジンが返したWAVデータをディスクに保存する。
+テンプレートや定型の挨拶など、同じ文を同じ設定で繰り返し合成する場合に
+VOICEVOX / Coqui TTSを呼び出さずに再利用する。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+import hashlib
+import json
+
+from disk_lru import DiskLRU
+
+
+class AudioCache:
+    """
+    合成音声のコンテンツアドレス型キャッシュ
+
+    合計サイズが上限を超えたら、最終利用が古いものから削除する (LRU)。
+    """
+
+    DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # 500MB
+
+    def __init__(self, cache_dir, max_bytes=None):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュ保存先フォルダ (例: user_data/audio_cache)
+            max_bytes: キャッシュの合計サイズ上限 (バイト)
+        """
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        self.store = DiskLRU(cache_dir, '.wav', max_bytes=self.max_bytes, name='AudioCache')
+
+    @staticmethod
+    def make_key(text, **params):
+        """
+        キャッシュキーを作成
+
+        Args:
+            text: 合成するテキスト
+            **params: エンジン・話者・話速など合成結果に影響するパラメータ
+
+        Returns:
+            str: SHA-256のキー
+        """
+        raw = json.dumps({'text': text, 'params': params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        キャッシュを取得
+
+        Args:
+            key: make_keyで作成したキー
+
+        Returns:
+            bytes: WAVデータ (無ければNone)
+        """
+        return self.store.get(key)
+
+    def put(self, key, wav_bytes):
+        """
+        キャッシュを保存
+
+        Args:
+            key: make_keyで作成したキー
+            wav_bytes: WAVデータ
+        """
+        self.store.put(key, wav_bytes)
+
+    def cached(self, synthesize, **params):
+        """
+        合成関数をキャッシュ付きにする
+
+        Args:
+            synthesize: 合成関数 synthesize(text) -> bytes または Waveform
+            **params: make_keyに渡すパラメータ
+
+        Returns:
+            function: text -> bytes または Waveform (キャッシュにあればエンジンを呼ばない)
+        """
+        def cached_synthesize(text):
+            key = self.make_key(text, **params)
+            wav = self.get(key)
+            if wav is None:
+                wav = synthesize(text)
+                # Waveform (Coqui TTS) はキャッシュ保存時だけWAVに変換する
+                self.put(key, wav.to_wav_bytes() if hasattr(wav, 'to_wav_bytes') else wav)
+            return wav
+        return cached_synthesize
+
+    def clear(self):
+        """キャッシュを全削除"""
+        self.store.clear()
+
+    def stats(self):
+        """
+        キャッシュの統計を取得
+
+        Returns:
+            dict: ヒット数・ミス数・エントリ数・合計サイズ・上限
+        """
+        return dict(self.store.stats(), max_bytes=self.max_bytes)
@@ -0,0 +1,204 @@
+"""
+audio_recorder.py
+
+マイク録音 (リングバッファ + ディスクへの逐次書き込み)
+
+録音コールバックは事前確保したリングバッファにコピーするだけにし、
+書き込みスレッドがそれを取り出してsoundfile.SoundFileへ順次保存する。
+録音時間に関係なくメモリ使用量は一定で、停止時の結合処理も不要。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    単一生産者・単一消費者のリングバッファ (ロックなし)
+
+    書き込み位置は生産者だけ、読み込み位置は消費者だけが更新するため、
+    録音コールバック (生産者) と書き込みスレッド (消費者) の間でロックが要らない。
+    """
+
+    def __init__(self, capacity, channels, dtype='float32'):
+        """
+        初期化
+
+        Args:
+            capacity: 保持できるフレーム数
+            channels: チャンネル数
+            dtype: サンプルの型
+        """
+        self.capacity = capacity
+        self._buffer = np.zeros((capacity, channels), dtype=dtype)
+        self._written = 0  # 書き込んだ総フレーム数 (生産者のみ更新)
+        self._read = 0     # 読み込んだ総フレーム数 (消費者のみ更新)
+        self.dropped = 0   # 書き込みが追いつかずに捨てたフレーム数
+
+    @property
+    def available(self):
+        """読み込み可能なフレーム数"""
+        return self._written - self._read
+
+    def write(self, data):
+        """
+        フレームを追加 (生産者側、録音コールバックから呼ぶ)
+
+        空きが足りない分は捨ててdroppedに数える。
+
+        Args:
+            data: (フレーム数, チャンネル数) の配列
+        """
+        frames = min(len(data), self.capacity - self.available)
+        self.dropped += len(data) - frames
+        if frames <= 0:
+            return
+
+        start = self._written % self.capacity
+        first = min(frames, self.capacity - start)
+        self._buffer[start:start + first] = data[:first]
+        self._buffer[:frames - first] = data[first:frames]
+        # コピーが終わってから公開する
+        self._written += frames
+
+    def read(self, max_frames=None):
+        """
+        フレームを取り出す (消費者側)
+
+        Args:
+            max_frames: 最大フレーム数 (Noneなら全部)
+
+        Returns:
+            numpy.ndarray: 取り出したフレームのコピー (無ければ長さ0)
+        """
+        frames = self.available
+        if max_frames is not None:
+            frames = min(frames, max_frames)
+
+        start = self._read % self.capacity
+        first = min(frames, self.capacity - start)
+        data = np.concatenate((self._buffer[start:start + first], self._buffer[:frames - first]))
+        self._read += frames
+        return data
+
+
+class AudioRecorder:
+    """
+    マイクからWAVファイルへ直接録音するレコーダー
+
+    chunk_callbackを渡すと、書き込みスレッドから録音済みのチャンクを受け取れる
+    (リアルタイム文字起こしなどに使う)。
+    """
+
+    def __init__(self, path, samplerate=16000, channels=1, buffer_seconds=30,
+                 subtype='PCM_16', chunk_callback=None):
+        """
+        初期化
+
+        Args:
+            path: 保存先のWAVファイル
+            samplerate: サンプリングレート (Whisperの推奨は16kHz)
+            channels: チャンネル数
+            buffer_seconds: リングバッファの長さ (秒)
+            subtype: soundfileの保存形式
+            chunk_callback: 録音チャンクを受け取る関数 callback(numpy.ndarray)
+        """
+        self.path = path
+        self.samplerate = samplerate
+        self.channels = channels
+        self.subtype = subtype
+        self.chunk_callback = chunk_callback
+        self.frames_written = 0
+        self.status_errors = 0
+
+        self._ring = RingBuffer(int(samplerate * buffer_seconds), channels)
+        self._stop_event = threading.Event()
+        self._file = None
+        self._stream = None
+        self._writer = None
+
+    @property
+    def duration_seconds(self):
+        """保存済みの録音時間 (秒)"""
+        return self.frames_written / self.samplerate
+
+    @property
+    def dropped_frames(self):
+        """バッファあふれで失われたフレーム数"""
+        return self._ring.dropped
+
+    def start(self):
+        """録音開始 (ファイルを開き、書き込みスレッドと入力ストリームを開始)"""
+        import sounddevice as sd
+        import soundfile as sf
+
+        self._file = sf.SoundFile(self.path, mode='w', samplerate=self.samplerate,
+                                  channels=self.channels, subtype=self.subtype)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+        try:
+            self._stream = sd.InputStream(
+                samplerate=self.samplerate,
+                channels=self.channels,
+                dtype='float32',
+                callback=self._callback
+            )
+            self._stream.start()
+        except Exception:
+            self._stop_event.set()
+            self._writer.join()
+            self._file.close()
+            raise
+
+    def _callback(self, indata, frames, time_info, status):
+        """録音コールバック (オーディオスレッド、リングバッファへのコピーのみ)"""
+        if status:
+            self.status_errors += 1
+        self._ring.write(indata)
+
+    def _writer_loop(self):
+        """リングバッファからファイルへ書き出す (停止後は残りを書き切って終了)"""
+        while True:
+            stopping = self._stop_event.is_set()
+            if self._ring.available:
+                data = self._ring.read()
+                self._file.write(data)
+                self.frames_written += len(data)
+                if self.chunk_callback:
+                    try:
+                        self.chunk_callback(data)
+                    except Exception as e:
+                        print(f"[AudioRecorder] chunk_callback failed: {e}")
+            elif stopping:
+                break
+            else:
+                self._stop_event.wait(0.05)
+
+    def stop(self):
+        """
+        録音停止 (バッファの残りを書き出してファイルを閉じる)
+
+        Returns:
+            int: 保存したフレーム数
+        """
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+        self._stop_event.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if self.dropped_frames:
+            print(f"[AudioRecorder] {self.dropped_frames} frames dropped (buffer overrun)")
+        return self.frames_written
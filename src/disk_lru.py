@@ -0,0 +1,145 @@
+"""
+disk_lru.py
+
+ディスク上のLRUキャッシュ (各キャッシュ共通の保存・削除処理)
+
+1エントリ1ファイル (<キー><拡張子>) で保存し、読み込み時に更新時刻を
+最終利用時刻として更新する。合計サイズまたは件数が上限を超えたら
+最終利用が古いものから削除する。キーの作り方とデータの変換は
+利用側 (AudioCache / TranscriptionCache / AudioQueryCache) が受け持つ。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from pathlib import Path
+import os
+import threading
+
+
+class DiskLRU:
+    """1エントリ1ファイルのディスクLRU (スレッド間で共有可能)"""
+
+    def __init__(self, cache_dir, suffix, max_bytes=None, max_entries=None, name='DiskLRU'):
+        """
+        初期化
+
+        Args:
+            cache_dir: 保存先フォルダ
+            suffix: エントリファイルの拡張子 (例: '.wav', '.json')
+            max_bytes: 合計サイズの上限 (バイト、Noneなら制限なし)
+            max_entries: 件数の上限 (Noneなら制限なし)
+            name: ログに表示する名前
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, decode=None):
+        """
+        エントリを読み込む
+
+        Args:
+            key: キャッシュキー
+            decode: bytesを変換する関数 (変換に失敗したエントリはミス扱い)
+
+        Returns:
+            bytes または decodeの戻り値 (無ければNone)
+        """
+        entry_path = self._path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+            if decode is not None:
+                data = decode(data)
+            os.utime(entry_path)  # 最終利用時刻を更新 (LRU)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        エントリを保存 (一時ファイルに書いてから置き換える)
+
+        Args:
+            key: キャッシュキー
+            data: 保存するbytes
+
+        Returns:
+            bool: 保存できたか
+        """
+        entry_path = self._path(key)
+        temp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"[{self.name}] Save failed: {e}")
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """合計サイズ・件数が上限を超えていれば最終利用が古い順に削除"""
+        with self._lock:
+            entries = [(mtime, size, entry_path) for _, size, mtime, entry_path in self._entries()]
+            total = sum(size for _, size, _ in entries)
+            count = len(entries)
+            for _, size, entry_path in sorted(entries):
+                if (self.max_bytes is None or total <= self.max_bytes) and \
+                   (self.max_entries is None or count <= self.max_entries):
+                    break
+                try:
+                    entry_path.unlink()
+                    total -= size
+                    count -= 1
+                except OSError:
+                    pass
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            for entry_path in self.cache_dir.glob(f"*{self.suffix}"):
+                try:
+                    entry_path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        統計を取得
+
+        Returns:
+            dict: ヒット数・ミス数・エントリ数・合計サイズ
+        """
+        entries = list(self._entries())
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _, _ in entries)
+        }
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def _entries(self):
+        """(キー, サイズ, 更新時刻, パス) を列挙 (途中で消えたファイルは飛ばす)"""
+        for entry_path in self.cache_dir.glob(f"*{self.suffix}"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            yield entry_path.stem, stat.st_size, stat.st_mtime, entry_path
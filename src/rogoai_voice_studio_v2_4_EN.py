@@ -14,7 +14,7 @@ Features:
    - Text/SRT subtitle output formats
    - Transfer function to Voice Generation Tab
 ★8. Preset Management: Save/Load frequently used settings (v2.2)
-★9. Voice Preview: Generate only the first 30 chars for testing (v2.2)
+★9. Voice Preview: Streams the text and starts playing as soon as the first chunk is ready
 ★10. Batch Processing: Process multiple files at once (v2.2)
 ★11. Text History: Save last 10 entries (v2.2)
 ★12. Template Function: Save/Load standard phrases (v2.2)
@@ -31,23 +31,34 @@ try:
 except ImportError:
     pass
 
+import sys
+from startup_profiler import startup_timeline, start_profiler, STARTUP_TRACE_TIMEOUT_MS
+
+# Startup timeline (each phase is written to user_data/logs/startup_*.json)
+# --profile-startup also profiles the main-thread startup with pyinstrument / cProfile
+startup_profile = start_profiler() if '--profile-startup' in sys.argv else None
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-import requests
 import json
 import os
-import sys
 from pathlib import Path
-import urllib.parse
 import subprocess
 import platform
 from datetime import datetime
-from pydub import AudioSegment
-import io
 import threading
 import traceback
 import time
 
+import tts_engine
+from voicevox_client import VoicevoxClient, AudioQueryCache
+from audio_cache import AudioCache
+from stream_player import StreamPlayer
+from audio_recorder import AudioRecorder
+from sample_downloader import SampleDownloader
+from synthesis_service import SynthesisService, SynthesisRequest
+from warmup_scheduler import WarmupScheduler, record_usage, predict_engines
+
 # Recording Functionality (Added in v2.3)
 try:
     import sounddevice as sd
@@ -62,7 +73,6 @@ except ImportError:
 # EXE Support: Patch for 'could not get source code' error
 # ==========================================
 import inspect
-import sys
 
 if getattr(sys, 'frozen', False):
     def _safe_getsource(object):
@@ -72,61 +82,38 @@ if getattr(sys, 'frozen', False):
 
 
 # ==========================================
-# PyTorch Compatibility Patch
+# Heavy libraries are imported on first use
+# (torch / TTS with the first Coqui load, faster-whisper with the first STT model;
+#  tts_engine applies the torch.load compatibility patch at that point)
 # ==========================================
-import torch
-_original_load = torch.load
-def _patched_load(*args, **kwargs):
-    if 'weights_only' not in kwargs:
-        kwargs['weights_only'] = False
-    return _original_load(*args, **kwargs)
-torch.load = _patched_load
+from runtime_probe import is_installed, probe_cuda
+
 # Whisper Speech Recognition (Added in v2.1)
 try:
-    from whisper_engine import WhisperEngine
-    WHISPER_AVAILABLE = True
+    from whisper_engine import WhisperEngine, TranscriptionCache, RTFHistory, get_model_pool, format_duration
+    WHISPER_AVAILABLE = is_installed('faster_whisper')
 except ImportError:
     WHISPER_AVAILABLE = False
-    print("⚠️ Warning: whisper_engine.py not found. Whisper function disabled.")
+if not WHISPER_AVAILABLE:
+    print("⚠️ Warning: faster-whisper not found. Whisper function disabled.")
 
-
-CUDA_AVAILABLE = torch.cuda.is_available()
-CUDA_DEVICE = torch.cuda.get_device_name(0) if CUDA_AVAILABLE else "CPU"
+# Cheap CUDA check through the driver (does not load torch)
+CUDA_AVAILABLE, CUDA_DEVICE = probe_cuda()
+CUDA_DEVICE = CUDA_DEVICE or ("GPU" if CUDA_AVAILABLE else "CPU")
+startup_timeline.mark('module_imports_done')
 # ==========================================
 
-# ==========================================
-# EXE Support: Resource Path Helper
-# ==========================================
-def resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller"""
-    if hasattr(sys, '_MEIPASS'):
-        return Path(sys._MEIPASS) / relative_path
-    return Path(__file__).parent / relative_path
-
-
-
-def setup_ffmpeg():
-    ffmpeg_exe = resource_path("ffmpeg/ffmpeg.exe")
-    ffprobe_exe = resource_path("ffmpeg/ffprobe.exe")
-    
-    if ffmpeg_exe.exists():
-        AudioSegment.converter = str(ffmpeg_exe)
-        AudioSegment.ffmpeg = str(ffmpeg_exe)
-        AudioSegment.ffprobe = str(ffprobe_exe)
-        print(f"Local FFmpeg loaded: {ffmpeg_exe}")
-    else:
-        print("Local FFmpeg not found. Using system default.")
-
 class VoicevoxCoquiGUI:
     def __init__(self, root):
-        setup_ffmpeg()
+        with startup_timeline.phase('setup_ffmpeg'):
+            tts_engine.setup_ffmpeg()
         
         self.root = root
         gpu_status = f"GPU: {CUDA_DEVICE}" if CUDA_AVAILABLE else "CPU Mode"
         self.root.title(f"🎙️ ROGOAI Voice Studio v2.4 EN - {gpu_status}")
 
         try:
-            icon_path = resource_path("make_icon/icon.ico")
+            icon_path = tts_engine.resource_path("make_icon/icon.ico")
             if icon_path.exists():
                 self.root.iconbitmap(str(icon_path))
         except:
@@ -134,15 +121,23 @@ class VoicevoxCoquiGUI:
         
         self.root.geometry("850x920") 
         
-        self.app_data = self.get_app_data_path()
-        self.voicevox_server_url = "http://127.0.0.1:50021"
+        with startup_timeline.phase('get_app_data_path'):
+            self.app_data = self.get_app_data_path()
+        self.voicevox_server_url = VoicevoxClient.DEFAULT_URL
         
         self.coqui_enabled = False
         self.coqui_model = None
+        self.coqui_loading = False
+        # Background warm-up of engines predicted from recent usage
+        self.warmup = None
         self.samples_dir = self.app_data / "samples"
         self.samples_dir.mkdir(parents=True, exist_ok=True)
+        # XTTS speaker latents, cached per sample file
+        self.coqui_latent_cache = tts_engine.SpeakerLatentCache(self.samples_dir / ".latents")
         
         self.generation_stop_flag = False
+        # Streaming preview (None when not playing)
+        self.preview_player = None
         self.config_file = self.app_data / "config.json"
         
         # Whisper Engine
@@ -154,16 +149,16 @@ class VoicevoxCoquiGUI:
         # Recording (v2.3)
         self.audio_input_method_var = tk.StringVar(value='file')  # 'file' or 'mic'
         self.is_recording = False
-        self.recording_data = []
+        self.recorder = None
         self.recording_start_time = None
-        self.recording_stream = None
         self.recording_timer_id = None
         self.recordings_dir = self.app_data / 'recordings'
         self.recordings_dir.mkdir(exist_ok=True)
         self.recording_output_dir_var = tk.StringVar(value=str(self.recordings_dir))
         
         self.selected_audio_file = None
-        self.load_config()
+        with startup_timeline.phase('load_config'):
+            self.load_config()
         
         # v2.2 New Features
         self.presets = self.config.get('presets', {})
@@ -176,8 +171,58 @@ class VoicevoxCoquiGUI:
         # v2.3 Message settings
         self.show_recording_complete_message = self.config.get('show_recording_complete_message', True)
         
+        # Live transcription while recording
+        self.live_transcription_var = tk.BooleanVar(value=self.config.get('live_transcription', True))
+        self.live_transcriber = None
+        self.live_pending = None  # chunks recorded while the Whisper engine is still loading
+        self.live_lock = threading.Lock()
+        
+        # Whisper decoding profile (fast / balanced / accurate)
+        self.whisper_profile_var = tk.StringVar(value=self.config.get('whisper_profile', 'balanced'))
+        # Whisper model (also the one warmed up at startup)
+        self.whisper_model_var.set(self.config.get('whisper_model', 'base'))
+        
+        # Whisper model pool memory budget (MB)
+        if WHISPER_AVAILABLE and self.config.get('whisper_memory_budget_mb'):
+            get_model_pool().set_memory_budget(self.config['whisper_memory_budget_mb'])
+        
+        # Transcription cache (reused across txt/SRT exports of the same audio)
+        self.transcription_cache = None
+        self.whisper_rtf_history = None
+        if WHISPER_AVAILABLE:
+            self.transcription_cache = TranscriptionCache(
+                self.app_data / 'transcription_cache',
+                max_bytes=self.config.get('transcription_cache_mb', 200) * 1024 * 1024
+            )
+            self.whisper_rtf_history = RTFHistory(self.app_data / 'whisper_rtf_history.json')
+        
+        # VOICEVOX client (audio_query is cached so slider tweaks skip accent analysis)
+        self.voicevox_client = VoicevoxClient(
+            self.voicevox_server_url,
+            pool_size=max(8, self.config.get('voicevox_max_in_flight', 4)),
+            query_cache=AudioQueryCache(
+                self.app_data / 'audio_query_cache',
+                max_entries=self.config.get('audio_query_cache_entries', 512)
+            )
+        )
+        
+        # Synthesized audio cache (templates/intros are reused instead of re-synthesized)
+        self.audio_cache = AudioCache(
+            self.app_data / 'audio_cache',
+            max_bytes=self.config.get('audio_cache_mb', 500) * 1024 * 1024
+        )
+        
+        # Synthesis service: workers get an immutable SynthesisRequest and never read Tk variables
+        self.synthesis_service = SynthesisService(
+            voicevox_client=self.voicevox_client,
+            latent_cache=self.coqui_latent_cache,
+            audio_cache=self.audio_cache,
+            voicevox_max_in_flight=self.config.get('voicevox_max_in_flight', 4)
+        )
+        
         self.voicevox_speakers = []
-        self.build_gui()
+        with startup_timeline.phase('build_gui'):
+            self.build_gui()
         self.initialize_app_async()
         
         # v2.2 Create Default Preset
@@ -214,53 +259,147 @@ class VoicevoxCoquiGUI:
     def initialize_app_async(self):
         def _init():
             try:
-                self.download_sample_voices()
-                time.sleep(1.0)
-                
-                default_wav = self.samples_dir / "de_female_official.wav"
-                if not default_wav.exists() or default_wav.stat().st_size == 0:
-                    self._download_file("de_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/de_sample.wav")
-                    time.sleep(1.0)
+                with startup_timeline.phase('download_sample_voices'):
+                    self.download_sample_voices()
 
                 self.root.after(0, self.refresh_coqui_speakers)
-                self.initialize_coqui()
                 
-                self.check_voicevox_connection()
+                with startup_timeline.phase('check_voicevox_connection'):
+                    self.check_voicevox_connection()
                 self.root.after(0, self.refresh_voicevox_speakers)
+                self.root.after(0, self.start_warmup)
                 
             except Exception as e:
+                self._finish_startup_timeline()
                 print(f"Init Error: {e}")
                 self.root.after(0, lambda: messagebox.showerror("Startup Error", f"Error during initialization:\n{e}"))
 
         threading.Thread(target=_init, daemon=True).start()
 
+    def _finish_startup_timeline(self):
+        # Written once the warm-up is done (or has run for STARTUP_TRACE_TIMEOUT_MS)
+        startup_timeline.finish(self.app_data / 'logs')
+
     def download_sample_voices(self):
-        targets = [
-            ("de_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/de_sample.wav"),
-            ("en_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/en_sample.wav"),
-            ("fr_male_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/fr_sample.wav"),
-            ("it_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/it_sample.wav"),
-            ("es_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/es_sample.wav"),
-            ("pt_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/pt_sample.wav"),
-            ("pl_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/pl_sample.wav"),
-            ("zh_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/zh-cn_sample.wav"),
-            ("nl_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/nl_sample.wav"),
-            ("ar_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/ar_sample.wav"),
-            ("ko_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/ko_sample.wav"),
-        ]
-        for fname, url in targets:
-            self._download_file(fname, url)
+        # Missing or corrupt samples are fetched in parallel and checked against the manifest.
+        # For offline sites, set 'sample_mirror_dir' (and optionally 'sample_manifest') in config.json
+        downloader = SampleDownloader(
+            self.samples_dir,
+            manifest=self.config.get('sample_manifest'),
+            mirror_dir=self.config.get('sample_mirror_dir'),
+            max_workers=self.config.get('sample_download_workers'),
+            progress_callback=lambda fname, message: self.root.after(0, lambda: self.status_bar.config(text=message))
+        )
+        results = downloader.run()
+        failed = [fname for fname, status in results.items() if status == 'failed']
+        if failed:
+            self.root.after(0, lambda: self.status_bar.config(
+                text=f"⚠️ Sample voice download failed: {', '.join(failed)}"))
+
+    def start_coqui_init(self):
+        # torch / TTS are loaded only once the Coqui engine is selected or used
+        if self.coqui_model or self.coqui_loading:
+            return
+        if self.engine_var.get() != 'coqui':
+            self.coqui_status_label.config(text="Coqui TTS: Loads when selected", foreground="gray")
+            return
+        self.coqui_loading = True
+        threading.Thread(target=self.initialize_coqui, daemon=True).start()
 
-    def _download_file(self, fname, url):
-        save_path = self.samples_dir / fname
-        if save_path.exists() and save_path.stat().st_size > 0: return
-        try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-            self.root.after(0, lambda m=f"📥 DL: {fname}...": self.status_bar.config(text=m))
-            response = requests.get(url, headers=headers, timeout=30)
-            if response.status_code == 200:
-                with open(save_path, 'wb') as f: f.write(response.content)
-        except: pass
+    def on_engine_selected(self):
+        self.update_ui_state()
+        self.start_coqui_init()
+
+    def record_engine_usage(self, engine):
+        # The usage history decides which engines are warmed up at the next startup
+        record_usage(self.config.setdefault('engine_usage', {}), engine)
+
+    def start_warmup(self):
+        candidates = ['coqui', 'voicevox'] + (['whisper'] if WHISPER_AVAILABLE else [])
+        usage = self.config.get('engine_usage')
+        # Without any history yet, only the selected TTS engine is warmed up
+        plan = predict_engines(usage, candidates) if usage else [self.engine_var.get()]
+        if not self.voicevox_speakers and 'voicevox' in plan:
+            plan.remove('voicevox')  # VOICEVOX is not running
+        if 'coqui' not in plan and not self.coqui_model and not self.coqui_loading:
+            self.coqui_status_label.config(text="Coqui TTS: Loads when used", foreground="gray")
+        if not plan:
+            self._finish_startup_timeline()
+            return
+        
+        self.warmup = WarmupScheduler(
+            progress_callback=lambda name, status: self.root.after(0, lambda: self._on_warmup_progress(name, status)))
+        for engine in plan:
+            if engine == 'coqui':
+                request = self._make_synthesis_request('')
+                self.warmup.add('coqui', lambda cancel: self._warm_up_coqui(cancel, request))
+            elif engine == 'whisper':
+                model_size = self.whisper_model_var.get()
+                profile = self.whisper_profile_var.get()
+                language = self.whisper_language_var.get().split(' - ')[0]
+                self.warmup.add('whisper', lambda cancel: self._warm_up_whisper(cancel, model_size, profile, language))
+            elif engine == 'voicevox':
+                speaker_id = self.get_speaker_id()
+                self.warmup.add('voicevox', lambda cancel: self._warm_up_voicevox(cancel, speaker_id))
+        
+        print(f"[Warmup] Plan: {plan}")
+        self.warmup_cancel_button.config(state='normal')
+        self.warmup_cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.warmup.start()
+        self.root.after(STARTUP_TRACE_TIMEOUT_MS, self._finish_startup_timeline)
+
+    def _warm_up_coqui(self, cancel, request):
+        with startup_timeline.phase('warmup_coqui'):
+            if self.coqui_model or self.coqui_loading:
+                return
+            self.coqui_loading = True
+            with startup_timeline.phase('initialize_coqui'):
+                self.initialize_coqui()
+            if not self.coqui_model:
+                raise Exception("Coqui TTS failed to load")
+            if cancel.is_set() or not request.speaker_wav.is_file():
+                return
+            # One short synthesis also computes and caches the speaker latents
+            self.synthesis_service.warm_up(request)
+
+    def _warm_up_whisper(self, cancel, model_size, profile, language):
+        # Runs on the warm-up thread: the settings were read in start_warmup
+        with startup_timeline.phase('warmup_whisper'):
+            engine = self._new_whisper_engine(model_size, profile)
+            if not engine.load_model():
+                raise Exception("Whisper model failed to load")
+            if not cancel.is_set():
+                engine.warm_up(language)
+        self.root.after(0, lambda: self._adopt_whisper_engine(engine))
+
+    def _adopt_whisper_engine(self, engine):
+        # Keep an engine the user created in the meantime
+        if self.whisper_engine is None:
+            self.whisper_engine = engine
+
+    def _warm_up_voicevox(self, cancel, speaker_id):
+        with startup_timeline.phase('warmup_voicevox'):
+            self.voicevox_client.initialize_speaker(speaker_id)
+
+    def _on_warmup_progress(self, name, status):
+        labels = {'coqui': 'Coqui TTS', 'whisper': 'Whisper', 'voicevox': 'VOICEVOX'}
+        if status == 'loading':
+            self.status_bar.config(text=f"🔥 Warming up {labels[name]}...")
+        elif status == 'done':
+            self.warmup_cancel_button.pack_forget()
+            self._finish_startup_timeline()
+            ready = [labels[n] for n, s in self.warmup.results.items() if s == 'ready']
+            if self.warmup.cancelled:
+                self.status_bar.config(text="⏹️ Warm-up cancelled")
+            elif ready:
+                self.status_bar.config(text=f"✓ Ready: {', '.join(ready)}")
+            self.warmup = None
+
+    def cancel_warmup(self):
+        if self.warmup:
+            self.warmup.cancel()
+            self.warmup_cancel_button.config(state='disabled')
+            self.status_bar.config(text="⏹️ Cancelling warm-up (after the current step)...")
 
     def initialize_coqui(self):
         if self.coqui_model: return
@@ -268,9 +407,8 @@ class VoicevoxCoquiGUI:
             self.root.after(0, lambda: self.coqui_status_label.config(text="Coqui TTS: Initializing...", foreground="orange"))
             self.root.after(0, lambda: self.status_bar.config(text="🚀 Loading AI Engine (Please wait)..."))
             
-            from TTS.api import TTS
-            self.coqui_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-            if CUDA_AVAILABLE: self.coqui_model.to("cuda")
+            self.coqui_model = tts_engine.load_coqui_model()
+            self.synthesis_service.coqui_model = self.coqui_model
             self.coqui_enabled = True
             
             self.root.after(0, lambda: self.coqui_status_label.config(text="Coqui TTS: Ready", foreground="green"))
@@ -281,6 +419,8 @@ class VoicevoxCoquiGUI:
             err_msg = str(e)
             print(f"Coqui Init Error: {err_msg}")
             self.root.after(0, lambda: messagebox.showerror("Engine Error", f"Failed to start Coqui TTS.\n\nError:\n{err_msg}"))
+        finally:
+            self.coqui_loading = False
 
     def build_gui(self):
         self.notebook = ttk.Notebook(self.root)
@@ -312,6 +452,8 @@ class VoicevoxCoquiGUI:
         self.voicevox_status_label = ttk.Label(status_frame, text="VOICEVOX: Checking...")
         self.voicevox_status_label.pack(side=tk.LEFT, padx=10)
         
+        # Shown only while a warm-up is running
+        self.warmup_cancel_button = ttk.Button(status_frame, text="⏹ Cancel Warm-up", command=self.cancel_warmup)
         ttk.Button(status_frame, text="🔄 Reconnect", command=self.reconnect_voicevox_async, width=12).pack(side=tk.LEFT, padx=5)
         ttk.Label(status_frame, text="* Start VOICEVOX app to reconnect", font=("", 8), foreground="gray").pack(side=tk.LEFT, padx=5)
         
@@ -322,8 +464,8 @@ class VoicevoxCoquiGUI:
         default_engine = self.config.get('engine', 'coqui') 
         self.engine_var = tk.StringVar(value=default_engine)
         
-        ttk.Radiobutton(engine_frame, text="Coqui TTS XTTS (File Clone)", variable=self.engine_var, value="coqui", command=self.update_ui_state).pack(side=tk.LEFT, padx=15)
-        ttk.Radiobutton(engine_frame, text="VOICEVOX (Preset Char)", variable=self.engine_var, value="voicevox", command=self.update_ui_state).pack(side=tk.LEFT, padx=15)
+        ttk.Radiobutton(engine_frame, text="Coqui TTS XTTS (File Clone)", variable=self.engine_var, value="coqui", command=self.on_engine_selected).pack(side=tk.LEFT, padx=15)
+        ttk.Radiobutton(engine_frame, text="VOICEVOX (Preset Char)", variable=self.engine_var, value="voicevox", command=self.on_engine_selected).pack(side=tk.LEFT, padx=15)
         
         # Preset UI
         self.build_preset_ui(main_frame)
@@ -402,7 +544,7 @@ class VoicevoxCoquiGUI:
         
         # Preview Button
         ttk.Label(silence_frame, text="").pack(side=tk.LEFT, padx=10)
-        ttk.Button(silence_frame, text="🔊 Preview (30 chars)", 
+        ttk.Button(silence_frame, text="🔊 Preview", 
                   command=self.preview_voice, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(silence_frame, text="❓", 
                   command=self.show_preview_help, width=3).pack(side=tk.LEFT, padx=1)
@@ -487,6 +629,7 @@ class VoicevoxCoquiGUI:
         self.stop_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🔔 Restore Popups", command=self.restore_popups).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🔄 Reset Settings", command=self.reset_settings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📊 Audio Cache", command=self.show_audio_cache_stats).pack(side=tk.LEFT, padx=5)
 
         self.status_bar = ttk.Label(main_frame, text="Ready", relief=tk.SUNKEN)
         self.status_bar.pack(fill=tk.X, side=tk.BOTTOM)
@@ -511,7 +654,7 @@ class VoicevoxCoquiGUI:
 
     def _reconnect_voicevox(self):
         try:
-            requests.get(f"{self.voicevox_server_url}/version", timeout=2)
+            self.voicevox_client.version(timeout=2)
             self.root.after(0, lambda: self.voicevox_status_label.config(text="VOICEVOX: Connected", foreground="green"))
             self.root.after(0, self.refresh_voicevox_speakers)
             self.root.after(0, lambda: messagebox.showinfo("Success", "Connected to VOICEVOX!"))
@@ -566,6 +709,21 @@ class VoicevoxCoquiGUI:
                 self.text_input.delete(1.0, tk.END)
                 self.text_input.insert(1.0, f.read())
 
+    def show_audio_cache_stats(self):
+        stats = self.audio_cache.stats()
+        total = stats['hits'] + stats['misses']
+        hit_rate = f"{stats['hits'] / total * 100:.0f}%" if total else "-"
+        result = messagebox.askyesno(
+            "Audio Cache",
+            f"Entries: {stats['entries']}\n"
+            f"Size: {stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB\n"
+            f"This session: {stats['hits']} hits, {stats['misses']} misses (hit rate {hit_rate})\n\n"
+            f"Clear the cache?"
+        )
+        if result:
+            self.audio_cache.clear()
+            self.status_bar.config(text="✅ Audio cache cleared")
+
     def reset_settings(self):
         self.speed_var.set(1.0)
         self.pitch_var.set(0.0)
@@ -627,14 +785,23 @@ class VoicevoxCoquiGUI:
         text = self.text_input.get(1.0, tk.END).strip()
         if not text: return
         if self.engine_var.get() == 'coqui' and not self.coqui_enabled:
+            self.start_coqui_init()
             messagebox.showwarning("Busy", "Coqui TTS is still loading.")
             return
-        
-        segments = [s.strip() for s in text.split('\n\n') if s.strip()]
+        self.record_engine_usage(self.engine_var.get())
+        
+        segments = tts_engine.split_segments(text)
+        # Snapshot the Tk state once for this job; the worker only sees these values
+        request = self._make_synthesis_request(text)
+        output_dir = Path(self.output_dir_var.get())
+        engine_name = "CoquiTTS" if request.engine == 'coqui' else "VOICEVOX"
+        fnames = [self.generate_filename(request.speaker_id, i, request.output_format, seg, engine_name)
+                  for i, seg in enumerate(segments, 1)]
         self.generation_stop_flag = False
         self.generate_button.config(state='disabled', text="🎵 Generating...")
         self.stop_button.config(state='normal')
-        threading.Thread(target=self._generate_voice_async, args=(segments,), daemon=True).start()
+        threading.Thread(target=self._generate_voice_async,
+                         args=(request, segments, output_dir, fnames), daemon=True).start()
 
     def generate_filename(self, speaker_id, index, extension, text="", engine="VOICEVOX"):
         # ★ FIXED: Default pattern to English
@@ -660,38 +827,21 @@ class VoicevoxCoquiGUI:
         
         return f"{fname}.{extension}"
 
-    def _generate_voice_async(self, segments):
+    def _generate_voice_async(self, request, segments, output_dir, fnames):
         try:
-            output_dir = Path(self.output_dir_var.get())
             output_dir.mkdir(parents=True, exist_ok=True)
-            speed = self.speed_var.get()
-            volume = self.volume_var.get()
-            pre_sil = self.pre_silence_var.get()
-            post_sil = self.post_silence_var.get()
-            ext = self.format_var.get()
-            
             self.root.after(0, lambda: self._show_progress_dialog(len(segments)))
             
             count = 0
-            for i, seg in enumerate(segments, 1):
-                if self.generation_stop_flag: break
-                
-                self.root.after(0, lambda p=int((i-1)/len(segments)*100), c=i: self._update_progress(p, f"Generating: {c}/{len(segments)}"))
-                
-                if self.engine_var.get() == 'coqui':
-                    wav = self.run_coqui(seg, speed)
-                    engine_name = "CoquiTTS"
-                else:
-                    wav = self.run_voicevox(seg)
-                    engine_name = "VOICEVOX"
-                
-                audio = self.post_process_audio(wav, volume, pre_sil, post_sil)
-                fname = self.generate_filename(self.get_speaker_id(), i, ext, seg, engine_name)
-                
-                if ext == "mp3": audio.export(output_dir / fname, format="mp3", bitrate="192k")
-                else: audio.export(output_dir / fname, format="wav")
-                self.write_daily_log(fname, seg, output_dir)
+            pipeline = self.synthesis_service.run_job(
+                request, segments, [output_dir / fname for fname in fnames],
+                should_stop=lambda: self.generation_stop_flag
+            )
+            for i, seg, path in pipeline:
+                # Export runs on the post-processing pool; the log is written here in segment order
+                self.write_daily_log(path.name, seg, output_dir)
                 count += 1
+                self.root.after(0, lambda p=int(i/len(segments)*100), c=i: self._update_progress(p, f"Generating: {c}/{len(segments)}"))
             
             self.root.after(0, lambda: self._update_progress(100, "Done!"))
             self.root.after(0, lambda: self._on_generation_complete(count, len(segments), output_dir))
@@ -765,41 +915,31 @@ class VoicevoxCoquiGUI:
         
         dialog.protocol("WM_DELETE_WINDOW", on_ok)
 
-    def run_coqui(self, text, speed):
-        if not self.coqui_model: raise Exception("Engine initializing...")
-        fname = self.coqui_speaker_var.get()
-        lang = self.language_var.get().split(' - ')[0]
-        temp = self.app_data / "temp.wav"
-        self.coqui_model.tts_to_file(text=text, speaker_wav=str(self.samples_dir / fname), language=lang, file_path=str(temp), speed=speed)
-        with open(temp, 'rb') as f: data = f.read()
-        return data
-
-    def run_voicevox(self, text):
-        sid = self.get_speaker_id()
-        q = requests.post(f"{self.voicevox_server_url}/audio_query?text={urllib.parse.quote(text)}&speaker={sid}").json()
-        q['speedScale'] = self.speed_var.get()
-        q['volumeScale'] = self.volume_var.get()
-        q['pitchScale'] = self.pitch_var.get()
-        q['intonationScale'] = self.intonation_var.get()
-        return requests.post(f"{self.voicevox_server_url}/synthesis?speaker={sid}", json=q).content
-
-    def post_process_audio(self, wav_bytes, volume, pre, post):
-        audio = AudioSegment.from_wav(io.BytesIO(wav_bytes))
-        if volume != 1.0 and volume > 0:
-            import math
-            audio = audio + (20 * math.log10(volume))
-        if pre > 0: audio = AudioSegment.silent(duration=int(pre*1000)) + audio
-        if post > 0: audio = audio + AudioSegment.silent(duration=int(post*1000))
-        return audio
+    def _make_synthesis_request(self, text):
+        # Main thread only: every Tk variable a synthesis job needs is read here, once
+        return SynthesisRequest(
+            engine=self.engine_var.get(),
+            text=text,
+            speaker_id=self.get_speaker_id(),
+            speaker_wav=self.samples_dir / self.coqui_speaker_var.get(),
+            language=self.language_var.get().split(' - ')[0],
+            speed=self.speed_var.get(),
+            volume=self.volume_var.get(),
+            pitch=self.pitch_var.get(),
+            intonation=self.intonation_var.get(),
+            pre_silence=self.pre_silence_var.get(),
+            post_silence=self.post_silence_var.get(),
+            sentence_gap=self.punctuation_silence_var.get(),
+            output_format=self.format_var.get(),
+            sample_rate=self.config.get('output_sample_rate')
+        )
 
     def check_voicevox_connection(self):
-        try: requests.get(f"{self.voicevox_server_url}/version", timeout=1)
-        except: self.voicevox_status_label.config(text="VOICEVOX: Disconnected", foreground="red")
+        if not self.voicevox_client.is_available(timeout=1): self.voicevox_status_label.config(text="VOICEVOX: Disconnected", foreground="red")
 
     def get_voicevox_speakers(self):
         try:
-            res = requests.get(f"{self.voicevox_server_url}/speakers")
-            return [{'name': f"{s['name']}-{st['name']}", 'id': st['id']} for s in res.json() for st in s['styles']]
+            return [{'name': f"{s['name']}-{st['name']}", 'id': st['id']} for s in self.voicevox_client.speakers() for st in s['styles']]
         except: return []
 
     def get_speaker_id(self):
@@ -1057,7 +1197,10 @@ class VoicevoxCoquiGUI:
                 'seq_digits': self.seq_digits_var.get(),
                 'prefix': self.prefix_var.get(),
                 'language': self.language_var.get(),
-                'show_recording_complete_message': self.show_recording_complete_message
+                'show_recording_complete_message': self.show_recording_complete_message,
+                'live_transcription': self.live_transcription_var.get(),
+                'whisper_profile': self.whisper_profile_var.get(),
+                'whisper_model': self.whisper_model_var.get()
             })
             with open(self.config_file, 'w', encoding='utf-8') as f: json.dump(self.config, f, indent=2)
         except: pass
@@ -1073,6 +1216,9 @@ class VoicevoxCoquiGUI:
             print(f"[Daily Logger] Log failed: {e}")
 
     def on_closing(self):
+        # Finalize the WAV header of a recording still in progress
+        if self.recorder:
+            self.recorder.stop()
         self.save_config()
         self.root.destroy()
 
@@ -1151,12 +1297,20 @@ class VoicevoxCoquiGUI:
         ttk.Label(rec_buttons_frame, textvariable=self.recording_time_var,
                  font=("", 10)).pack(side=tk.LEFT, padx=10)
         
+        live_check = ttk.Checkbutton(rec_buttons_frame, text="📝 Live transcription",
+                                     variable=self.live_transcription_var,
+                                     command=self.save_config)
+        live_check.pack(side=tk.LEFT, padx=10)
+        if not WHISPER_AVAILABLE:
+            live_check.config(state='disabled')
+        
         self.recording_filename_var = tk.StringVar(value="")
         ttk.Label(self.recording_frame, textvariable=self.recording_filename_var,
                  foreground="gray", font=("", 8)).pack(fill=tk.X, pady=2)
         
         ttk.Label(self.recording_frame, 
-                 text="💡 After recording, click 'Start Transcription' to select from recording folder.", 
+                 text="💡 With live transcription on, text appears below while you speak.\n"
+                      "    After recording, click 'Start Transcription' to select from recording folder.", 
                  foreground="blue", font=("", 9)).pack(fill=tk.X, pady=5)
         
         # Recognition Settings
@@ -1204,6 +1358,29 @@ class VoicevoxCoquiGUI:
                        variable=self.whisper_format_var, 
                        value='srt').pack(side=tk.LEFT, padx=5)
         
+        # Decoding Profile
+        profile_frame = ttk.Frame(settings_frame)
+        profile_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(profile_frame, text="Profile:", width=10).pack(side=tk.LEFT)
+        
+        profiles = [
+            ('Fast (greedy)', 'fast'),
+            ('Balanced', 'balanced'),
+            ('Accurate', 'accurate')
+        ]
+        
+        for text, value in profiles:
+            ttk.Radiobutton(profile_frame, text=text,
+                           variable=self.whisper_profile_var,
+                           value=value,
+                           command=self.update_whisper_profile_info).pack(side=tk.LEFT, padx=5)
+        
+        self.whisper_profile_info_var = tk.StringVar()
+        ttk.Label(settings_frame, textvariable=self.whisper_profile_info_var,
+                 foreground="gray", font=("", 8)).pack(fill=tk.X, pady=2)
+        self.update_whisper_profile_info()
+        
         # Action Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -1291,21 +1468,24 @@ class VoicevoxCoquiGUI:
             self.current_recording_file = output_dir / filename
             
             self.is_recording = True
-            self.recording_data = []
             self.recording_start_time = time.time()
             
             self.record_start_button.config(state='disabled')
             self.record_stop_button.config(state='normal')
             self.recording_filename_var.set(f"Saving to: {filename}")
             
-            # 16kHz Mono for Whisper
-            self.recording_stream = sd.InputStream(
-                samplerate=16000,
-                channels=1,
-                dtype='float32',
-                callback=self.recording_callback
+            # Live transcription receives each recorded chunk from the recorder's writer thread
+            self.live_transcriber = None
+            self.live_pending = None
+            if self.live_transcription_var.get() and WHISPER_AVAILABLE:
+                self._start_live_transcription()
+            
+            # 16kHz Mono for Whisper, streamed straight to the WAV file
+            self.recorder = AudioRecorder(
+                self.current_recording_file, samplerate=16000, channels=1,
+                chunk_callback=self._feed_live if self.live_pending is not None else None
             )
-            self.recording_stream.start()
+            self.recorder.start()
             
             self.update_recording_time()
             self.status_bar.config(text="🔴 Recording...")
@@ -1313,6 +1493,12 @@ class VoicevoxCoquiGUI:
         except Exception as e:
             messagebox.showerror("Recording Error", f"Failed to start recording:\n{str(e)}")
             self.is_recording = False
+            self.recorder = None
+            with self.live_lock:
+                live_transcriber, self.live_transcriber = self.live_transcriber, None
+                self.live_pending = None
+            if live_transcriber:
+                threading.Thread(target=live_transcriber.stop, daemon=True).start()
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
     
@@ -1321,29 +1507,34 @@ class VoicevoxCoquiGUI:
             return
         
         try:
-            if self.recording_stream:
-                self.recording_stream.stop()
-                self.recording_stream.close()
-                self.recording_stream = None
+            frames = 0
+            if self.recorder:
+                frames = self.recorder.stop()
+                duration = self.recorder.duration_seconds
+                self.recorder = None
+            
+            # All chunks have been fed; decode the tail and commit the rest in the background
+            with self.live_lock:
+                live_transcriber, self.live_transcriber = self.live_transcriber, None
+                self.live_pending = None
+            if live_transcriber:
+                threading.Thread(target=self._finish_live_transcription,
+                                 args=(live_transcriber,), daemon=True).start()
             
             if self.recording_timer_id:
                 self.root.after_cancel(self.recording_timer_id)
                 self.recording_timer_id = None
             
-            if self.recording_data:
-                audio_data = np.concatenate(self.recording_data, axis=0)
-                sf.write(self.current_recording_file, audio_data, 16000)
-                
-                duration = time.time() - self.recording_start_time
+            if frames:
                 self.status_bar.config(text=f"✅ Recording finished: {duration:.1f}s")
                 
                 if self.show_recording_complete_message:
                     self.show_recording_complete_dialog(self.current_recording_file.name)
             else:
+                self.current_recording_file.unlink(missing_ok=True)
                 self.status_bar.config(text="⚠ No recording data")
             
             self.is_recording = False
-            self.recording_data = []
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
             self.recording_time_var.set("Time: 00:00:00")
@@ -1354,12 +1545,87 @@ class VoicevoxCoquiGUI:
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
     
-    def recording_callback(self, indata, frames, time_info, status):
-        if status:
-            print(f"Status: {status}")
-        
-        if self.is_recording:
-            self.recording_data.append(indata.copy())
+    def _start_live_transcription(self):
+        # The engine is created and loaded on a worker thread (importing faster-whisper blocks);
+        # until it is ready the recorded chunks are kept in live_pending
+        self.record_engine_usage('whisper')
+        model_size = self.whisper_model_var.get()
+        profile = self.whisper_profile_var.get()
+        language = self.whisper_language_var.get().split(' - ')[0]
+        
+        result = self.transcription_result
+        result.delete('1.0', tk.END)
+        result.insert(tk.END, f"🎙️ Live transcription (model: {self.whisper_model_var.get()})\n\n")
+        # Everything after this mark is redrawn on each update (left gravity keeps it in place)
+        result.mark_set('live_start', 'end-1c')
+        result.mark_gravity('live_start', tk.LEFT)
+        result.tag_configure('live_partial', foreground='gray')
+        result.insert(tk.END, "⏳ Loading Whisper model...", 'live_partial')
+        
+        pending = self.live_pending = []
+        threading.Thread(target=self._prepare_live_transcription,
+                         args=(self.whisper_engine, model_size, profile, language, pending),
+                         daemon=True).start()
+    
+    def _prepare_live_transcription(self, engine, model_size, profile, language, pending):
+        try:
+            if not engine or engine.model_size != model_size or engine.profile != profile:
+                engine = self._new_whisper_engine(model_size, profile)
+            if not engine.model and not engine.load_model():
+                raise Exception("Whisper model failed to load")
+        except Exception as e:
+            with self.live_lock:
+                if self.live_pending is pending:
+                    self.live_pending = None
+            self.root.after(0, lambda msg=str(e): self.transcription_result.insert(
+                tk.END, f"\n❌ Live transcription failed: {msg}\n"))
+            return
+        self.root.after(0, lambda: self._on_live_engine_ready(engine, language, pending))
+    
+    def _on_live_engine_ready(self, engine, language, pending):
+        self.whisper_engine = engine
+        live_transcriber = engine.live_transcriber(
+            language=language,
+            update_callback=lambda committed, partial: self.root.after(
+                0, lambda: self._show_live_transcript(committed, partial))
+        )
+        live_transcriber.start()
+        with self.live_lock:
+            for chunk in pending:
+                live_transcriber.feed(chunk)
+            recording = self.live_pending is pending
+            if recording:
+                self.live_transcriber = live_transcriber
+                self.live_pending = None
+        # Recording already stopped: transcribe what was kept and finish
+        if not recording:
+            threading.Thread(target=self._finish_live_transcription,
+                             args=(live_transcriber,), daemon=True).start()
+    
+    def _feed_live(self, chunk):
+        # Called on the recorder's writer thread
+        with self.live_lock:
+            if self.live_transcriber:
+                self.live_transcriber.feed(chunk)
+            elif self.live_pending is not None:
+                self.live_pending.append(chunk)
+    
+    def _show_live_transcript(self, committed, partial):
+        result = self.transcription_result
+        result.delete('live_start', tk.END)
+        result.insert('live_start', committed)
+        if partial:
+            result.insert(tk.END, partial if committed else partial.lstrip(), 'live_partial')
+        result.see(tk.END)
+    
+    def _finish_live_transcription(self, live_transcriber):
+        try:
+            text = live_transcriber.stop()
+            self.root.after(0, lambda: self._show_live_transcript(text, ''))
+            self.root.after(0, lambda: self.status_bar.config(text="✅ Live transcription complete"))
+        except Exception as e:
+            self.root.after(0, lambda msg=str(e): self.transcription_result.insert(
+                tk.END, f"\n❌ Live transcription failed: {msg}\n"))
     
     def update_recording_time(self):
         if not self.is_recording:
@@ -1447,6 +1713,7 @@ class VoicevoxCoquiGUI:
         
         if not file_paths:
             return
+        self.record_engine_usage('whisper')
         
         self.selected_audio_files = file_paths
         
@@ -1456,74 +1723,120 @@ class VoicevoxCoquiGUI:
         
         threading.Thread(target=self._transcribe_worker, daemon=True).start()
     
+    def update_whisper_profile_info(self):
+        descriptions = {
+            'fast': 'Greedy decoding, no context. For a quick look.',
+            'balanced': 'Beam search. Good balance of speed and accuracy.',
+            'accurate': 'Retries failed parts at higher temperature. Slowest.'
+        }
+        profile = self.whisper_profile_var.get()
+        info = descriptions.get(profile, '')
+        
+        rtf = self.whisper_engine.measured_rtf(profile) if self.whisper_engine else None
+        if rtf:
+            info += f"  |  Measured ({self.whisper_engine.model_size}): {1 / rtf:.1f}x realtime"
+        elif self.whisper_engine:
+            info += "  |  No measurements yet"
+        self.whisper_profile_info_var.set(info)
+    
+    def _new_whisper_engine(self, model_size, profile):
+        # 'auto' switches long recordings to batched inference
+        return WhisperEngine(
+            model_size=model_size,
+            device='auto',
+            cache=self.transcription_cache,
+            rtf_history=self.whisper_rtf_history,
+            mode=self.config.get('whisper_inference_mode', 'auto'),
+            batch_size=self.config.get('whisper_batch_size', WhisperEngine.DEFAULT_BATCH_SIZE),
+            profile=profile
+        )
+    
     def _transcribe_worker(self):
         try:
             from datetime import datetime
             
             if not self.whisper_engine or \
-               self.whisper_engine.model_size != self.whisper_model_var.get():
+               self.whisper_engine.model_size != self.whisper_model_var.get() or \
+               self.whisper_engine.profile != self.whisper_profile_var.get():
                 self.root.after(0, lambda: self.transcription_result.insert(
                     tk.END, "🔧 Initializing Whisper Engine...\n"))
                 self.root.after(0, lambda: self.transcription_result.see(tk.END))
                 
-                self.whisper_engine = WhisperEngine(
-                    model_size=self.whisper_model_var.get(),
-                    device='auto'
-                )
+                self.whisper_engine = self._new_whisper_engine(self.whisper_model_var.get(),
+                                                               self.whisper_profile_var.get())
             
             language = self.whisper_language_var.get().split(' - ')[0]
             output_format = self.whisper_format_var.get()
             total_files = len(self.selected_audio_files)
             
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            ext = "srt" if output_format == "srt" else "txt"
+            output_dir = Path(self.stt_output_dir_var.get())
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # Each file is written segment by segment while it is transcribed, then joined below
+            part_files = [output_dir / f"{timestamp}_{i}.{ext}.part" for i in range(1, total_files + 1)]
+            
             all_results = []
             success_count = 0
             failed_files = []
             
-            for i, file_path in enumerate(self.selected_audio_files, 1):
+            def progress_callback(message):
+                self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, f"  {m}\n"))
+                self.root.after(0, lambda: self.transcription_result.see(tk.END))
+            
+            # Show each segment as soon as it is recognized
+            def segment_callback(file_path, segment):
+                line = f"  [{Path(file_path).name}] {segment.text.strip()}\n"
+                self.root.after(0, lambda l=line: self.transcription_result.insert(tk.END, l))
+                self.root.after(0, lambda: self.transcription_result.see(tk.END))
+            
+            # Estimate processing time from past real-time factors
+            estimate, total_audio = self.whisper_engine.estimate_batch_seconds(self.selected_audio_files)
+            if estimate is not None:
+                message = f"⏱ Estimated time: ~{format_duration(estimate)} (audio total {format_duration(total_audio)})\n"
+                self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, m))
+            
+            # Files are processed in parallel; results come back in input order
+            results = self.whisper_engine.transcribe_many(
+                self.selected_audio_files,
+                language=language,
+                output_format=output_format,
+                workers=self.config.get('whisper_workers', 2),
+                progress_callback=progress_callback,
+                segment_callback=segment_callback,
+                output_paths=part_files
+            )
+            
+            for i, (file_path, result, part_file) in enumerate(
+                    zip(self.selected_audio_files, results, part_files), 1):
                 file_path = Path(file_path)
                 
                 self.root.after(0, lambda i=i, t=total_files, n=file_path.name: 
                               self.transcription_result.insert(tk.END, f"\n[{i}/{t}] {n}\n"))
-                self.root.after(0, lambda: self.transcription_result.see(tk.END))
                 
-                try:
-                    def progress_callback(message):
-                        self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, f"  {m}\n"))
-                        self.root.after(0, lambda: self.transcription_result.see(tk.END))
-                    
-                    result = self.whisper_engine.transcribe(
-                        file_path,
-                        language=language,
-                        output_format=output_format,
-                        progress_callback=progress_callback
-                    )
-                    
-                    all_results.append(result)
-                    success_count += 1
-                    
-                    self.root.after(0, lambda: self.transcription_result.insert(tk.END, "✅ Done\n"))
-                    
-                except Exception as e:
-                    failed_files.append(f"{file_path.name}: {str(e)}")
-                    self.root.after(0, lambda e=e: self.transcription_result.insert(
+                if isinstance(result, Exception):
+                    failed_files.append(f"{file_path.name}: {str(result)}")
+                    self.root.after(0, lambda e=result: self.transcription_result.insert(
                         tk.END, f"❌ Error: {str(e)}\n"))
+                    continue
+                
+                with open(part_file, 'r', encoding='utf-8') as f:
+                    all_results.append(f.read().rstrip('\n'))
+                success_count += 1
+                
+                self.root.after(0, lambda: self.transcription_result.insert(tk.END, "✅ Done\n"))
             
             combined_result = "\n\n".join(all_results)
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             first_text = combined_result[:20].strip()
             safe_text = "".join([c for c in first_text if c.isalnum() or c in (' ', '_', '-')]).replace(' ', '_')[:20]
             
-            ext = "srt" if output_format == "srt" else "txt"
-            
             if safe_text:
                 filename = f"{timestamp}_{safe_text}.{ext}"
             else:
                 filename = f"{timestamp}.{ext}"
             
-            output_dir = Path(self.stt_output_dir_var.get())
-            output_dir.mkdir(parents=True, exist_ok=True)
             output_file = output_dir / filename
             
             counter = 1
@@ -1535,8 +1848,15 @@ class VoicevoxCoquiGUI:
                 output_file = output_dir / filename
                 counter += 1
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(combined_result)
+            # A single file is already complete on disk; several are joined with a blank line
+            successful_parts = [p for p, r in zip(part_files, results) if not isinstance(r, Exception)]
+            if len(successful_parts) == 1:
+                successful_parts[0].replace(output_file)
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(combined_result)
+            for part_file in part_files:
+                part_file.unlink(missing_ok=True)
             
             self.root.after(0, lambda: self.transcription_result.insert(tk.END, "\n" + "="*60 + "\n"))
             self.root.after(0, lambda: self.transcription_result.insert(tk.END, "✅ Transcription Complete\n"))
@@ -1547,6 +1867,8 @@ class VoicevoxCoquiGUI:
                 summary += f"Failed: {len(failed_files)}\n"
                 for failed in failed_files:
                     summary += f"  - {failed}\n"
+            cache_stats = self.transcription_cache.stats()
+            summary += f"Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses\n"
             summary += f"\n💾 Saved to: {output_file}\n\n"
             
             self.root.after(0, lambda s=summary: self.transcription_result.insert(tk.END, s))
@@ -1564,6 +1886,7 @@ class VoicevoxCoquiGUI:
         finally:
             self.root.after(0, lambda: self.transcribe_button.config(state='normal'))
             self.root.after(0, lambda: self.transcribe_stop_button.config(state='disabled'))
+            self.root.after(0, self.update_whisper_profile_info)
     
     def stop_transcription(self):
         messagebox.showinfo("Info", "Stop function coming in next update")
@@ -1964,31 +2287,84 @@ class VoicevoxCoquiGUI:
     # ==========================================
     
     def preview_voice(self):
+        # Clicking again while a streaming preview is playing stops it
+        if self.preview_player is not None:
+            self.preview_player.stop()
+            return
+        
         try:
             full_text = self.text_input.get('1.0', tk.END).strip()
             if not full_text:
                 messagebox.showwarning("Warning", "Please enter text")
                 return
             
-            preview_text = full_text[:30].strip()
+            if self.engine_var.get() == 'coqui' and not self.coqui_enabled:
+                self.start_coqui_init()
+                messagebox.showwarning("Busy", "Coqui TTS is still loading.")
+                return
+            self.record_engine_usage(self.engine_var.get())
+            
+            if not RECORDING_AVAILABLE:
+                # Without sounddevice, fall back to a 30-char file preview
+                self._preview_voice_file(full_text[:30].strip())
+                return
+            
+            request = self._make_synthesis_request(full_text)
+            chunks = self.synthesis_service.stream(request)
+            
+            self.preview_player = StreamPlayer()
+            self.status_bar.config(text="🔊 Streaming Preview... (click Preview again to stop)")
+            threading.Thread(
+                target=self._stream_preview_worker,
+                args=(self.preview_player, chunks, request),
+                daemon=True
+            ).start()
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Preview Failed:\n{str(e)}")
+            self.status_bar.config(text="✗ Preview Failed")
+    
+    def _stream_preview_worker(self, player, chunks, request):
+        error = None
+        try:
+            for i, wav in enumerate(chunks):
+                # Chunks are not peak-normalised individually so the loudness stays even
+                audio = tts_engine.post_process_audio(wav, request.volume, request.pre_silence if i == 0 else 0, 0,
+                                                      normalize=False)
+                if not player.play(audio):
+                    break
+                if i == 0:
+                    ms = player.first_audio_seconds * 1000
+                    self.root.after(0, lambda: self.status_bar.config(text=f"🔊 Playing Preview (first audio in {ms:.0f} ms)"))
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+            player.stop()
+        finally:
+            chunks.close()
+            player.close()
+            self.root.after(0, lambda: self._on_stream_preview_done(player, error))
+    
+    def _on_stream_preview_done(self, player, error):
+        self.preview_player = None
+        if error:
+            messagebox.showerror("Error", f"Preview Failed:\n{error}")
+            self.status_bar.config(text="✗ Preview Failed")
+        elif player.stopped:
+            self.status_bar.config(text="⏹ Preview Stopped")
+        else:
+            self.status_bar.config(text="✓ Preview Played")
+    
+    def _preview_voice_file(self, preview_text):
+        try:
             if not preview_text:
                 return
             
             self.status_bar.config(text="🔊 Generating Preview...")
             self.root.update()
             
-            engine = self.engine_var.get()
-            speed = self.speed_var.get()
-            
-            if engine == 'voicevox':
-                wav_bytes = self.run_voicevox(preview_text)
-            else:
-                wav_bytes = self.run_coqui(preview_text, speed)
-            
-            volume = self.volume_var.get()
-            pre_sil = self.pre_silence_var.get()
-            post_sil = self.post_silence_var.get()
-            audio = self.post_process_audio(wav_bytes, volume, pre_sil, post_sil)
+            request = self._make_synthesis_request(preview_text)
+            audio = self.synthesis_service.post_process(request, self.synthesis_service.synthesize(request))
             
             temp_file = self.app_data / "preview_temp.wav"
             audio.export(temp_file, format="wav")
@@ -2016,13 +2392,15 @@ class VoicevoxCoquiGUI:
         messagebox.showinfo(
             "Preview Help",
             "【What is Preview?】\n"
-            "Generates and plays only the first 30 characters\n"
-            "to quickly test your settings.\n\n"
+            "Synthesizes the text sentence by sentence and plays each\n"
+            "part as soon as it is ready, so you hear your settings\n"
+            "within a moment instead of waiting for the full text.\n\n"
             "【Features】\n"
-            "・Fast: Takes ~3 seconds (Full text might take 30s+)\n"
-            "・Range: First 30 chars only\n"
+            "・Fast: First audio in a few hundred ms\n"
+            "・Range: Full text (click Preview again to stop)\n"
             "・Test: Speed, Pitch, Speaker settings apply\n"
-            "・No Save: Files are temporary (not saved to output)\n\n"
+            "・No Save: Nothing is written to the output folder\n"
+            "・Without sounddevice: Only the first 30 chars are played\n\n"
             "【Usage】\n"
             "1. Enter text (Full text is fine)\n"
             "2. Adjust settings\n"
@@ -2319,6 +2697,13 @@ if __name__ == "__main__":
     style = ttk.Style()
     if 'vista' in style.theme_names(): style.theme_use('vista')
     app = VoicevoxCoquiGUI(root)
+    
+    def _on_mainloop_started():
+        startup_timeline.mark('mainloop_started')
+        # The window is about to be drawn: end the main-thread profile here
+        if startup_profile:
+            startup_profile.stop(app.app_data / 'logs')
+    root.after(0, _on_mainloop_started)
     try:
         if 'pyi_splash' in sys.modules and pyi_splash.is_alive(): pyi_splash.close()
     except NameError: pass
@@ -15,7 +15,7 @@ Universal Voice Generation Platform
    - テキスト/SRT字幕形式出力
    - 音声生成タブへの転送機能
 ★8. プリセット管理: よく使う設定を保存・呼び出し
-★9. 音声プレビュー: 最初の30文字だけ生成してテスト
+★9. 音声プレビュー: 生成できた部分から順に再生するストリーミング再生
 ★10. バッチ処理: 複数ファイルの一括処理
 ★11. テキスト履歴: 最近使った10件を保存
 ★12. テンプレート機能: 定型文の保存・呼び出し
@@ -41,23 +41,34 @@ try:
 except ImportError:
     pass
 
+import sys
+from startup_profiler import startup_timeline, start_profiler, STARTUP_TRACE_TIMEOUT_MS
+
+# 起動タイムライン (各フェーズを user_data/logs/startup_*.json に記録)
+# --profile-startup 指定時はメインスレッドの起動処理を pyinstrument / cProfile で計測
+startup_profile = start_profiler() if '--profile-startup' in sys.argv else None
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-import requests
 import json
 import os
-import sys
 from pathlib import Path
-import urllib.parse
 import subprocess
 import platform
 from datetime import datetime
-from pydub import AudioSegment
-import io
 import threading
 import traceback
 import time
 
+import tts_engine
+from voicevox_client import VoicevoxClient, AudioQueryCache
+from audio_cache import AudioCache
+from stream_player import StreamPlayer
+from audio_recorder import AudioRecorder
+from sample_downloader import SampleDownloader
+from synthesis_service import SynthesisService, SynthesisRequest
+from warmup_scheduler import WarmupScheduler, record_usage, predict_engines
+
 # 録音機能用 (v2.3で追加)
 try:
     import sounddevice as sd
@@ -72,7 +83,6 @@ except ImportError:
 # exe化対応：could not get source code エラー回避パッチ
 # ==========================================
 import inspect
-import sys
 
 # exe化されている場合、ソースコード取得でエラーが出ないように空文字を返す
 if getattr(sys, 'frozen', False):
@@ -83,56 +93,31 @@ if getattr(sys, 'frozen', False):
 
 
 # ==========================================
-# PyTorch互換性パッチ
+# 重いライブラリは初めて使うときに読み込む
+# (torch / TTS は最初のCoqui TTSロード時、faster-whisper は最初の文字起こし時。
+#  torch.loadの互換性パッチもその時点で tts_engine が当てる)
 # ==========================================
-import torch
-_original_load = torch.load
-def _patched_load(*args, **kwargs):
-    if 'weights_only' not in kwargs:
-        kwargs['weights_only'] = False
-    return _original_load(*args, **kwargs)
-torch.load = _patched_load
+from runtime_probe import is_installed, probe_cuda
+
 # Whisper音声認識 (v2.1で追加)
 try:
-    from whisper_engine import WhisperEngine
-    WHISPER_AVAILABLE = True
+    from whisper_engine import WhisperEngine, TranscriptionCache, RTFHistory, get_model_pool, format_duration
+    WHISPER_AVAILABLE = is_installed('faster_whisper')
 except ImportError:
     WHISPER_AVAILABLE = False
-    print("⚠️ Warning: whisper_engine.py not found. Whisper機能は無効化されます。")
-
-
-CUDA_AVAILABLE = torch.cuda.is_available()
-CUDA_DEVICE = torch.cuda.get_device_name(0) if CUDA_AVAILABLE else "CPU"
-# ==========================================
+if not WHISPER_AVAILABLE:
+    print("⚠️ Warning: faster-whisper が見つかりません。Whisper機能は無効化されます。")
 
+# ドライバ経由でCUDAの有無を確認 (torchは読み込まない)
+CUDA_AVAILABLE, CUDA_DEVICE = probe_cuda()
+CUDA_DEVICE = CUDA_DEVICE or ("GPU" if CUDA_AVAILABLE else "CPU")
+startup_timeline.mark('module_imports_done')
 # ==========================================
-# exe化対応：リソースパス取得関数
-# ==========================================
-def resource_path(relative_path):
-    """exe化された環境(_MEIPASS)でも正しくパスを取得する"""
-    if hasattr(sys, '_MEIPASS'):
-        return Path(sys._MEIPASS) / relative_path
-    return Path(__file__).parent / relative_path
-
-
-
-def setup_ffmpeg():
-    # 修正前: base_path = Path(__file__).parent
-    # 修正後:
-    ffmpeg_exe = resource_path("ffmpeg/ffmpeg.exe")
-    ffprobe_exe = resource_path("ffmpeg/ffprobe.exe")
-    
-    if ffmpeg_exe.exists():
-        AudioSegment.converter = str(ffmpeg_exe)
-        AudioSegment.ffmpeg = str(ffmpeg_exe)
-        AudioSegment.ffprobe = str(ffprobe_exe)
-        print(f"Local FFmpeg loaded: {ffmpeg_exe}")
-    else:
-        print("Local FFmpeg not found. Using system default.")
 
 class VoicevoxCoquiGUI:
     def __init__(self, root):
-        setup_ffmpeg()
+        with startup_timeline.phase('setup_ffmpeg'):
+            tts_engine.setup_ffmpeg()
         
         self.root = root
         gpu_status = f"GPU: {CUDA_DEVICE}" if CUDA_AVAILABLE else "CPU Mode"
@@ -141,7 +126,7 @@ class VoicevoxCoquiGUI:
         try:
             # 修正前: icon_path = Path(__file__).parent / "make_icon" / "icon.ico"
             # 修正後:
-            icon_path = resource_path("make_icon/icon.ico")
+            icon_path = tts_engine.resource_path("make_icon/icon.ico")
             if icon_path.exists():
                 self.root.iconbitmap(str(icon_path))
         except:
@@ -149,15 +134,23 @@ class VoicevoxCoquiGUI:
         
         self.root.geometry("800x920")
         
-        self.app_data = self.get_app_data_path()
-        self.voicevox_server_url = "http://127.0.0.1:50021"
+        with startup_timeline.phase('get_app_data_path'):
+            self.app_data = self.get_app_data_path()
+        self.voicevox_server_url = VoicevoxClient.DEFAULT_URL
         
         self.coqui_enabled = False
         self.coqui_model = None
+        self.coqui_loading = False
+        # 利用履歴から予測したエンジンのバックグラウンド・ウォームアップ
+        self.warmup = None
         self.samples_dir = self.app_data / "samples"
         self.samples_dir.mkdir(parents=True, exist_ok=True)
+        # XTTSの話者条件付けをサンプルごとにキャッシュ
+        self.coqui_latent_cache = tts_engine.SpeakerLatentCache(self.samples_dir / ".latents")
         
         self.generation_stop_flag = False
+        # ストリーミングプレビュー (再生中以外はNone)
+        self.preview_player = None
         self.config_file = self.app_data / "config.json"
         
         # Whisper音声認識エンジン (v2.1で追加)
@@ -169,16 +162,16 @@ class VoicevoxCoquiGUI:
         # 録音機能 (v2.3で追加)
         self.audio_input_method_var = tk.StringVar(value='file')  # 'file' or 'mic'
         self.is_recording = False
-        self.recording_data = []
+        self.recorder = None
         self.recording_start_time = None
-        self.recording_stream = None
         self.recording_timer_id = None
         self.recordings_dir = self.app_data / 'recordings'
         self.recordings_dir.mkdir(exist_ok=True)
         self.recording_output_dir_var = tk.StringVar(value=str(self.recordings_dir))
         
         self.selected_audio_file = None
-        self.load_config()  # 先にconfigを読み込む
+        with startup_timeline.phase('load_config'):
+            self.load_config()  # 先にconfigを読み込む
         
         # v2.2 新機能用変数 (configを読み込んだ後に初期化)
         self.presets = self.config.get('presets', {})
@@ -191,8 +184,58 @@ class VoicevoxCoquiGUI:
         # v2.3 録音完了メッセージの表示設定
         self.show_recording_complete_message = self.config.get('show_recording_complete_message', True)
         
+        # 録音中のリアルタイム文字起こし
+        self.live_transcription_var = tk.BooleanVar(value=self.config.get('live_transcription', True))
+        self.live_transcriber = None
+        self.live_pending = None  # Whisperエンジンのロード中に録音したチャンク
+        self.live_lock = threading.Lock()
+        
+        # Whisperのデコードプロファイル (fast / balanced / accurate)
+        self.whisper_profile_var = tk.StringVar(value=self.config.get('whisper_profile', 'balanced'))
+        # Whisperのモデル (起動時のウォームアップもこのモデルで行う)
+        self.whisper_model_var.set(self.config.get('whisper_model', 'base'))
+        
+        # Whisperモデルプールのメモリ予算 (MB)
+        if WHISPER_AVAILABLE and self.config.get('whisper_memory_budget_mb'):
+            get_model_pool().set_memory_budget(self.config['whisper_memory_budget_mb'])
+        
+        # 文字起こしキャッシュ（同じ音声のテキスト/SRT出力で結果を再利用）
+        self.transcription_cache = None
+        self.whisper_rtf_history = None
+        if WHISPER_AVAILABLE:
+            self.transcription_cache = TranscriptionCache(
+                self.app_data / 'transcription_cache',
+                max_bytes=self.config.get('transcription_cache_mb', 200) * 1024 * 1024
+            )
+            self.whisper_rtf_history = RTFHistory(self.app_data / 'whisper_rtf_history.json')
+        
+        # VOICEVOXクライアント (audio_queryをキャッシュし、スライダー調整時はアクセント解析を省略)
+        self.voicevox_client = VoicevoxClient(
+            self.voicevox_server_url,
+            pool_size=max(8, self.config.get('voicevox_max_in_flight', 4)),
+            query_cache=AudioQueryCache(
+                self.app_data / 'audio_query_cache',
+                max_entries=self.config.get('audio_query_cache_entries', 512)
+            )
+        )
+        
+        # 合成音声キャッシュ (テンプレートや定型文は再合成せずに再利用)
+        self.audio_cache = AudioCache(
+            self.app_data / 'audio_cache',
+            max_bytes=self.config.get('audio_cache_mb', 500) * 1024 * 1024
+        )
+        
+        # 音声合成サービス (ワーカーには不変のSynthesisRequestだけを渡し、Tkの変数に触れさせない)
+        self.synthesis_service = SynthesisService(
+            voicevox_client=self.voicevox_client,
+            latent_cache=self.coqui_latent_cache,
+            audio_cache=self.audio_cache,
+            voicevox_max_in_flight=self.config.get('voicevox_max_in_flight', 4)
+        )
+        
         self.voicevox_speakers = []
-        self.build_gui()
+        with startup_timeline.phase('build_gui'):
+            self.build_gui()
         self.initialize_app_async()
         
         # v2.2 デフォルトプリセットを自動作成（初回起動時のみ）
@@ -230,53 +273,154 @@ class VoicevoxCoquiGUI:
     def initialize_app_async(self):
         def _init():
             try:
-                self.download_sample_voices()
-                time.sleep(1.0)
-                
-                default_wav = self.samples_dir / "de_female_official.wav"
-                if not default_wav.exists() or default_wav.stat().st_size == 0:
-                    self._download_file("de_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/de_sample.wav")
-                    time.sleep(1.0)
+                with startup_timeline.phase('download_sample_voices'):
+                    self.download_sample_voices()
 
                 self.root.after(0, self.refresh_coqui_speakers)
-                self.initialize_coqui()
                 
-                self.check_voicevox_connection()
+                with startup_timeline.phase('check_voicevox_connection'):
+                    self.check_voicevox_connection()
                 self.root.after(0, self.refresh_voicevox_speakers)
+                self.root.after(0, self.start_warmup)
                 
             except Exception as e:
+                self._finish_startup_timeline()
                 print(f"Init Error: {e}")
                 self.root.after(0, lambda: messagebox.showerror("起動エラー", f"初期化中にエラーが発生しました:\n{e}"))
 
         threading.Thread(target=_init, daemon=True).start()
 
+    def _finish_startup_timeline(self):
+        """起動タイムラインを書き出す（ウォームアップ完了時、またはSTARTUP_TRACE_TIMEOUT_MS経過時）"""
+        startup_timeline.finish(self.app_data / 'logs')
+
     def download_sample_voices(self):
-        targets = [
-            ("de_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/de_sample.wav"),
-            ("en_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/en_sample.wav"),
-            ("fr_male_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/fr_sample.wav"),
-            ("it_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/it_sample.wav"),
-            ("es_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/es_sample.wav"),
-            ("pt_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/pt_sample.wav"),
-            ("pl_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/pl_sample.wav"),
-            ("zh_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/zh-cn_sample.wav"),
-            ("nl_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/nl_sample.wav"),
-            ("ar_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/ar_sample.wav"),
-            ("ko_female_official.wav", "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples/ko_sample.wav"),
-        ]
-        for fname, url in targets:
-            self._download_file(fname, url)
+        # 無い・壊れているサンプルを並列に取得し、マニフェストと照合する
+        # オフライン環境では config.json の 'sample_mirror_dir' (必要なら 'sample_manifest') を指定
+        downloader = SampleDownloader(
+            self.samples_dir,
+            manifest=self.config.get('sample_manifest'),
+            mirror_dir=self.config.get('sample_mirror_dir'),
+            max_workers=self.config.get('sample_download_workers'),
+            progress_callback=lambda fname, message: self.root.after(0, lambda: self.status_bar.config(text=message))
+        )
+        results = downloader.run()
+        failed = [fname for fname, status in results.items() if status == 'failed']
+        if failed:
+            self.root.after(0, lambda: self.status_bar.config(
+                text=f"⚠️ サンプル音声の取得に失敗: {', '.join(failed)}"))
+
+    def start_coqui_init(self):
+        """Coqui TTSの読み込みを開始（torch / TTS はCoquiが選択・使用されたときに初めて読み込む）"""
+        if self.coqui_model or self.coqui_loading:
+            return
+        if self.engine_var.get() != 'coqui':
+            self.coqui_status_label.config(text="Coqui TTS: 選択時に起動", foreground="gray")
+            return
+        self.coqui_loading = True
+        threading.Thread(target=self.initialize_coqui, daemon=True).start()
 
-    def _download_file(self, fname, url):
-        save_path = self.samples_dir / fname
-        if save_path.exists() and save_path.stat().st_size > 0: return
-        try:
-            headers = {"User-Agent": "Mozilla/5.0"}
-            self.root.after(0, lambda m=f"📥 DL中: {fname}...": self.status_bar.config(text=m))
-            response = requests.get(url, headers=headers, timeout=30)
-            if response.status_code == 200:
-                with open(save_path, 'wb') as f: f.write(response.content)
-        except: pass
+    def on_engine_selected(self):
+        """エンジン切り替え時：UIを更新し、Coqui TTSなら読み込みを開始"""
+        self.update_ui_state()
+        self.start_coqui_init()
+
+    def record_engine_usage(self, engine):
+        """エンジンの利用を記録（次回起動時にウォームアップするエンジンの予測に使う）"""
+        record_usage(self.config.setdefault('engine_usage', {}), engine)
+
+    def start_warmup(self):
+        """最近よく使うエンジンを優先度順にバックグラウンドで読み込み、ダミー推論まで済ませる"""
+        candidates = ['coqui', 'voicevox'] + (['whisper'] if WHISPER_AVAILABLE else [])
+        usage = self.config.get('engine_usage')
+        # 利用履歴がまだ無い場合は選択中のTTSエンジンだけ
+        plan = predict_engines(usage, candidates) if usage else [self.engine_var.get()]
+        if not self.voicevox_speakers and 'voicevox' in plan:
+            plan.remove('voicevox')  # VOICEVOXが起動していない
+        if 'coqui' not in plan and not self.coqui_model and not self.coqui_loading:
+            self.coqui_status_label.config(text="Coqui TTS: 使用時に起動", foreground="gray")
+        if not plan:
+            self._finish_startup_timeline()
+            return
+        
+        self.warmup = WarmupScheduler(
+            progress_callback=lambda name, status: self.root.after(0, lambda: self._on_warmup_progress(name, status)))
+        for engine in plan:
+            if engine == 'coqui':
+                request = self._make_synthesis_request('')
+                self.warmup.add('coqui', lambda cancel: self._warm_up_coqui(cancel, request))
+            elif engine == 'whisper':
+                model_size = self.whisper_model_var.get()
+                profile = self.whisper_profile_var.get()
+                language = self.whisper_language_var.get().split(' - ')[0]
+                self.warmup.add('whisper', lambda cancel: self._warm_up_whisper(cancel, model_size, profile, language))
+            elif engine == 'voicevox':
+                speaker_id = self.get_speaker_id()
+                self.warmup.add('voicevox', lambda cancel: self._warm_up_voicevox(cancel, speaker_id))
+        
+        print(f"[Warmup] Plan: {plan}")
+        self.warmup_cancel_button.config(state='normal')
+        self.warmup_cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.warmup.start()
+        self.root.after(STARTUP_TRACE_TIMEOUT_MS, self._finish_startup_timeline)
+
+    def _warm_up_coqui(self, cancel, request):
+        """Coqui TTSを読み込み、選択中の話者で短い文を1回合成する"""
+        with startup_timeline.phase('warmup_coqui'):
+            if self.coqui_model or self.coqui_loading:
+                return
+            self.coqui_loading = True
+            with startup_timeline.phase('initialize_coqui'):
+                self.initialize_coqui()
+            if not self.coqui_model:
+                raise Exception("Coqui TTSの読み込みに失敗しました")
+            if cancel.is_set() or not request.speaker_wav.is_file():
+                return
+            # 短い合成1回で話者の条件付けも計算・キャッシュされる
+            self.synthesis_service.warm_up(request)
+
+    def _warm_up_whisper(self, cancel, model_size, profile, language):
+        """Whisperモデルを読み込み、無音でダミー推論を1回行う（設定はstart_warmupで読んだもの）"""
+        with startup_timeline.phase('warmup_whisper'):
+            engine = self._new_whisper_engine(model_size, profile)
+            if not engine.load_model():
+                raise Exception("Whisperモデルの読み込みに失敗しました")
+            if not cancel.is_set():
+                engine.warm_up(language)
+        self.root.after(0, lambda: self._adopt_whisper_engine(engine))
+
+    def _adopt_whisper_engine(self, engine):
+        """ウォームアップしたエンジンを使う（メインスレッド）"""
+        # その間にユーザーが作ったエンジンがあればそちらを残す
+        if self.whisper_engine is None:
+            self.whisper_engine = engine
+
+    def _warm_up_voicevox(self, cancel, speaker_id):
+        """VOICEVOXに選択中の話者のモデルを読み込ませる"""
+        with startup_timeline.phase('warmup_voicevox'):
+            self.voicevox_client.initialize_speaker(speaker_id)
+
+    def _on_warmup_progress(self, name, status):
+        """ウォームアップの進捗をステータスバーに表示（メインスレッド）"""
+        labels = {'coqui': 'Coqui TTS', 'whisper': 'Whisper', 'voicevox': 'VOICEVOX'}
+        if status == 'loading':
+            self.status_bar.config(text=f"🔥 {labels[name]} を事前読み込み中...")
+        elif status == 'done':
+            self.warmup_cancel_button.pack_forget()
+            self._finish_startup_timeline()
+            ready = [labels[n] for n, s in self.warmup.results.items() if s == 'ready']
+            if self.warmup.cancelled:
+                self.status_bar.config(text="⏹️ 事前読み込みを中止しました")
+            elif ready:
+                self.status_bar.config(text=f"✓ 準備完了: {', '.join(ready)}")
+            self.warmup = None
+
+    def cancel_warmup(self):
+        """ウォームアップを中止（実行中の読み込みが終わった時点で止まる）"""
+        if self.warmup:
+            self.warmup.cancel()
+            self.warmup_cancel_button.config(state='disabled')
+            self.status_bar.config(text="⏹️ 事前読み込みを中止しています（現在の処理の完了後）...")
 
     def initialize_coqui(self):
         if self.coqui_model: return
@@ -284,9 +428,8 @@ class VoicevoxCoquiGUI:
             self.root.after(0, lambda: self.coqui_status_label.config(text="Coqui TTS: 起動処理中...", foreground="orange"))
             self.root.after(0, lambda: self.status_bar.config(text="🚀 AIエンジンを読み込んでいます（数秒待ちます）..."))
             
-            from TTS.api import TTS
-            self.coqui_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-            if CUDA_AVAILABLE: self.coqui_model.to("cuda")
+            self.coqui_model = tts_engine.load_coqui_model()
+            self.synthesis_service.coqui_model = self.coqui_model
             self.coqui_enabled = True
             
             self.root.after(0, lambda: self.coqui_status_label.config(text="Coqui TTS: 準備完了", foreground="green"))
@@ -297,6 +440,8 @@ class VoicevoxCoquiGUI:
             err_msg = str(e)
             print(f"Coqui Init Error: {err_msg}")
             self.root.after(0, lambda: messagebox.showerror("AIエンジン起動エラー", f"Coqui TTSの起動に失敗しました。\n\nエラー内容:\n{err_msg}"))
+        finally:
+            self.coqui_loading = False
 
     def build_gui(self):
         self.notebook = ttk.Notebook(self.root)
@@ -328,6 +473,8 @@ class VoicevoxCoquiGUI:
         self.voicevox_status_label = ttk.Label(status_frame, text="VOICEVOX: 確認中...")
         self.voicevox_status_label.pack(side=tk.LEFT, padx=10)
         
+        # ウォームアップ中だけ表示
+        self.warmup_cancel_button = ttk.Button(status_frame, text="⏹ 事前読み込みを中止", command=self.cancel_warmup)
         ttk.Button(status_frame, text="🔄 再接続", command=self.reconnect_voicevox_async, width=10).pack(side=tk.LEFT, padx=5)
         ttk.Label(status_frame, text="＊再接続のためVOICEVOXを起動してください", font=("", 8), foreground="gray").pack(side=tk.LEFT, padx=5)
         
@@ -338,8 +485,8 @@ class VoicevoxCoquiGUI:
         default_engine = self.config.get('engine', 'coqui') 
         self.engine_var = tk.StringVar(value=default_engine)
         
-        ttk.Radiobutton(engine_frame, text="Coqui TTS XTTS (ファイル参照型)", variable=self.engine_var, value="coqui", command=self.update_ui_state).pack(side=tk.LEFT, padx=15)
-        ttk.Radiobutton(engine_frame, text="VOICEVOX (内蔵キャラ型)", variable=self.engine_var, value="voicevox", command=self.update_ui_state).pack(side=tk.LEFT, padx=15)
+        ttk.Radiobutton(engine_frame, text="Coqui TTS XTTS (ファイル参照型)", variable=self.engine_var, value="coqui", command=self.on_engine_selected).pack(side=tk.LEFT, padx=15)
+        ttk.Radiobutton(engine_frame, text="VOICEVOX (内蔵キャラ型)", variable=self.engine_var, value="voicevox", command=self.on_engine_selected).pack(side=tk.LEFT, padx=15)
         
         # v2.2 プリセット管理UI
         self.build_preset_ui(main_frame)
@@ -418,7 +565,7 @@ class VoicevoxCoquiGUI:
         
         # プレビューボタン（パラメーター調整時に使いやすい位置）
         ttk.Label(silence_frame, text="").pack(side=tk.LEFT, padx=10)  # スペーサー
-        ttk.Button(silence_frame, text="🔊 プレビュー（30文字）", 
+        ttk.Button(silence_frame, text="🔊 プレビュー", 
                   command=self.preview_voice, width=20).pack(side=tk.LEFT, padx=5)
         ttk.Button(silence_frame, text="❓", 
                   command=self.show_preview_help, width=3).pack(side=tk.LEFT, padx=1)
@@ -501,6 +648,7 @@ class VoicevoxCoquiGUI:
         self.stop_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🔔 ポップアップを復活", command=self.restore_popups).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🔄 設定リセット", command=self.reset_settings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📊 音声キャッシュ", command=self.show_audio_cache_stats).pack(side=tk.LEFT, padx=5)
 
         self.status_bar = ttk.Label(main_frame, text="準備完了", relief=tk.SUNKEN)
         self.status_bar.pack(fill=tk.X, side=tk.BOTTOM)
@@ -525,7 +673,7 @@ class VoicevoxCoquiGUI:
 
     def _reconnect_voicevox(self):
         try:
-            requests.get(f"{self.voicevox_server_url}/version", timeout=2)
+            self.voicevox_client.version(timeout=2)
             self.root.after(0, lambda: self.voicevox_status_label.config(text="VOICEVOX: 接続OK", foreground="green"))
             self.root.after(0, self.refresh_voicevox_speakers)
             self.root.after(0, lambda: messagebox.showinfo("成功", "VOICEVOXエンジンと接続しました！"))
@@ -585,6 +733,22 @@ class VoicevoxCoquiGUI:
                 self.text_input.delete(1.0, tk.END)
                 self.text_input.insert(1.0, f.read())
 
+    def show_audio_cache_stats(self):
+        """合成音声キャッシュの統計を表示 (削除も可能)"""
+        stats = self.audio_cache.stats()
+        total = stats['hits'] + stats['misses']
+        hit_rate = f"{stats['hits'] / total * 100:.0f}%" if total else "-"
+        result = messagebox.askyesno(
+            "音声キャッシュ",
+            f"エントリ数: {stats['entries']}\n"
+            f"サイズ: {stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB\n"
+            f"このセッション: ヒット {stats['hits']}件 / ミス {stats['misses']}件 (ヒット率 {hit_rate})\n\n"
+            f"キャッシュを削除しますか？"
+        )
+        if result:
+            self.audio_cache.clear()
+            self.status_bar.config(text="✅ 音声キャッシュを削除しました")
+
     def reset_settings(self):
         self.speed_var.set(1.0)
         self.pitch_var.set(0.0)
@@ -656,14 +820,23 @@ class VoicevoxCoquiGUI:
         text = self.text_input.get(1.0, tk.END).strip()
         if not text: return
         if self.engine_var.get() == 'coqui' and not self.coqui_enabled:
+            self.start_coqui_init()
             messagebox.showwarning("準備中", "Coqui TTS起動中です。")
             return
-        
-        segments = [s.strip() for s in text.split('\n\n') if s.strip()]
+        self.record_engine_usage(self.engine_var.get())
+        
+        segments = tts_engine.split_segments(text)
+        # Tkの状態はジョブごとにここで1回だけ読み取り、ワーカーにはこの値だけを渡す
+        request = self._make_synthesis_request(text)
+        output_dir = Path(self.output_dir_var.get())
+        engine_name = "CoquiTTS" if request.engine == 'coqui' else "VOICEVOX"
+        fnames = [self.generate_filename(request.speaker_id, i, request.output_format, seg, engine_name)
+                  for i, seg in enumerate(segments, 1)]
         self.generation_stop_flag = False
         self.generate_button.config(state='disabled', text="🎵 生成中...")
         self.stop_button.config(state='normal')
-        threading.Thread(target=self._generate_voice_async, args=(segments,), daemon=True).start()
+        threading.Thread(target=self._generate_voice_async,
+                         args=(request, segments, output_dir, fnames), daemon=True).start()
 
     def generate_filename(self, speaker_id, index, extension, text="", engine="VOICEVOX"):
         pattern = self.filename_pattern_var.get()
@@ -687,38 +860,21 @@ class VoicevoxCoquiGUI:
         
         return f"{fname}.{extension}"
 
-    def _generate_voice_async(self, segments):
+    def _generate_voice_async(self, request, segments, output_dir, fnames):
         try:
-            output_dir = Path(self.output_dir_var.get())
             output_dir.mkdir(parents=True, exist_ok=True)
-            speed = self.speed_var.get()
-            volume = self.volume_var.get()
-            pre_sil = self.pre_silence_var.get()
-            post_sil = self.post_silence_var.get()
-            ext = self.format_var.get()
-            
             self.root.after(0, lambda: self._show_progress_dialog(len(segments)))
             
             count = 0
-            for i, seg in enumerate(segments, 1):
-                if self.generation_stop_flag: break
-                
-                self.root.after(0, lambda p=int((i-1)/len(segments)*100), c=i: self._update_progress(p, f"生成中: {c}/{len(segments)}"))
-                
-                if self.engine_var.get() == 'coqui':
-                    wav = self.run_coqui(seg, speed)
-                    engine_name = "CoquiTTS"
-                else:
-                    wav = self.run_voicevox(seg)
-                    engine_name = "VOICEVOX"
-                
-                audio = self.post_process_audio(wav, volume, pre_sil, post_sil)
-                fname = self.generate_filename(self.get_speaker_id(), i, ext, seg, engine_name)
-                
-                if ext == "mp3": audio.export(output_dir / fname, format="mp3", bitrate="192k")
-                else: audio.export(output_dir / fname, format="wav")
-                self.write_daily_log(fname, seg, output_dir)  # Daily Logger記録
+            pipeline = self.synthesis_service.run_job(
+                request, segments, [output_dir / fname for fname in fnames],
+                should_stop=lambda: self.generation_stop_flag
+            )
+            for i, seg, path in pipeline:
+                # 保存は後処理プールで実行し、ログはここでセグメント順に記録
+                self.write_daily_log(path.name, seg, output_dir)  # Daily Logger記録
                 count += 1
+                self.root.after(0, lambda p=int(i/len(segments)*100), c=i: self._update_progress(p, f"生成中: {c}/{len(segments)}"))
             
             self.root.after(0, lambda: self._update_progress(100, "完了！"))
             self.root.after(0, lambda: self._on_generation_complete(count, len(segments), output_dir))
@@ -800,41 +956,31 @@ class VoicevoxCoquiGUI:
         
         dialog.protocol("WM_DELETE_WINDOW", on_ok)
 
-    def run_coqui(self, text, speed):
-        if not self.coqui_model: raise Exception("Engine initializing...")
-        fname = self.coqui_speaker_var.get()
-        lang = self.language_var.get().split(' - ')[0]
-        temp = self.app_data / "temp.wav"
-        self.coqui_model.tts_to_file(text=text, speaker_wav=str(self.samples_dir / fname), language=lang, file_path=str(temp), speed=speed)
-        with open(temp, 'rb') as f: data = f.read()
-        return data
-
-    def run_voicevox(self, text):
-        sid = self.get_speaker_id()
-        q = requests.post(f"{self.voicevox_server_url}/audio_query?text={urllib.parse.quote(text)}&speaker={sid}").json()
-        q['speedScale'] = self.speed_var.get()
-        q['volumeScale'] = self.volume_var.get()
-        q['pitchScale'] = self.pitch_var.get()
-        q['intonationScale'] = self.intonation_var.get()
-        return requests.post(f"{self.voicevox_server_url}/synthesis?speaker={sid}", json=q).content
-
-    def post_process_audio(self, wav_bytes, volume, pre, post):
-        audio = AudioSegment.from_wav(io.BytesIO(wav_bytes))
-        if volume != 1.0 and volume > 0:
-            import math
-            audio = audio + (20 * math.log10(volume))
-        if pre > 0: audio = AudioSegment.silent(duration=int(pre*1000)) + audio
-        if post > 0: audio = audio + AudioSegment.silent(duration=int(post*1000))
-        return audio
+    def _make_synthesis_request(self, text):
+        """現在の画面の設定からSynthesisRequestを作成（メインスレッドで呼ぶ）"""
+        return SynthesisRequest(
+            engine=self.engine_var.get(),
+            text=text,
+            speaker_id=self.get_speaker_id(),
+            speaker_wav=self.samples_dir / self.coqui_speaker_var.get(),
+            language=self.language_var.get().split(' - ')[0],
+            speed=self.speed_var.get(),
+            volume=self.volume_var.get(),
+            pitch=self.pitch_var.get(),
+            intonation=self.intonation_var.get(),
+            pre_silence=self.pre_silence_var.get(),
+            post_silence=self.post_silence_var.get(),
+            sentence_gap=self.punctuation_silence_var.get(),
+            output_format=self.format_var.get(),
+            sample_rate=self.config.get('output_sample_rate')
+        )
 
     def check_voicevox_connection(self):
-        try: requests.get(f"{self.voicevox_server_url}/version", timeout=1)
-        except: self.voicevox_status_label.config(text="VOICEVOX: 未接続", foreground="red")
+        if not self.voicevox_client.is_available(timeout=1): self.voicevox_status_label.config(text="VOICEVOX: 未接続", foreground="red")
 
     def get_voicevox_speakers(self):
         try:
-            res = requests.get(f"{self.voicevox_server_url}/speakers")
-            return [{'name': f"{s['name']}-{st['name']}", 'id': st['id']} for s in res.json() for st in s['styles']]
+            return [{'name': f"{s['name']}-{st['name']}", 'id': st['id']} for s in self.voicevox_client.speakers() for st in s['styles']]
         except: return []
 
     def get_speaker_id(self):
@@ -1126,7 +1272,10 @@ class VoicevoxCoquiGUI:
                 'seq_digits': self.seq_digits_var.get(),
                 'prefix': self.prefix_var.get(),
                 'language': self.language_var.get(),
-                'show_recording_complete_message': self.show_recording_complete_message
+                'show_recording_complete_message': self.show_recording_complete_message,
+                'live_transcription': self.live_transcription_var.get(),
+                'whisper_profile': self.whisper_profile_var.get(),
+                'whisper_model': self.whisper_model_var.get()
             })
             with open(self.config_file, 'w', encoding='utf-8') as f: json.dump(self.config, f, indent=2)
         except: pass
@@ -1143,6 +1292,9 @@ class VoicevoxCoquiGUI:
             print(f"[Daily Logger] ログ書き込み失敗: {e}")
 
     def on_closing(self):
+        # 録音中ならWAVファイルを正しく閉じる
+        if self.recorder:
+            self.recorder.stop()
         self.save_config()
         self.root.destroy()
 
@@ -1223,6 +1375,14 @@ class VoicevoxCoquiGUI:
         ttk.Label(rec_buttons_frame, textvariable=self.recording_time_var,
                  font=("", 10)).pack(side=tk.LEFT, padx=10)
         
+        # リアルタイム文字起こし
+        live_check = ttk.Checkbutton(rec_buttons_frame, text="📝 リアルタイム文字起こし",
+                                     variable=self.live_transcription_var,
+                                     command=self.save_config)
+        live_check.pack(side=tk.LEFT, padx=10)
+        if not WHISPER_AVAILABLE:
+            live_check.config(state='disabled')
+        
         # 録音ファイル名表示
         self.recording_filename_var = tk.StringVar(value="")
         ttk.Label(self.recording_frame, textvariable=self.recording_filename_var,
@@ -1230,7 +1390,8 @@ class VoicevoxCoquiGUI:
         
         # v2.4 説明追加
         ttk.Label(self.recording_frame, 
-                 text="💡 録音後、「文字起こし開始」ボタンで録音フォルダから選択できます（複数選択可）", 
+                 text="💡 リアルタイム文字起こしをONにすると、話しながら下に結果が表示されます\n"
+                      "    録音後、「文字起こし開始」ボタンで録音フォルダから選択できます（複数選択可）", 
                  foreground="blue", font=("", 9)).pack(fill=tk.X, pady=5)
         
         # 認識設定
@@ -1279,6 +1440,29 @@ class VoicevoxCoquiGUI:
                        variable=self.whisper_format_var, 
                        value='srt').pack(side=tk.LEFT, padx=5)
         
+        # デコードプロファイル
+        profile_frame = ttk.Frame(settings_frame)
+        profile_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(profile_frame, text="プロファイル:", width=10).pack(side=tk.LEFT)
+        
+        profiles = [
+            ('高速 (貪欲法)', 'fast'),
+            ('標準', 'balanced'),
+            ('高精度', 'accurate')
+        ]
+        
+        for text, value in profiles:
+            ttk.Radiobutton(profile_frame, text=text,
+                           variable=self.whisper_profile_var,
+                           value=value,
+                           command=self.update_whisper_profile_info).pack(side=tk.LEFT, padx=5)
+        
+        self.whisper_profile_info_var = tk.StringVar()
+        ttk.Label(settings_frame, textvariable=self.whisper_profile_info_var,
+                 foreground="gray", font=("", 8)).pack(fill=tk.X, pady=2)
+        self.update_whisper_profile_info()
+        
         # 実行ボタン
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
@@ -1373,7 +1557,6 @@ class VoicevoxCoquiGUI:
             
             # 録音開始
             self.is_recording = True
-            self.recording_data = []
             self.recording_start_time = time.time()
             
             # UIの状態変更
@@ -1381,14 +1564,18 @@ class VoicevoxCoquiGUI:
             self.record_stop_button.config(state='normal')
             self.recording_filename_var.set(f"保存先: {filename}")
             
-            # 録音ストリーム開始（16kHz モノラル - Whisperの推奨設定）
-            self.recording_stream = sd.InputStream(
-                samplerate=16000,
-                channels=1,
-                dtype='float32',
-                callback=self.recording_callback
+            # リアルタイム文字起こし（録音の書き込みスレッドからチャンクを受け取る）
+            self.live_transcriber = None
+            self.live_pending = None
+            if self.live_transcription_var.get() and WHISPER_AVAILABLE:
+                self._start_live_transcription()
+            
+            # 録音開始（16kHz モノラル - Whisperの推奨設定、WAVファイルへ直接書き込み）
+            self.recorder = AudioRecorder(
+                self.current_recording_file, samplerate=16000, channels=1,
+                chunk_callback=self._feed_live if self.live_pending is not None else None
             )
-            self.recording_stream.start()
+            self.recorder.start()
             
             # 録音時間の更新を開始
             self.update_recording_time()
@@ -1398,6 +1585,12 @@ class VoicevoxCoquiGUI:
         except Exception as e:
             messagebox.showerror("録音エラー", f"録音を開始できませんでした:\n{str(e)}")
             self.is_recording = False
+            self.recorder = None
+            with self.live_lock:
+                live_transcriber, self.live_transcriber = self.live_transcriber, None
+                self.live_pending = None
+            if live_transcriber:
+                threading.Thread(target=live_transcriber.stop, daemon=True).start()
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
     
@@ -1407,36 +1600,41 @@ class VoicevoxCoquiGUI:
             return
         
         try:
-            # 録音ストリーム停止
-            if self.recording_stream:
-                self.recording_stream.stop()
-                self.recording_stream.close()
-                self.recording_stream = None
+            # 録音停止（バッファの残りを書き出してファイルを閉じる）
+            frames = 0
+            if self.recorder:
+                frames = self.recorder.stop()
+                duration = self.recorder.duration_seconds
+                self.recorder = None
+            
+            # 全チャンクを渡し終えたので、残りの文字起こしと確定をバックグラウンドで行う
+            with self.live_lock:
+                live_transcriber, self.live_transcriber = self.live_transcriber, None
+                self.live_pending = None
+            if live_transcriber:
+                threading.Thread(target=self._finish_live_transcription,
+                                 args=(live_transcriber,), daemon=True).start()
             
             # 録音時間更新の停止
             if self.recording_timer_id:
                 self.root.after_cancel(self.recording_timer_id)
                 self.recording_timer_id = None
             
-            # 録音データを保存
-            if self.recording_data:
-                audio_data = np.concatenate(self.recording_data, axis=0)
-                sf.write(self.current_recording_file, audio_data, 16000)
-                
+            # 録音データは録音中に保存済み
+            if frames:
                 # v2.4: 録音完了（ファイル選択は「文字起こし開始」で行う）
                 
-                duration = time.time() - self.recording_start_time
                 self.status_bar.config(text=f"✅ 録音完了: {duration:.1f}秒")
                 
                 # 録音完了メッセージ（「今後表示しない」オプション付き）
                 if self.show_recording_complete_message:
                     self.show_recording_complete_dialog(self.current_recording_file.name)
             else:
+                self.current_recording_file.unlink(missing_ok=True)
                 self.status_bar.config(text="⚠ 録音データがありません")
             
             # UIの状態をリセット
             self.is_recording = False
-            self.recording_data = []
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
             self.recording_time_var.set("録音時間: 00:00:00")
@@ -1447,14 +1645,91 @@ class VoicevoxCoquiGUI:
             self.record_start_button.config(state='normal')
             self.record_stop_button.config(state='disabled')
     
-    def recording_callback(self, indata, frames, time_info, status):
-        """録音データのコールバック"""
-        if status:
-            print(f"録音ステータス: {status}")
-        
-        if self.is_recording:
-            # 録音データを追加
-            self.recording_data.append(indata.copy())
+    def _start_live_transcription(self):
+        """リアルタイム文字起こしを開始（エンジンの作成・ロードは別スレッドで行う）"""
+        # faster-whisperのインポートでUIが止まらないよう、準備ができるまでチャンクは live_pending にためる
+        self.record_engine_usage('whisper')
+        model_size = self.whisper_model_var.get()
+        profile = self.whisper_profile_var.get()
+        language = self.whisper_language_var.get().split(' - ')[0]
+        
+        result = self.transcription_result
+        result.delete('1.0', tk.END)
+        result.insert(tk.END, f"🎙️ リアルタイム文字起こし（モデル: {self.whisper_model_var.get()}）\n\n")
+        # このマーク以降を更新のたびに書き直す（左グラビティで位置を固定）
+        result.mark_set('live_start', 'end-1c')
+        result.mark_gravity('live_start', tk.LEFT)
+        result.tag_configure('live_partial', foreground='gray')
+        result.insert(tk.END, "⏳ Whisperモデルを読み込み中...", 'live_partial')
+        
+        pending = self.live_pending = []
+        threading.Thread(target=self._prepare_live_transcription,
+                         args=(self.whisper_engine, model_size, profile, language, pending),
+                         daemon=True).start()
+    
+    def _prepare_live_transcription(self, engine, model_size, profile, language, pending):
+        """Whisperエンジンを作成・ロード（別スレッド）"""
+        try:
+            if not engine or engine.model_size != model_size or engine.profile != profile:
+                engine = self._new_whisper_engine(model_size, profile)
+            if not engine.model and not engine.load_model():
+                raise Exception("Whisperモデルの読み込みに失敗しました")
+        except Exception as e:
+            with self.live_lock:
+                if self.live_pending is pending:
+                    self.live_pending = None
+            self.root.after(0, lambda msg=str(e): self.transcription_result.insert(
+                tk.END, f"\n❌ リアルタイム文字起こしに失敗しました: {msg}\n"))
+            return
+        self.root.after(0, lambda: self._on_live_engine_ready(engine, language, pending))
+    
+    def _on_live_engine_ready(self, engine, language, pending):
+        """エンジンの準備ができたら文字起こしを開始し、ためたチャンクを渡す（メインスレッド）"""
+        self.whisper_engine = engine
+        live_transcriber = engine.live_transcriber(
+            language=language,
+            update_callback=lambda committed, partial: self.root.after(
+                0, lambda: self._show_live_transcript(committed, partial))
+        )
+        live_transcriber.start()
+        with self.live_lock:
+            for chunk in pending:
+                live_transcriber.feed(chunk)
+            recording = self.live_pending is pending
+            if recording:
+                self.live_transcriber = live_transcriber
+                self.live_pending = None
+        # 録音がすでに止まっていれば、ためた分を文字起こしして確定
+        if not recording:
+            threading.Thread(target=self._finish_live_transcription,
+                             args=(live_transcriber,), daemon=True).start()
+    
+    def _feed_live(self, chunk):
+        """録音チャンクを文字起こしに渡す（録音の書き込みスレッドから呼ばれる）"""
+        with self.live_lock:
+            if self.live_transcriber:
+                self.live_transcriber.feed(chunk)
+            elif self.live_pending is not None:
+                self.live_pending.append(chunk)
+    
+    def _show_live_transcript(self, committed, partial):
+        """確定済みテキストと未確定テキスト（グレー）を表示"""
+        result = self.transcription_result
+        result.delete('live_start', tk.END)
+        result.insert('live_start', committed)
+        if partial:
+            result.insert(tk.END, partial if committed else partial.lstrip(), 'live_partial')
+        result.see(tk.END)
+    
+    def _finish_live_transcription(self, live_transcriber):
+        """録音停止後に残りを文字起こしして確定（別スレッド）"""
+        try:
+            text = live_transcriber.stop()
+            self.root.after(0, lambda: self._show_live_transcript(text, ''))
+            self.root.after(0, lambda: self.status_bar.config(text="✅ リアルタイム文字起こし完了"))
+        except Exception as e:
+            self.root.after(0, lambda msg=str(e): self.transcription_result.insert(
+                tk.END, f"\n❌ リアルタイム文字起こしに失敗しました: {msg}\n"))
     
     def update_recording_time(self):
         """録音時間の更新"""
@@ -1560,6 +1835,7 @@ class VoicevoxCoquiGUI:
         
         if not file_paths:
             return  # キャンセルされた
+        self.record_engine_usage('whisper')
         
         # 選択されたファイルを保存
         self.selected_audio_files = file_paths
@@ -1572,6 +1848,36 @@ class VoicevoxCoquiGUI:
         # バックグラウンドで実行
         threading.Thread(target=self._transcribe_worker, daemon=True).start()
     
+    def update_whisper_profile_info(self):
+        """選択中のデコードプロファイルの説明と実測速度を表示"""
+        descriptions = {
+            'fast': '貪欲法・前文脈なし。内容をざっと確認したいとき向け',
+            'balanced': 'ビームサーチ。精度と速度のバランスが良い',
+            'accurate': '認識に失敗した区間は温度を上げて再デコード。最も遅い'
+        }
+        profile = self.whisper_profile_var.get()
+        info = descriptions.get(profile, '')
+        
+        rtf = self.whisper_engine.measured_rtf(profile) if self.whisper_engine else None
+        if rtf:
+            info += f"  |  実測 ({self.whisper_engine.model_size}): 実時間の{1 / rtf:.1f}倍速"
+        elif self.whisper_engine:
+            info += "  |  実測値なし"
+        self.whisper_profile_info_var.set(info)
+    
+    def _new_whisper_engine(self, model_size, profile):
+        """現在の設定でWhisperエンジンを作成（モデルは未ロード）"""
+        # 'auto' は長い音声だけバッチ推論に切り替える
+        return WhisperEngine(
+            model_size=model_size,
+            device='auto',
+            cache=self.transcription_cache,
+            rtf_history=self.whisper_rtf_history,
+            mode=self.config.get('whisper_inference_mode', 'auto'),
+            batch_size=self.config.get('whisper_batch_size', WhisperEngine.DEFAULT_BATCH_SIZE),
+            profile=profile
+        )
+    
     def _transcribe_worker(self):
         """v2.4 文字起こし処理（複数ファイル対応・自動保存）"""
         try:
@@ -1579,65 +1885,86 @@ class VoicevoxCoquiGUI:
             
             # Whisperエンジン初期化
             if not self.whisper_engine or \
-               self.whisper_engine.model_size != self.whisper_model_var.get():
+               self.whisper_engine.model_size != self.whisper_model_var.get() or \
+               self.whisper_engine.profile != self.whisper_profile_var.get():
                 self.root.after(0, lambda: self.transcription_result.insert(
                     tk.END, "🔧 Whisperエンジンを初期化中...\n"))
                 self.root.after(0, lambda: self.transcription_result.see(tk.END))
                 
-                self.whisper_engine = WhisperEngine(
-                    model_size=self.whisper_model_var.get(),
-                    device='auto'
-                )
+                self.whisper_engine = self._new_whisper_engine(self.whisper_model_var.get(),
+                                                               self.whisper_profile_var.get())
             
             # 設定取得
             language = self.whisper_language_var.get().split(' - ')[0]
             output_format = self.whisper_format_var.get()
             total_files = len(self.selected_audio_files)
             
+            # 保存先（タイムスタンプはファイル名に使う）
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            ext = "srt" if output_format == "srt" else "txt"
+            output_dir = Path(self.stt_output_dir_var.get())
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # 各ファイルは文字起こししながらセグメントごとに書き込み、最後に統合する
+            part_files = [output_dir / f"{timestamp}_{i}.{ext}.part" for i in range(1, total_files + 1)]
+            
             # 全結果を統合
             all_results = []
             success_count = 0
             failed_files = []
             
-            # ファイルごとに処理
-            for i, file_path in enumerate(self.selected_audio_files, 1):
+            # 進捗コールバック
+            def progress_callback(message):
+                self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, f"  {m}\n"))
+                self.root.after(0, lambda: self.transcription_result.see(tk.END))
+            
+            # 認識されたセグメントをその場で表示
+            def segment_callback(file_path, segment):
+                line = f"  [{Path(file_path).name}] {segment.text.strip()}\n"
+                self.root.after(0, lambda l=line: self.transcription_result.insert(tk.END, l))
+                self.root.after(0, lambda: self.transcription_result.see(tk.END))
+            
+            # 過去の処理速度から所要時間を見積もって表示
+            estimate, total_audio = self.whisper_engine.estimate_batch_seconds(self.selected_audio_files)
+            if estimate is not None:
+                message = f"⏱ 推定処理時間: 約{format_duration(estimate)}（音声 合計{format_duration(total_audio)}）\n"
+                self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, m))
+            
+            # 文字起こし実行（複数ファイルを並列処理、結果は選択順で返る）
+            results = self.whisper_engine.transcribe_many(
+                self.selected_audio_files,
+                language=language,
+                output_format=output_format,
+                workers=self.config.get('whisper_workers', 2),
+                progress_callback=progress_callback,
+                segment_callback=segment_callback,
+                output_paths=part_files
+            )
+            
+            # ファイルごとに結果を集計
+            for i, (file_path, result, part_file) in enumerate(
+                    zip(self.selected_audio_files, results, part_files), 1):
                 file_path = Path(file_path)
                 
                 # 進捗表示
                 self.root.after(0, lambda i=i, t=total_files, n=file_path.name: 
                               self.transcription_result.insert(tk.END, f"\n[{i}/{t}] {n}\n"))
-                self.root.after(0, lambda: self.transcription_result.see(tk.END))
                 
-                try:
-                    # 進捗コールバック
-                    def progress_callback(message):
-                        self.root.after(0, lambda m=message: self.transcription_result.insert(tk.END, f"  {m}\n"))
-                        self.root.after(0, lambda: self.transcription_result.see(tk.END))
-                    
-                    # 文字起こし実行
-                    result = self.whisper_engine.transcribe(
-                        file_path,
-                        language=language,
-                        output_format=output_format,
-                        progress_callback=progress_callback
-                    )
-                    
-                    all_results.append(result)
-                    success_count += 1
-                    
-                    self.root.after(0, lambda: self.transcription_result.insert(tk.END, "✅ 完了\n"))
-                    
-                except Exception as e:
-                    failed_files.append(f"{file_path.name}: {str(e)}")
-                    self.root.after(0, lambda e=e: self.transcription_result.insert(
+                if isinstance(result, Exception):
+                    failed_files.append(f"{file_path.name}: {str(result)}")
+                    self.root.after(0, lambda e=result: self.transcription_result.insert(
                         tk.END, f"❌ エラー: {str(e)}\n"))
+                    continue
+                
+                with open(part_file, 'r', encoding='utf-8') as f:
+                    all_results.append(f.read().rstrip('\n'))
+                success_count += 1
+                
+                self.root.after(0, lambda: self.transcription_result.insert(tk.END, "✅ 完了\n"))
             
             # 結果を統合（1行空けて連結）
             combined_result = "\n\n".join(all_results)
             
             # ファイル名生成（タイムスタンプ + 内容の先頭20文字）
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
             # 内容の先頭20文字を取得（ファイル名に使用可能な文字のみ）
             first_text = combined_result[:20].strip()
             # 無効な文字を除去（英数字、日本語、一部記号のみ）
@@ -1655,18 +1982,12 @@ class VoicevoxCoquiGUI:
                     safe_text += c
             safe_text = safe_text.replace(' ', '_')[:20]
             
-            # 拡張子
-            ext = "srt" if output_format == "srt" else "txt"
-            
             # ファイル名
             if safe_text:
                 filename = f"{timestamp}_{safe_text}.{ext}"
             else:
                 filename = f"{timestamp}.{ext}"
             
-            # 保存先
-            output_dir = Path(self.stt_output_dir_var.get())
-            output_dir.mkdir(parents=True, exist_ok=True)
             output_file = output_dir / filename
             
             # 同名ファイルがある場合は連番
@@ -1679,9 +2000,15 @@ class VoicevoxCoquiGUI:
                 output_file = output_dir / filename
                 counter += 1
             
-            # ファイルに保存
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(combined_result)
+            # ファイルに保存（1ファイルなら書き込み済みのものをそのまま使い、複数なら1行空けて連結）
+            successful_parts = [p for p, r in zip(part_files, results) if not isinstance(r, Exception)]
+            if len(successful_parts) == 1:
+                successful_parts[0].replace(output_file)
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(combined_result)
+            for part_file in part_files:
+                part_file.unlink(missing_ok=True)
             
             # 結果表示
             self.root.after(0, lambda: self.transcription_result.insert(tk.END, "\n" + "="*60 + "\n"))
@@ -1694,6 +2021,8 @@ class VoicevoxCoquiGUI:
                 summary += f"失敗: {len(failed_files)}件\n"
                 for failed in failed_files:
                     summary += f"  - {failed}\n"
+            cache_stats = self.transcription_cache.stats()
+            summary += f"キャッシュ: ヒット {cache_stats['hits']}件 / ミス {cache_stats['misses']}件\n"
             summary += f"\n💾 保存先: {output_file}\n\n"
             
             self.root.after(0, lambda s=summary: self.transcription_result.insert(tk.END, s))
@@ -1712,6 +2041,7 @@ class VoicevoxCoquiGUI:
         finally:
             self.root.after(0, lambda: self.transcribe_button.config(state='normal'))
             self.root.after(0, lambda: self.transcribe_stop_button.config(state='disabled'))
+            self.root.after(0, self.update_whisper_profile_info)
     
     def stop_transcription(self):
         """文字起こし停止 (現在は未実装)"""
@@ -2158,32 +2488,88 @@ class VoicevoxCoquiGUI:
     # ==========================================
     
     def preview_voice(self):
-        """最初の30文字だけ生成してプレビュー再生"""
+        """テキストを文ごとに合成しながら順に再生 (ストリーミングプレビュー)"""
+        # 再生中にもう一度押されたら停止
+        if self.preview_player is not None:
+            self.preview_player.stop()
+            return
+        
         try:
             full_text = self.text_input.get('1.0', tk.END).strip()
             if not full_text:
                 messagebox.showwarning("警告", "テキストを入力してください")
                 return
             
-            preview_text = full_text[:30].strip()
+            if self.engine_var.get() == 'coqui' and not self.coqui_enabled:
+                self.start_coqui_init()
+                messagebox.showwarning("準備中", "Coqui TTS起動中です。")
+                return
+            self.record_engine_usage(self.engine_var.get())
+            
+            if not RECORDING_AVAILABLE:
+                # sounddeviceが無い場合は従来の30文字のファイル再生
+                self._preview_voice_file(full_text[:30].strip())
+                return
+            
+            request = self._make_synthesis_request(full_text)
+            chunks = self.synthesis_service.stream(request)
+            
+            self.preview_player = StreamPlayer()
+            self.status_bar.config(text="🔊 プレビュー再生中...（もう一度押すと停止）")
+            threading.Thread(
+                target=self._stream_preview_worker,
+                args=(self.preview_player, chunks, request),
+                daemon=True
+            ).start()
+            
+        except Exception as e:
+            messagebox.showerror("エラー", f"プレビュー生成エラー:\n{str(e)}")
+            self.status_bar.config(text="✗ プレビュー失敗")
+    
+    def _stream_preview_worker(self, player, chunks, request):
+        """合成できたチャンクから順に再生 (バックグラウンドスレッド)"""
+        error = None
+        try:
+            for i, wav in enumerate(chunks):
+                # チャンクごとにピーク正規化すると音量が揃わないため正規化しない
+                audio = tts_engine.post_process_audio(wav, request.volume, request.pre_silence if i == 0 else 0, 0,
+                                                      normalize=False)
+                if not player.play(audio):
+                    break
+                if i == 0:
+                    ms = player.first_audio_seconds * 1000
+                    self.root.after(0, lambda: self.status_bar.config(text=f"🔊 プレビュー再生中（最初の音声まで {ms:.0f} ms）"))
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+            player.stop()
+        finally:
+            chunks.close()
+            player.close()
+            self.root.after(0, lambda: self._on_stream_preview_done(player, error))
+    
+    def _on_stream_preview_done(self, player, error):
+        """ストリーミングプレビュー終了時の処理"""
+        self.preview_player = None
+        if error:
+            messagebox.showerror("エラー", f"プレビュー生成エラー:\n{error}")
+            self.status_bar.config(text="✗ プレビュー失敗")
+        elif player.stopped:
+            self.status_bar.config(text="⏹ プレビューを停止しました")
+        else:
+            self.status_bar.config(text="✓ プレビュー再生完了")
+    
+    def _preview_voice_file(self, preview_text):
+        """最初の30文字だけ生成してファイル経由で再生 (sounddeviceが無い場合)"""
+        try:
             if not preview_text:
                 return
             
             self.status_bar.config(text="🔊 プレビュー生成中...")
             self.root.update()
             
-            engine = self.engine_var.get()
-            speed = self.speed_var.get()
-            
-            if engine == 'voicevox':
-                wav_bytes = self.run_voicevox(preview_text)
-            else:
-                wav_bytes = self.run_coqui(preview_text, speed)
-            
-            volume = self.volume_var.get()
-            pre_sil = self.pre_silence_var.get()
-            post_sil = self.post_silence_var.get()
-            audio = self.post_process_audio(wav_bytes, volume, pre_sil, post_sil)
+            request = self._make_synthesis_request(preview_text)
+            audio = self.synthesis_service.post_process(request, self.synthesis_service.synthesize(request))
             
             temp_file = self.app_data / "preview_temp.wav"
             audio.export(temp_file, format="wav")
@@ -2213,34 +2599,33 @@ class VoicevoxCoquiGUI:
         messagebox.showinfo(
             "プレビュー機能の使い方",
             "【プレビューとは？】\n"
-            "設定を確認するために、最初の30文字だけを\n"
-            "高速で音声生成＆再生する機能です。\n\n"
+            "設定を確認するために、テキストを文ごとに合成しながら\n"
+            "できた部分から順に再生する機能です。\n\n"
             "【特徴】\n"
-            "・生成時間: 約3秒（全文生成は数十秒）\n"
-            "・生成範囲: 最初の30文字のみ\n"
+            "・再生開始: 数百ミリ秒で最初の音声が流れます\n"
+            "・生成範囲: 全文（もう一度押すと停止）\n"
             "・設定反映: 速度、音量、ピッチ、話者など全設定を反映\n"
-            "・自動再生: 生成後すぐに再生\n"
             "・何度でもOK: 設定を変えて何度でも試せる\n\n"
-            "【保存場所】\n"
-            "一時ファイル: user_data/preview_temp.wav\n"
+            "【保存について】\n"
             "※ 出力フォルダには保存されません\n"
             "※ Daily Loggerにも記録されません\n"
-            "※ 何度実行しても上書きされます\n\n"
+            "※ sounddeviceが無い環境では最初の30文字を\n"
+            "   user_data/preview_temp.wav 経由で再生します\n\n"
             "【本番生成との違い】\n"
             "┌────────────┬─────────┬─────────┐\n"
             "│ 項目       │ プレビュー│ 本番生成 │\n"
             "├────────────┼─────────┼─────────┤\n"
-            "│ 生成範囲   │ 30文字   │ 全文     │\n"
-            "│ 保存先     │ 一時     │ 出力先   │\n"
+            "│ 再生開始   │ すぐ     │ 全文生成後│\n"
+            "│ 保存先     │ なし     │ 出力先   │\n"
             "│ Logger記録 │ なし     │ あり     │\n"
-            "│ ファイル名 │ 固定     │ 連番     │\n"
+            "│ ファイル名 │ なし     │ 連番     │\n"
             "│ 用途       │ 設定確認 │ 最終出力 │\n"
             "└────────────┴─────────┴─────────┘\n\n"
             "【使い方】\n"
             "1. テキスト入力（全文でOK）\n"
             "2. 設定を調整（速度、音量、話者等）\n"
             "3. 「🔊 プレビュー」クリック\n"
-            "4. 自動再生 → 設定を確認\n"
+            "4. 再生 → 設定を確認（途中で止めるにはもう一度クリック）\n"
             "5. 気に入らなければ設定変更して再プレビュー\n"
             "6. OK！ → 「🎵 音声生成開始」で本番生成\n\n"
             "【便利な使い方】\n"
@@ -2248,15 +2633,8 @@ class VoicevoxCoquiGUI:
             "・話者変更: めたん → ずんだもん → つむぎ\n"
             "・音量確認: 小さすぎる/大きすぎるを確認\n"
             "・言語確認: Coqui TTSの発音をチェック\n\n"
-            "【時間節約の例】\n"
-            "全文生成で試行錯誤:\n"
-            "  60秒 × 5回 = 300秒（5分）\n"
-            "プレビューで試行錯誤:\n"
-            "  3秒 × 5回 = 15秒\n"
-            "→ 285秒（約5分）節約！\n\n"
             "【ヒント】\n"
             "・設定が決まったらプリセット保存すると便利\n"
-            "・30文字以下のテキストでも動作します\n"
             "・エラーが出たら設定を見直してください"
         )
     
@@ -2299,20 +2677,20 @@ class VoicevoxCoquiGUI:
                 if not self.whisper_engine or self.whisper_engine.model_size != model_size:
                     self.root.after(0, lambda: self.transcription_result.insert(
                         tk.END, f"🔧 Whisperエンジンを初期化中（{model_size}）...\n"))
-                    self.whisper_engine = WhisperEngine(model_size=model_size, device='auto')
+                    self.whisper_engine = WhisperEngine(model_size=model_size, device='auto',
+                                                        cache=self.transcription_cache,
+                                                        rtf_history=self.whisper_rtf_history)
                 
                 for i, file_path in enumerate(file_paths, 1):
                     file_path = Path(file_path)
                     self.root.after(0, lambda i=i, t=total, n=file_path.name: 
                                   self.transcription_result.insert(tk.END, f"\n[{i}/{t}] {n}\n"))
                     
-                    result = self.whisper_engine.transcribe(file_path, language=language, output_format=output_format)
-                    
                     # 拡張子を.txtに統一（output_formatが"text"でも.txtで保存）
                     ext = "txt" if output_format == "text" else output_format
                     output_file = output_dir / f"{file_path.stem}.{ext}"
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(result)
+                    self.whisper_engine.transcribe_to_file(file_path, output_file, language=language,
+                                                           output_format=output_format)
                     
                     self.root.after(0, lambda f=output_file: 
                                   self.transcription_result.insert(tk.END, f"  ✓ 保存: {f.name}\n"))
@@ -2678,6 +3056,13 @@ if __name__ == "__main__":
     style = ttk.Style()
     if 'vista' in style.theme_names(): style.theme_use('vista')
     app = VoicevoxCoquiGUI(root)
+    
+    def _on_mainloop_started():
+        startup_timeline.mark('mainloop_started')
+        # ウィンドウの描画直前: メインスレッドのプロファイルはここまで
+        if startup_profile:
+            startup_profile.stop(app.app_data / 'logs')
+    root.after(0, _on_mainloop_started)
     try:
         if pyi_splash.is_alive(): pyi_splash.close()
     except NameError: pass
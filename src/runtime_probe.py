@@ -0,0 +1,109 @@
+"""
+runtime_probe.py
+
+重いライブラリを読み込まずに実行環境を調べる・遅延インポートの計測
+
+torch / TTS / faster-whisper は起動時には読み込まず、初めて使うときに
+timed_importで読み込んで所要時間を記録する。CUDAの有無はtorchを
+読み込む代わりにctypesでドライバを直接呼んで判定する。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+import ctypes
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+# モジュール名 -> インポートにかかった秒数
+IMPORT_TIMINGS = {}
+_import_lock = threading.Lock()
+
+
+def timed_import(name):
+    """
+    モジュールをインポートし、かかった時間を記録
+
+    Args:
+        name: モジュール名 (例: 'torch', 'TTS.api')
+
+    Returns:
+        module: インポートしたモジュール
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    # 複数スレッドから同時に初回インポートされても計測は1回にする
+    with _import_lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed = time.perf_counter() - started
+
+    IMPORT_TIMINGS[name] = elapsed
+    print(f"[Import] {name}: {elapsed * 1000:.0f} ms")
+    return module
+
+
+def is_installed(name):
+    """
+    モジュールをインポートせずにインストール済みか調べる
+
+    Args:
+        name: トップレベルのモジュール名
+
+    Returns:
+        bool: 見つかればTrue
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def probe_cuda():
+    """
+    CUDAドライバをctypesで呼び出し、GPUの有無と名前を調べる (torchを読み込まない)
+
+    ドライバがあってもtorch / CTranslate2がCPU版の場合があるため、
+    実際にGPUを使うかどうかは各エンジンのロード時に改めて判定する。
+
+    Returns:
+        tuple: (GPUがあればTrue, 1台目のGPU名 または None)
+    """
+    if sys.platform == 'win32':
+        library_names = ['nvcuda.dll']
+    elif sys.platform == 'darwin':
+        return False, None
+    else:
+        library_names = ['libcuda.so.1', 'libcuda.so']
+
+    for library_name in library_names:
+        try:
+            cuda = ctypes.CDLL(library_name)
+        except OSError:
+            continue
+
+        try:
+            if cuda.cuInit(0) != 0:
+                return False, None
+            count = ctypes.c_int(0)
+            if cuda.cuDeviceGetCount(ctypes.byref(count)) != 0 or count.value == 0:
+                return False, None
+
+            device = ctypes.c_int(0)
+            name = ctypes.create_string_buffer(256)
+            if cuda.cuDeviceGet(ctypes.byref(device), 0) != 0 or \
+               cuda.cuDeviceGetName(name, len(name), device) != 0:
+                return True, None
+            return True, name.value.decode('utf-8', errors='replace')
+        except AttributeError:
+            return False, None
+
+    return False, None
@@ -0,0 +1,437 @@
+"""
+sample_downloader.py
+
+XTTS用サンプル音声の並列・再開可能ダウンロード
+
+マニフェストに載っているサンプル音声を複数スレッドで同時にダウンロードする。
+受信データは .part ファイルへ逐次書き込み、途中で切れた場合は次回Rangeリクエストで
+続きから再開する。完了後にSHA-256を照合し、一致したものだけを正式なファイル名に
+置き換えるため、壊れたWAVがCoqui TTSに渡ることはない。
+ネットワークに出られない環境では、ローカルのミラーフォルダから同じ手順で取り込める。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+
+import requests
+
+
+_HF_SAMPLES = "https://huggingface.co/coqui/XTTS-v2/resolve/main/samples"
+
+# 組み込みのマニフェスト
+# sha256 / size を固定したマニフェストは同梱の sample_manifest.json (write_manifestで作成) を優先する。
+# 固定値が無いファイルだけ、サーバーのX-Linked-Etag / X-Linked-Size で照合する
+BUNDLED_MANIFEST = Path(__file__).with_name('sample_manifest.json')
+DEFAULT_MANIFEST = [
+    {'file': "de_female_official.wav", 'url': f"{_HF_SAMPLES}/de_sample.wav"},
+    {'file': "en_female_official.wav", 'url': f"{_HF_SAMPLES}/en_sample.wav"},
+    {'file': "fr_male_official.wav", 'url': f"{_HF_SAMPLES}/fr_sample.wav"},
+    {'file': "it_female_official.wav", 'url': f"{_HF_SAMPLES}/it_sample.wav"},
+    {'file': "es_female_official.wav", 'url': f"{_HF_SAMPLES}/es_sample.wav"},
+    {'file': "pt_female_official.wav", 'url': f"{_HF_SAMPLES}/pt_sample.wav"},
+    {'file': "pl_female_official.wav", 'url': f"{_HF_SAMPLES}/pl_sample.wav"},
+    {'file': "zh_female_official.wav", 'url': f"{_HF_SAMPLES}/zh-cn_sample.wav"},
+    {'file': "nl_female_official.wav", 'url': f"{_HF_SAMPLES}/nl_sample.wav"},
+    {'file': "ar_female_official.wav", 'url': f"{_HF_SAMPLES}/ar_sample.wav"},
+    {'file': "ko_female_official.wav", 'url': f"{_HF_SAMPLES}/ko_sample.wav"},
+]
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def default_manifest():
+    """
+    組み込みのマニフェスト (同梱の sample_manifest.json があればそちら)
+
+    Returns:
+        list: エントリのリスト
+    """
+    if BUNDLED_MANIFEST.exists():
+        return load_manifest(BUNDLED_MANIFEST)
+    return DEFAULT_MANIFEST
+
+
+def write_manifest(path, samples_dir, entries=None):
+    """
+    検証済みのサンプル音声から sha256 / size を固定したマニフェストを作成
+
+    配布前に正しいファイルが揃った samples フォルダで実行し、結果を
+    sample_manifest.json として同梱する。
+
+    Args:
+        path: 書き出すマニフェストのパス
+        samples_dir: 正しいサンプル音声が揃ったフォルダ
+        entries: 元にするエントリ (省略時は組み込みのマニフェスト)
+
+    Returns:
+        list: 書き出したエントリ
+
+    Raises:
+        FileNotFoundError: フォルダにないファイルがある場合
+    """
+    samples_dir = Path(samples_dir)
+    pinned = []
+    for entry in entries or DEFAULT_MANIFEST:
+        sample = samples_dir / entry['file']
+        pinned.append(dict(entry, sha256=_file_sha256(sample), size=sample.stat().st_size))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'files': pinned}, f, indent=2)
+    return pinned
+
+
+def load_manifest(path):
+    """
+    マニフェストJSONを読み込む
+
+    形式は [{"file": ..., "url": ..., "sha256": ..., "size": ...}, ...] 、
+    または {"files": [...]} 。url / sha256 / size は省略可。
+
+    Args:
+        path: マニフェストファイル
+
+    Returns:
+        list: エントリのリスト
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('files', []) if isinstance(data, dict) else data
+    for entry in entries:
+        if not entry.get('file'):
+            raise ValueError(f"Manifest entry without 'file': {entry}")
+    return entries
+
+
+def _file_sha256(path):
+    """ファイルのSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _looks_like_wav(path):
+    """
+    チェックサムが無い場合の確認 (WAVの構造が最後まで揃っているか)
+
+    RIFFヘッダーのサイズがファイルサイズと一致し、fmt / data チャンクがファイル内に
+    収まっていることを確認する。途中で切れたファイルはここで弾かれる。
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:] != b'WAVE':
+                return False
+            file_size = os.fstat(f.fileno()).st_size
+            if struct.unpack('<I', header[4:8])[0] + 8 not in (file_size, file_size - 1):
+                return False
+
+            chunks = set()
+            position = 12
+            while position + 8 <= file_size:
+                f.seek(position)
+                chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+                position += 8 + chunk_size + (chunk_size & 1)
+                if position > file_size + 1:
+                    return False
+                chunks.add(chunk_id)
+    except (OSError, struct.error):
+        return False
+    return b'fmt ' in chunks and b'data' in chunks
+
+
+def _remote_sha256(response):
+    """
+    レスポンス (リダイレクト前を含む) のヘッダーからSHA-256を取得
+
+    Hugging FaceのLFSファイルは X-Linked-Etag にSHA-256が入っている。
+    """
+    for r in list(response.history) + [response]:
+        for name in ('X-Linked-Etag', 'ETag'):
+            value = r.headers.get(name, '').strip()
+            value = value[2:] if value.startswith('W/') else value
+            value = value.strip('"').lower()
+            if _SHA256_RE.match(value):
+                return value
+    return None
+
+
+def _remote_size(response):
+    """レスポンスのヘッダーからファイル全体のサイズを取得 (不明ならNone)"""
+    for r in list(response.history) + [response]:
+        if r.headers.get('X-Linked-Size', '').isdigit():
+            return int(r.headers['X-Linked-Size'])
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+        return int(content_range.rsplit('/', 1)[1])
+    if response.status_code == 200 and response.headers.get('Content-Length', '').isdigit():
+        return int(response.headers['Content-Length'])
+    return None
+
+
+class SampleDownloader:
+    """
+    サンプル音声のダウンローダー
+
+    検証済みファイルのサイズ・更新時刻・SHA-256を samples/.verified.json に記録し、
+    2回目以降の起動ではハッシュを計算し直さずに済ませる。
+    """
+
+    MAX_WORKERS = 4
+    MAX_ATTEMPTS = 3
+    CHUNK_SIZE = 64 * 1024
+    TIMEOUT = (10, 30)  # (接続, 受信) 秒
+    HEADERS = {"User-Agent": "Mozilla/5.0"}
+    STATE_FILE = ".verified.json"
+
+    def __init__(self, samples_dir, manifest=None, mirror_dir=None, max_workers=None,
+                 progress_callback=None):
+        """
+        初期化
+
+        Args:
+            samples_dir: 保存先フォルダ (user_data/samples)
+            manifest: マニフェストJSONのパス (Noneなら組み込み、ミラーにmanifest.jsonがあればそれ)
+            mirror_dir: ローカルのミラーフォルダ (指定時はネットワークを使わない)
+            max_workers: 同時ダウンロード数
+            progress_callback: 進捗通知 callback(file, message)
+        """
+        self.samples_dir = Path(samples_dir)
+        self.samples_dir.mkdir(parents=True, exist_ok=True)
+        self.mirror_dir = Path(mirror_dir) if mirror_dir else None
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.progress_callback = progress_callback
+
+        if manifest:
+            self.entries = load_manifest(manifest)
+        elif self.mirror_dir and (self.mirror_dir / 'manifest.json').exists():
+            self.entries = load_manifest(self.mirror_dir / 'manifest.json')
+        else:
+            self.entries = default_manifest()
+
+        self.errors = {}
+        self._state_path = self.samples_dir / self.STATE_FILE
+        self._state = self._load_state()
+        self._lock = threading.Lock()
+
+    def _load_state(self):
+        try:
+            with open(self._state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        try:
+            with open(self._state_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+        except OSError as e:
+            print(f"[SampleDownloader] State save failed: {e}")
+
+    def _record(self, path, sha256):
+        stat = path.stat()
+        with self._lock:
+            self._state[path.name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+    def _forget(self, name):
+        with self._lock:
+            self._state.pop(name, None)
+
+    def _notify(self, name, message):
+        if self.progress_callback:
+            try:
+                self.progress_callback(name, message)
+            except Exception as e:
+                print(f"[SampleDownloader] progress_callback failed: {e}")
+
+    def run(self):
+        """
+        マニフェストの全ファイルを揃える
+
+        Returns:
+            dict: ファイル名 -> 'ok' (検証済み) / 'downloaded' / 'unverified' (照合先なし) / 'failed'
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sample-dl') as pool:
+            results = dict(zip(
+                (entry['file'] for entry in self.entries),
+                pool.map(self._ensure, self.entries)
+            ))
+        self._save_state()
+
+        counts = {}
+        for status in results.values():
+            counts[status] = counts.get(status, 0) + 1
+        summary = ", ".join(f"{status} {count}" for status, count in sorted(counts.items()))
+        print(f"[SampleDownloader] {summary} ({time.perf_counter() - started:.1f}s)")
+        for name, error in self.errors.items():
+            print(f"[SampleDownloader] {name}: {error}")
+        return results
+
+    def _ensure(self, entry):
+        """1ファイル分 (既存ファイルの確認 → 取得 → 照合)"""
+        name = entry['file']
+        dest = self.samples_dir / name
+        expected = (entry.get('sha256') or '').lower() or None
+        # 固定値が無ければ、以前に照合済みのSHA-256を使う (ヘッダーを返さないミラー・プロキシ向け)
+        pinned = expected or self._state.get(name, {}).get('sha256')
+
+        try:
+            if dest.exists():
+                status = self._check_existing(dest, expected)
+                if status:
+                    return status
+                self._forget(name)
+                print(f"[SampleDownloader] {name}: checksum mismatch, downloading again")
+                dest.unlink()
+
+            last_error = None
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                try:
+                    self._notify(name, f"📥 DL: {name}...")
+                    return self._fetch(entry, dest, pinned)
+                except (requests.RequestException, OSError, ValueError) as e:
+                    last_error = e
+                    response = getattr(e, 'response', None)
+                    if response is not None and 400 <= response.status_code < 500:
+                        break  # 404などは再試行しても変わらない
+                    if attempt < self.MAX_ATTEMPTS:
+                        time.sleep(attempt)
+            raise last_error
+        except Exception as e:
+            self.errors[name] = str(e)
+            return 'failed'
+
+    def _check_existing(self, dest, expected):
+        """
+        既存ファイルが正しいか確認
+
+        Returns:
+            str: 'ok' / 'unverified' (正しい、または確認できない) 、再取得が必要ならNone
+        """
+        stat = dest.stat()
+        record = self._state.get(dest.name)
+        if record and record.get('size') == stat.st_size and record.get('mtime_ns') == stat.st_mtime_ns \
+           and (expected is None or record.get('sha256') == expected):
+            return 'ok'
+
+        actual = _file_sha256(dest)
+        if expected is None:
+            # 前のバージョンで保存したファイル (途中で切れている可能性がある) は照合先を問い合わせる
+            try:
+                expected = self._source_sha256(dest.name)
+            except (requests.RequestException, OSError):
+                return 'unverified' if _looks_like_wav(dest) else None
+            if expected is None:
+                return 'unverified' if _looks_like_wav(dest) else None
+
+        if actual != expected:
+            return None
+        self._record(dest, actual)
+        return 'ok'
+
+    def _source_sha256(self, name):
+        """ダウンロードせずに取得元のSHA-256を調べる (ミラーはファイルから計算)"""
+        entry = next(e for e in self.entries if e['file'] == name)
+        if self.mirror_dir:
+            source = self._mirror_source(entry)
+            return _file_sha256(source) if source else None
+        response = requests.head(entry['url'], headers=self.HEADERS, timeout=self.TIMEOUT,
+                                 allow_redirects=True)
+        response.raise_for_status()
+        return _remote_sha256(response)
+
+    def _mirror_source(self, entry):
+        """ミラーフォルダ内の対応ファイル (保存名かURLのファイル名で探す)"""
+        candidates = [entry['file']]
+        if entry.get('url'):
+            candidates.append(Path(urlparse(entry['url']).path).name)
+        for candidate in candidates:
+            path = self.mirror_dir / candidate
+            if path.is_file():
+                return path
+        return None
+
+    def _fetch(self, entry, dest, expected):
+        """
+        .part へ取得してから照合し、正式なファイル名に置き換える
+
+        Returns:
+            str: 'downloaded' / 'unverified'
+        """
+        part = dest.with_name(dest.name + '.part')
+        if self.mirror_dir:
+            source = self._mirror_source(entry)
+            if source is None:
+                raise FileNotFoundError(f"Not found in mirror: {self.mirror_dir}")
+            shutil.copyfile(source, part)
+            actual = _file_sha256(part)
+            expected_size = entry.get('size')
+        else:
+            actual, remote_sha256, expected_size = self._download(entry['url'], part)
+            expected = expected or remote_sha256
+            expected_size = entry.get('size') or expected_size
+
+        size = part.stat().st_size
+        if (expected and actual != expected) or (expected_size and size != expected_size):
+            part.unlink()
+            raise ValueError(f"Checksum mismatch ({size} bytes, sha256 {actual[:12]}...)")
+        if not expected and not _looks_like_wav(part):
+            part.unlink()
+            raise ValueError("Downloaded file is not a WAV file")
+
+        os.replace(part, dest)
+        if expected:
+            self._record(dest, actual)
+            return 'downloaded'
+        return 'unverified'
+
+    def _download(self, url, part):
+        """
+        URLから .part へストリーミング保存 (既存の .part があればRangeで続きから)
+
+        Returns:
+            tuple: (受信したファイル全体のSHA-256, サーバーが示すSHA-256, 全体サイズ)
+        """
+        digest = hashlib.sha256()
+        offset = part.stat().st_size if part.exists() else 0
+        headers = dict(self.HEADERS)
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+
+        with requests.get(url, headers=headers, timeout=self.TIMEOUT, stream=True) as response:
+            if response.status_code == 416:
+                # .part はすでに最後まで受信済み
+                with open(part, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                return digest.hexdigest(), _remote_sha256(response), _remote_size(response)
+            response.raise_for_status()
+
+            if response.status_code == 206 and offset:
+                # 受信済みの部分をハッシュに含めてから追記する
+                with open(part, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                mode = 'ab'
+            else:
+                mode = 'wb'
+
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+
+            return digest.hexdigest(), _remote_sha256(response), _remote_size(response)
@@ -0,0 +1,245 @@
+"""
+startup_profiler.py
+
+起動処理のタイムライン記録とプロファイル
+
+各フェーズ (FFmpeg設定・設定読み込み・GUI構築・サンプル音声のダウンロード・
+エンジン初期化など) の開始・終了時刻を記録し、user_data/logs に
+JSON (Chrome Trace Event形式、chrome://tracing や Perfetto で表示可能) で保存する。
+--profile-startup 指定時は pyinstrument (無ければ cProfile) でメインスレッドの
+起動処理も計測する。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import sys
+import threading
+import time
+
+from runtime_probe import IMPORT_TIMINGS
+
+
+# ウォームアップが終わらなくても、開始からこの時間でタイムラインを書き出す
+STARTUP_TRACE_TIMEOUT_MS = 120000
+
+
+class StartupTimeline:
+    """
+    起動フェーズのタイムライン
+
+    時刻はすべてこのオブジェクトの作成時 (= モジュールの初回インポート時) からの経過。
+    finish()で書き出した後に始まったフェーズは記録しない。
+    """
+
+    MAX_TRACE_FILES = 20  # logsフォルダに残すトレースの数
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.phases = []  # (name, thread, start, end)
+        self.marks = []   # (name, thread, at)
+        self.trace_path = None
+        self._lock = threading.Lock()
+
+    def _now(self):
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name):
+        """
+        with文で囲んだ処理をフェーズとして記録
+
+        Args:
+            name: フェーズ名 (例: 'build_gui')
+        """
+        start = self._now()
+        try:
+            yield
+        finally:
+            end = self._now()
+            with self._lock:
+                if self.trace_path is None:
+                    self.phases.append((name, threading.current_thread().name, start, end))
+
+    def mark(self, name):
+        """
+        ある時点を記録 (例: 'mainloop_started')
+
+        Args:
+            name: マーカー名
+        """
+        at = self._now()
+        with self._lock:
+            if self.trace_path is None:
+                self.marks.append((name, threading.current_thread().name, at))
+
+    def to_dict(self):
+        """
+        Chrome Trace Event形式の辞書に変換 (集計値も含む)
+
+        Returns:
+            dict: traceEvents と phases_ms / marks_ms / lazy_imports_ms などの集計
+        """
+        with self._lock:
+            phases = list(self.phases)
+            marks = list(self.marks)
+
+        threads = {}
+        events = []
+        for name, thread, start, end in phases:
+            events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(),
+                'tid': threads.setdefault(thread, len(threads)),
+                'ts': round(start * 1e6), 'dur': round((end - start) * 1e6)
+            })
+        for name, thread, at in marks:
+            events.append({
+                'name': name, 'ph': 'i', 's': 'g', 'pid': os.getpid(),
+                'tid': threads.setdefault(thread, len(threads)),
+                'ts': round(at * 1e6)
+            })
+        for thread, tid in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                           'args': {'name': thread}})
+
+        # 同名のフェーズ (sleepなど) は合計する
+        phases_ms = {}
+        for name, _, start, end in phases:
+            phases_ms[name] = phases_ms.get(name, 0.0) + (end - start) * 1000
+
+        ends = [end for _, _, _, end in phases] + [at for _, _, at in marks]
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'frozen': bool(getattr(sys, 'frozen', False)),
+            'total_ms': round(max(ends, default=0.0) * 1000, 1),
+            'phases_ms': {name: round(ms, 1) for name, ms in phases_ms.items()},
+            'marks_ms': {name: round(at * 1000, 1) for name, _, at in marks},
+            'lazy_imports_ms': {name: round(seconds * 1000, 1) for name, seconds in IMPORT_TIMINGS.items()}
+        }
+
+    def finish(self, log_dir):
+        """
+        タイムラインをJSONに書き出す (2回目以降は何もしない)
+
+        Args:
+            log_dir: 保存先フォルダ (user_data/logs)
+
+        Returns:
+            Path: 保存したファイル (失敗時・書き出し済みならNone)
+        """
+        data = self.to_dict()
+        log_dir = Path(log_dir)
+        path = log_dir / f"startup_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        with self._lock:
+            if self.trace_path is not None:
+                return None
+            self.trace_path = path
+
+        try:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"[StartupTimeline] Save failed: {e}")
+            return None
+
+        summary = ", ".join(f"{name} {ms:.0f}ms" for name, ms in data['phases_ms'].items())
+        print(f"[StartupTimeline] {data['total_ms']:.0f} ms ({summary}) -> {path}")
+        self._prune(log_dir)
+        return path
+
+    def _prune(self, log_dir):
+        """古いトレースを削除"""
+        traces = sorted(log_dir.glob("startup_*.json"))
+        for old in traces[:-self.MAX_TRACE_FILES]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+# プロセス共有のタイムライン (GUIの最初のインポートで作成される)
+startup_timeline = StartupTimeline()
+
+
+class StartupProfiler:
+    """
+    メインスレッドの起動処理をプロファイルする (--profile-startup)
+
+    pyinstrumentがあればHTMLレポート、無ければcProfileの .prof と
+    累積時間順の上位を .txt に保存する。
+    """
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+            self.kind = 'pyinstrument'
+            self._profiler = Profiler()
+        except ImportError:
+            import cProfile
+            self.kind = 'cProfile'
+            self._profiler = cProfile.Profile()
+        self._stopped = False
+
+    def start(self):
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        print(f"[StartupProfiler] Profiling startup with {self.kind}")
+
+    def stop(self, log_dir):
+        """
+        計測を終了して結果を保存
+
+        Args:
+            log_dir: 保存先フォルダ (user_data/logs)
+
+        Returns:
+            Path: 保存したファイル (2回目以降はNone)
+        """
+        if self._stopped:
+            return None
+        self._stopped = True
+
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        stem = log_dir / f"startup_profile_{startup_timeline.started_at.strftime('%Y%m%d_%H%M%S')}"
+
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            path = stem.with_suffix('.html')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        else:
+            import pstats
+            self._profiler.disable()
+            path = stem.with_suffix('.prof')
+            self._profiler.dump_stats(str(path))
+            with open(stem.with_suffix('.txt'), 'w', encoding='utf-8') as f:
+                stats = pstats.Stats(self._profiler, stream=f)
+                stats.sort_stats('cumulative').print_stats(50)
+
+        print(f"[StartupProfiler] Saved: {path}")
+        return path
+
+
+def start_profiler():
+    """
+    起動プロファイルを開始
+
+    Returns:
+        StartupProfiler: stop(log_dir)で結果を保存する
+    """
+    profiler = StartupProfiler()
+    profiler.start()
+    return profiler
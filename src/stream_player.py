@@ -0,0 +1,82 @@
+"""
+stream_player.py
+
+sounddeviceによるストリーミング再生
+
+合成が終わったチャンクから順に出力デバイスへ書き込み、全文の合成を
+待たずに再生を始める (プレビュー用)。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+import threading
+import time
+
+
+class StreamPlayer:
+    """AudioBufferを受け取り次第、途切れないように順に再生するプレーヤー"""
+
+    BLOCK_SECONDS = 0.1  # 停止要求を確認する間隔
+
+    def __init__(self):
+        self.sample_rate = None
+        self.channels = None
+        self.started_at = time.perf_counter()
+        self.first_audio_seconds = None
+        self._stream = None
+        self._stopped = threading.Event()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def play(self, audio):
+        """
+        チャンクを再生キューに書き込む (書き込めるまでブロックする)
+
+        Args:
+            audio: AudioBuffer (最初のチャンクのサンプリングレートで出力を開く)
+
+        Returns:
+            bool: 停止要求があればFalse
+        """
+        import sounddevice as sd
+
+        if self.stopped:
+            return False
+
+        if self._stream is None:
+            self.sample_rate = audio.sample_rate
+            self.channels = audio.channels
+            self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=self.channels,
+                                           dtype='float32')
+            self._stream.start()
+        elif audio.sample_rate != self.sample_rate:
+            raise ValueError(f"サンプリングレートが途中で変わりました: {self.sample_rate} → {audio.sample_rate}")
+
+        if self.first_audio_seconds is None:
+            self.first_audio_seconds = time.perf_counter() - self.started_at
+
+        block = max(1, int(self.sample_rate * self.BLOCK_SECONDS))
+        samples = audio.samples
+        for start in range(0, samples.shape[0], block):
+            if self.stopped:
+                return False
+            self._stream.write(samples[start:start + block])
+        return True
+
+    def stop(self):
+        """再生を中断する (別スレッドから呼んでよい)"""
+        self._stopped.set()
+
+    def close(self):
+        """残りを再生し終えてから閉じる (停止要求があれば即座に閉じる)"""
+        if self._stream is None:
+            return
+        if self.stopped:
+            self._stream.abort()
+        else:
+            self._stream.stop()
+        self._stream.close()
+        self._stream = None
@@ -0,0 +1,266 @@
+"""
+synthesis_service.py
+
+Tkに依存しない音声合成サービス
+
+GUIはジョブの開始時にTk変数を1回だけ読んで不変のSynthesisRequestを作り、
+合成・後処理・保存のワーカーにはそれだけを渡す。ワーカーがTkに触れないため、
+複数スレッドから同時に合成しても競合せず、GUIを使わないCLIやベンチマークからも
+同じ処理を呼び出せる。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from collections import namedtuple
+from pathlib import Path
+import threading
+
+from audio_buffer import concat_waveforms, concat_wav_bytes
+import tts_engine
+
+
+class SynthesisRequest(namedtuple('SynthesisRequest', [
+        'engine', 'text', 'speaker_id', 'speaker_wav', 'language', 'speed', 'volume', 'pitch',
+        'intonation', 'pre_silence', 'post_silence', 'sentence_gap', 'output_format', 'sample_rate'],
+        defaults=(1, None, 'ja', 1.0, 1.0, 0.0, 1.0, 0.1, 0.1, 0.3, 'wav', None))):
+    """
+    1回の合成ジョブの設定 (不変)
+
+    engine: 'voicevox' または 'coqui'
+    text: 合成するテキスト (セグメントごとの要求は with_text で作る)
+    speaker_id: VOICEVOXの話者 (スタイル) ID
+    speaker_wav: Coqui TTSのリファレンス音声ファイル
+    language: Coqui TTSの言語コード
+    speed, volume, pitch, intonation: 音声パラメータ (pitch / intonation はVOICEVOXのみ)
+    pre_silence, post_silence: 前後の無音 (秒)
+    sentence_gap: Coqui TTSで文をつなぐ無音 (秒)
+    output_format: 'wav' または 'mp3'
+    sample_rate: 出力のサンプリングレート (Noneなら元のまま)
+    """
+
+    __slots__ = ()
+
+    def with_text(self, text):
+        """テキストだけを差し替えた要求"""
+        return self._replace(text=text)
+
+    def cache_params(self):
+        """
+        AudioCacheのキーに使うパラメータ
+
+        前後の無音と出力形式は合成後に適用するため含めない。
+
+        Returns:
+            dict: 合成結果に影響するパラメータ
+        """
+        if self.engine == 'coqui':
+            speaker_wav = Path(self.speaker_wav) if self.speaker_wav else None
+            return {
+                'engine': 'coqui',
+                'coqui_speaker': speaker_wav.name if speaker_wav else None,
+                # 同じ名前のまま差し替えたリファレンス音声はキャッシュを無効にする
+                'coqui_speaker_mtime': speaker_wav.stat().st_mtime if speaker_wav and speaker_wav.is_file() else None,
+                'language': self.language,
+                'speed': self.speed,
+                'punctuation_silence': self.sentence_gap
+            }
+        return {
+            'engine': 'voicevox',
+            'voicevox_speaker_id': self.speaker_id,
+            'speed': self.speed,
+            'volume': self.volume,
+            'pitch': self.pitch,
+            'intonation': self.intonation
+        }
+
+
+class SynthesisService:
+    """
+    SynthesisRequestを受け取って合成するサービス
+
+    エンジン (VoicevoxClient / Coqui TTSモデル) とキャッシュを保持する。
+    XTTSモデルはスレッドセーフではないため、Coqui TTSの推論はロックで1つずつ実行する。
+    """
+
+    def __init__(self, voicevox_client=None, coqui_model=None, latent_cache=None,
+                 audio_cache=None, voicevox_max_in_flight=4):
+        """
+        初期化
+
+        Args:
+            voicevox_client: VoicevoxClient
+            coqui_model: ロード済みのCoqui TTSモデル (後から設定してもよい)
+            latent_cache: SpeakerLatentCache
+            audio_cache: AudioCache (Noneならキャッシュしない)
+            voicevox_max_in_flight: VOICEVOXで同時に合成するセグメント数
+        """
+        self.voicevox_client = voicevox_client
+        self.coqui_model = coqui_model
+        self.latent_cache = latent_cache
+        self.audio_cache = audio_cache
+        self.voicevox_max_in_flight = voicevox_max_in_flight
+        self._coqui_lock = threading.Lock()
+
+    def synthesize(self, request):
+        """
+        要求のテキストを合成 (audio_cacheがあればキャッシュを使う)
+
+        Args:
+            request: SynthesisRequest
+
+        Returns:
+            bytes (VOICEVOXのWAVデータ) または Waveform (Coqui TTS)
+        """
+        if self.audio_cache is None:
+            return self._synthesize(request)
+        synthesize = self.audio_cache.cached(lambda text: self._synthesize(request.with_text(text)),
+                                             **request.cache_params())
+        return synthesize(request.text)
+
+    def _synthesize(self, request):
+        if request.engine == 'coqui':
+            with self._coqui_lock:
+                return tts_engine.run_coqui(self.coqui_model, request.text, request.speaker_wav,
+                                            request.language, request.speed, self.latent_cache,
+                                            request.sentence_gap)
+        return tts_engine.run_voicevox(self.voicevox_client, request.text, request.speaker_id,
+                                       speed=request.speed, volume=request.volume,
+                                       pitch=request.pitch, intonation=request.intonation)
+
+    def stream(self, request):
+        """
+        ストリーミング合成 (プレビュー用)
+
+        audio_cacheにあればキャッシュのWAVデータを1チャンクで返す。無ければ合成しながら返し、
+        最後まで読み切った場合だけ全体をつないでキャッシュに保存する (途中で閉じたら保存しない)。
+        文ごとの合成をつないだ音声はsynthesizeの結果とは異なるため、キーに mode='stream' を
+        含めて別のエントリにする (プレビューの有無で生成されるファイルが変わらないように)。
+        Coqui TTSはストリームを最後まで読むか閉じるまでモデルを占有する。
+
+        Args:
+            request: SynthesisRequest
+
+        Yields:
+            bytes または Waveform: 再生順のチャンク
+        """
+        if self.audio_cache is None:
+            yield from self._stream(request)
+            return
+
+        key = self.audio_cache.make_key(request.text, mode='stream', **request.cache_params())
+        wav = self.audio_cache.get(key)
+        if wav is not None:
+            yield wav
+            return
+
+        chunks = []
+        for chunk in self._stream(request):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            # Coqui TTSは文の間の無音もチャンクとして返るので、そのままつなげばよい
+            if hasattr(chunks[0], 'to_wav_bytes'):
+                self.audio_cache.put(key, concat_waveforms(chunks).to_wav_bytes())
+            else:
+                self.audio_cache.put(key, concat_wav_bytes(chunks))
+
+    def _stream(self, request):
+        if request.engine == 'coqui':
+            with self._coqui_lock:
+                yield from tts_engine.iter_coqui_stream(
+                    self.coqui_model, request.text, request.speaker_wav, request.language,
+                    request.speed, self.latent_cache, request.sentence_gap)
+        else:
+            yield from tts_engine.iter_voicevox_stream(
+                self.voicevox_client, request.text, request.speaker_id,
+                speed=request.speed, volume=request.volume,
+                pitch=request.pitch, intonation=request.intonation)
+
+    def warm_up(self, request):
+        """
+        Coqui TTSで短い文を1回合成し、初回の推論で発生する初期化を済ませる (キャッシュしない)
+
+        Args:
+            request: 話者・言語を指定したSynthesisRequest
+        """
+        if request.engine != 'coqui':
+            return
+        with self._coqui_lock:
+            tts_engine.warm_up_coqui(self.coqui_model, request.speaker_wav, request.language, self.latent_cache)
+
+    def post_process(self, request, wav, normalize=True):
+        """
+        要求の音量・前後の無音・サンプリングレートを適用
+
+        Returns:
+            AudioBuffer: 処理済み音声
+        """
+        return tts_engine.post_process_audio(wav, request.volume, request.pre_silence, request.post_silence,
+                                             sample_rate=request.sample_rate, normalize=normalize)
+
+    def synthesize_to_file(self, request, path):
+        """
+        合成して後処理し、ファイルに保存
+
+        Args:
+            request: SynthesisRequest
+            path: 保存先パス
+
+        Returns:
+            Path: 保存したファイル
+        """
+        audio = self.post_process(request, self.synthesize(request))
+        tts_engine.export_audio(audio, path, request.output_format)
+        return Path(path)
+
+    def run_job(self, request, segments, output_paths, should_stop=None):
+        """
+        セグメントを並行して合成・保存 (結果はセグメント順)
+
+        保存は後処理スレッドで先行するため、中断・失敗した時点で保存済みでも
+        まだ返していないセグメントがありうる。呼び出し側がログに残せないそれらの
+        ファイルは、終了時に削除する (返したファイルだけが残る)。
+
+        Args:
+            request: ジョブ全体の設定 (textは使わず、セグメントごとに差し替える)
+            segments: テキストセグメントのリスト
+            output_paths: セグメントごとの保存先 (segmentsと同じ順)
+            should_stop: Trueを返すと未着手のセグメントを破棄して終了する関数
+
+        Yields:
+            tuple: (index, segment, 保存したPath)  indexは1始まり
+        """
+        max_in_flight = 1 if request.engine == 'coqui' else self.voicevox_max_in_flight
+        unreturned = {}  # index -> 保存済みでまだ返していないPath
+        lock = threading.Lock()
+
+        def finalize(index, segment, wav):
+            path = Path(output_paths[index - 1])
+            tts_engine.export_audio(self.post_process(request, wav), path, request.output_format)
+            with lock:
+                unreturned[index] = path
+            return path
+
+        pipeline = tts_engine.synthesize_pipeline(
+            segments,
+            lambda segment: self.synthesize(request.with_text(segment)),
+            finalize,
+            max_in_flight=max_in_flight,
+            should_stop=should_stop
+        )
+        try:
+            for index, segment, path in pipeline:
+                with lock:
+                    unreturned.pop(index, None)
+                yield index, segment, path
+        finally:
+            # 実行中の保存が終わるのを待ってから、返していないファイルを削除
+            pipeline.close()
+            with lock:
+                leftovers = list(unreturned.values())
+            for path in leftovers:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
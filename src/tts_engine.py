@@ -0,0 +1,522 @@
+"""
+tts_engine.py
+
+VOICEVOX / Coqui TTS による音声合成と後処理 (tkinter非依存)
+
+GUIとヘッドレスCLIの両方から使う合成処理をまとめたモジュール。
+torch / TTS はCoqui TTSのモデルを初めてロードするときに読み込む。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from pydub import AudioSegment
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+from audio_buffer import AudioBuffer, Waveform, concat_waveforms
+from runtime_probe import timed_import
+
+
+COQUI_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+# XTTSが1回の推論で扱える文字数の目安 (TTS/tts/layers/xtts/tokenizer.py の char_limits)
+XTTS_CHAR_LIMITS = {
+    'en': 250, 'de': 253, 'fr': 273, 'es': 239, 'it': 213, 'pt': 203, 'pl': 224,
+    'zh': 82, 'zh-cn': 82, 'ar': 166, 'cs': 186, 'ru': 182, 'nl': 251, 'tr': 226,
+    'ja': 71, 'hu': 224, 'ko': 95, 'hi': 150
+}
+DEFAULT_CHAR_LIMIT = 200
+
+# 文末: 全角の句点・感嘆符・疑問符は直後で、半角は後ろに空白が続く場合だけ区切る
+_SENTENCE_END = re.compile(r'(?<=[。！？…])|(?<=[.!?])(?=\s)|\n+')
+# 1文が長すぎる場合の区切り (読点・カンマ・セミコロン・コロン)
+_CLAUSE_END = re.compile(r'(?<=[、，,;；:：])')
+# 文末と誤認しやすい英語の略語
+_ABBREVIATION = re.compile(r'\b(Mr|Mrs|Ms|Dr|Prof|St|Jr|Sr|vs|etc|e\.g|i\.e|No)\.$', re.IGNORECASE)
+# これより短い文は次の文とまとめて合成する (短すぎると発音が不安定になるため)
+MIN_CHUNK_CHARS = 8
+
+
+def resource_path(relative_path):
+    """exe化された環境(_MEIPASS)でも正しくパスを取得する"""
+    if hasattr(sys, '_MEIPASS'):
+        return Path(sys._MEIPASS) / relative_path
+    return Path(__file__).parent / relative_path
+
+
+def setup_ffmpeg():
+    """同梱のffmpegがあればpydubに設定する"""
+    ffmpeg_exe = resource_path("ffmpeg/ffmpeg.exe")
+    ffprobe_exe = resource_path("ffmpeg/ffprobe.exe")
+
+    if ffmpeg_exe.exists():
+        AudioSegment.converter = str(ffmpeg_exe)
+        AudioSegment.ffmpeg = str(ffmpeg_exe)
+        AudioSegment.ffprobe = str(ffprobe_exe)
+        print(f"Local FFmpeg loaded: {ffmpeg_exe}")
+    else:
+        print("Local FFmpeg not found. Using system default.")
+
+
+def patch_torch_load():
+    """torch.loadのweights_onlyを既定でFalseにする (XTTSのチェックポイント読み込み用)"""
+    torch = timed_import('torch')
+    if getattr(torch.load, '_rogoai_patched', False):
+        return
+
+    original_load = torch.load
+
+    def _patched_load(*args, **kwargs):
+        if 'weights_only' not in kwargs:
+            kwargs['weights_only'] = False
+        return original_load(*args, **kwargs)
+
+    _patched_load._rogoai_patched = True
+    torch.load = _patched_load
+
+
+def load_coqui_model(use_cuda=None):
+    """
+    Coqui TTS (XTTS v2) モデルをロード (torch / TTS はここで初めて読み込む)
+
+    Args:
+        use_cuda: TrueならGPUに載せる (Noneならtorchで使えるか判定)
+
+    Returns:
+        TTS: ロード済みモデル
+    """
+    patch_torch_load()
+    if use_cuda is None:
+        use_cuda = timed_import('torch').cuda.is_available()
+    TTS = timed_import('TTS.api').TTS
+    model = TTS(COQUI_MODEL_NAME)
+    if use_cuda:
+        model.to("cuda")
+    return model
+
+
+# ウォームアップで合成する短い文 (無い言語は英語)
+WARMUP_TEXTS = {'ja': "こんにちは。", 'en': "Hello there."}
+
+
+def warm_up_coqui(model, speaker_wav, language='en', latent_cache=None):
+    """
+    短い文を1回合成して、初回の推論で発生する初期化を先に済ませる
+
+    話者の条件付けもここで計算されるため、latent_cacheを渡せば
+    最初の合成ではリファレンス音声の解析も省ける。結果の波形は捨てる。
+
+    Args:
+        model: ロード済みのTTSモデル
+        speaker_wav: 話者のリファレンス音声ファイル
+        language: 言語コード
+        latent_cache: SpeakerLatentCache
+    """
+    if language not in WARMUP_TEXTS:
+        language = 'en'
+    for _ in iter_coqui_chunks(model, WARMUP_TEXTS[language], speaker_wav, language, 1.0, latent_cache):
+        pass
+
+
+class SpeakerLatentCache:
+    """
+    XTTSの話者条件付け (GPT conditioning latent / speaker embedding) のキャッシュ
+
+    リファレンス音声のパス・サイズ・更新日時をキーに、メモリとディスクに保存する。
+    セグメントごとにリファレンス音声を読み込み直して埋め込みを再計算するのを防ぐ。
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        初期化
+
+        Args:
+            cache_dir: ディスクキャッシュの保存先 (例: user_data/samples/.latents)
+                       Noneならメモリのみ
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @staticmethod
+    def make_key(speaker_wav):
+        """
+        キャッシュキーを作成 (ファイルを差し替えるとキーが変わる)
+
+        Returns:
+            str: SHA-256のキー
+        """
+        path = Path(speaker_wav).resolve()
+        stat = path.stat()
+        raw = json.dumps([str(path), stat.st_size, stat.st_mtime_ns])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, xtts, speaker_wav):
+        """
+        話者の条件付けを取得 (無ければ計算して保存)
+
+        Args:
+            xtts: XTTSモデル (TTS.synthesizer.tts_model)
+            speaker_wav: リファレンス音声ファイル
+
+        Returns:
+            tuple: (gpt_cond_latent, speaker_embedding)
+        """
+        key = self.make_key(speaker_wav)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # 同じ話者の二重計算を防ぐ (別の話者の計算やキャッシュヒットはブロックしない)
+        with key_lock:
+            with self._lock:
+                if key in self._memory:
+                    return self._memory[key]
+
+            torch = timed_import('torch')
+            latents = None
+            entry_path = self.cache_dir / f"{key}.pt" if self.cache_dir else None
+            if entry_path and entry_path.exists():
+                try:
+                    data = torch.load(entry_path, map_location=xtts.device)
+                    latents = (data['gpt_cond_latent'], data['speaker_embedding'])
+                except Exception as e:
+                    print(f"[SpeakerLatentCache] Load failed: {e}")
+
+            if latents is None:
+                latents = xtts.get_conditioning_latents(audio_path=[str(speaker_wav)])
+                if entry_path:
+                    temp_path = entry_path.with_suffix(".tmp")
+                    try:
+                        torch.save({'gpt_cond_latent': latents[0], 'speaker_embedding': latents[1]}, temp_path)
+                        os.replace(temp_path, entry_path)
+                    except OSError as e:
+                        print(f"[SpeakerLatentCache] Save failed: {e}")
+
+            with self._lock:
+                self._memory[key] = latents
+                self._key_locks.pop(key, None)
+            return latents
+
+
+def get_xtts(model):
+    """TTSオブジェクトから低レベルのXTTSモデルを取り出す (XTTS以外はNone)"""
+    xtts = getattr(getattr(model, 'synthesizer', None), 'tts_model', None)
+    if xtts is not None and hasattr(xtts, 'get_conditioning_latents'):
+        return xtts
+    return None
+
+
+def split_segments(text):
+    """
+    テキストを空行区切りのセグメントに分割
+
+    Args:
+        text: 入力テキスト
+
+    Returns:
+        list: 空でないセグメントのリスト
+    """
+    return [s.strip() for s in text.split('\n\n') if s.strip()]
+
+
+def split_sentences(text, language='ja'):
+    """
+    テキストをXTTSの文字数上限に収まるチャンクに分割 (日本語・英語・中国語の句読点に対応)
+
+    基本は1文1チャンク。上限を超える文は読点などで、それでも長ければ
+    (英語などは空白の位置で) 強制的に区切る。短すぎる文と略語で終わる文は
+    上限の範囲で次の文とまとめる。
+
+    Args:
+        text: 入力テキスト
+        language: 言語コード ('ja', 'en', 'zh-cn', etc.)
+
+    Returns:
+        list: チャンクのリスト
+    """
+    limit = XTTS_CHAR_LIMITS.get(language.lower(), DEFAULT_CHAR_LIMIT)
+    joiner = "" if language.lower() in ('ja', 'zh', 'zh-cn', 'ko') else " "
+
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= limit:
+            pieces.append(sentence)
+            continue
+        for clause in _CLAUSE_END.split(sentence):
+            clause = clause.strip()
+            while len(clause) > limit:
+                cut = clause.rfind(" ", 0, limit) if joiner else -1
+                cut = cut if cut > 0 else limit
+                pieces.append(clause[:cut].strip())
+                clause = clause[cut:].strip()
+            if clause:
+                pieces.append(clause)
+
+    chunks = []
+    for piece in pieces:
+        mergeable = chunks and (len(chunks[-1]) < MIN_CHUNK_CHARS or _ABBREVIATION.search(chunks[-1]))
+        if mergeable and len(chunks[-1]) + len(joiner) + len(piece) <= limit:
+            chunks[-1] = chunks[-1] + joiner + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def iter_coqui_chunks(model, text, speaker_wav, language, speed, latent_cache=None):
+    """
+    テキストをチャンクに分けて順に合成 (最初のチャンクから順に波形を返す)
+
+    Args:
+        run_coquiと同じ
+
+    Yields:
+        Waveform: チャンクごとのfloat32の波形
+    """
+    if not model: raise Exception("Engine initializing...")
+    chunks = split_sentences(text, language)
+    xtts = get_xtts(model)
+    if latent_cache is not None and xtts is not None:
+        # 話者の条件付けは1回だけ計算し、全チャンクで使い回す
+        gpt_cond_latent, speaker_embedding = latent_cache.get(xtts, speaker_wav)
+        sample_rate = xtts.config.audio.output_sample_rate
+        for chunk in chunks:
+            out = xtts.inference(chunk, language, gpt_cond_latent, speaker_embedding,
+                                 speed=speed, enable_text_splitting=False)
+            yield Waveform(out['wav'], sample_rate)
+        return
+
+    sample_rate = model.synthesizer.output_sample_rate
+    for chunk in chunks:
+        samples = model.tts(text=chunk, speaker_wav=str(speaker_wav), language=language,
+                            speed=speed, split_sentences=False)
+        yield Waveform(samples, sample_rate)
+
+
+def iter_coqui_stream(model, text, speaker_wav, language, speed, latent_cache=None, sentence_gap=0.3):
+    """
+    Coqui TTSのストリーミング合成 (プレビュー用)
+
+    XTTSのinference_streamで、文ごとに生成途中の波形を少しずつ返す。
+    条件付けのキャッシュが無い場合はチャンク単位の合成で代用する。
+
+    Args:
+        run_coquiと同じ
+
+    Yields:
+        Waveform: 再生順のfloat32の波形 (文の間の無音を含む)
+    """
+    import numpy as np
+
+    def silence(sample_rate):
+        return Waveform(np.zeros(int(max(sentence_gap, 0) * sample_rate), dtype=np.float32), sample_rate)
+
+    if not model: raise Exception("Engine initializing...")
+    xtts = get_xtts(model)
+    if latent_cache is None or xtts is None or not hasattr(xtts, 'inference_stream'):
+        for i, wave in enumerate(iter_coqui_chunks(model, text, speaker_wav, language, speed, latent_cache)):
+            if i:
+                yield silence(wave.sample_rate)
+            yield wave
+        return
+
+    gpt_cond_latent, speaker_embedding = latent_cache.get(xtts, speaker_wav)
+    sample_rate = xtts.config.audio.output_sample_rate
+    for i, sentence in enumerate(split_sentences(text, language)):
+        if i:
+            yield silence(sample_rate)
+        for piece in xtts.inference_stream(sentence, language, gpt_cond_latent, speaker_embedding,
+                                           speed=speed, enable_text_splitting=False):
+            piece = piece.cpu().numpy() if hasattr(piece, 'cpu') else piece
+            yield Waveform(piece, sample_rate)
+
+
+def iter_voicevox_stream(client, text, speaker_id, max_in_flight=2, **params):
+    """
+    VOICEVOXで文ごとに合成して順に返す (プレビュー用)
+
+    再生中に次の文を先に合成しておくため、max_in_flight件まで並行してリクエストする。
+
+    Args:
+        client: VoicevoxClient
+        text: 合成するテキスト
+        speaker_id: 話者 (スタイル) ID
+        max_in_flight: 同時に合成する文の数
+        **params: run_voicevoxに渡す音声パラメータ
+
+    Yields:
+        bytes: 文ごとのWAVデータ
+    """
+    sentences = split_sentences(text, 'ja')
+    pipeline = synthesize_pipeline(
+        sentences,
+        lambda sentence: run_voicevox(client, sentence, speaker_id, **params),
+        lambda index, sentence, wav: wav,
+        max_in_flight=max_in_flight
+    )
+    for _, _, wav in pipeline:
+        yield wav
+
+
+def run_coqui(model, text, speaker_wav, language, speed, latent_cache=None, sentence_gap=0.3):
+    """
+    Coqui TTSで音声合成
+
+    文単位のチャンクに分けて合成し、チャンクの間にsentence_gap秒の無音を入れて
+    つなぐ。latent_cacheを渡すと、キャッシュした話者の条件付けでXTTSの推論APIを直接呼ぶ。
+
+    Args:
+        model: ロード済みのTTSモデル
+        text: 合成するテキスト
+        speaker_wav: 話者のリファレンス音声ファイル
+        language: 言語コード ('ja', 'en', etc.)
+        speed: 話速
+        latent_cache: SpeakerLatentCache (Noneなら毎回リファレンス音声から計算)
+        sentence_gap: チャンク間の無音 (秒)
+
+    Returns:
+        Waveform: float32の波形 (一時ファイルは使わない)
+    """
+    waves = list(iter_coqui_chunks(model, text, speaker_wav, language, speed, latent_cache))
+    if not waves:
+        raise Exception("No text to synthesize")
+    return concat_waveforms(waves, sentence_gap)
+
+
+def run_voicevox(client, text, speaker_id, speed=1.0, volume=1.0, pitch=0.0, intonation=1.0):
+    """
+    VOICEVOXで音声合成
+
+    Args:
+        client: VoicevoxClient (コネクションを使い回すため呼び出し側で共有する)
+        text: 合成するテキスト
+        speaker_id: 話者 (スタイル) ID
+        speed, volume, pitch, intonation: 音声パラメータ
+
+    Returns:
+        bytes: WAVデータ
+    """
+    q = client.audio_query(text, speaker_id)
+    q['speedScale'] = speed
+    q['volumeScale'] = volume
+    q['pitchScale'] = pitch
+    q['intonationScale'] = intonation
+    return client.synthesis(q, speaker_id)
+
+
+def synthesize_pipeline(segments, synthesize, finalize, max_in_flight=4, post_workers=2, should_stop=None):
+    """
+    セグメントを並行して合成し、後処理・保存を別スレッドプールで重ねて実行
+
+    同時に処理中のセグメントはmax_in_flight件まで。結果は必ずセグメント順に返す。
+
+    Args:
+        segments: テキストセグメントのリスト
+        synthesize: 合成関数 synthesize(segment) -> bytes または Waveform
+        finalize: 後処理関数 finalize(index, segment, wav) -> 任意の結果
+        max_in_flight: 同時に処理するセグメント数 (Coqui TTSは1)
+        post_workers: 後処理・保存用のスレッド数
+        should_stop: Trueを返すと未着手のセグメントを破棄して終了する関数
+
+    Yields:
+        tuple: (index, segment, finalizeの戻り値)  indexは1始まり
+
+    Raises:
+        Exception: 合成・後処理で発生した例外 (そのセグメントの順番で送出)
+    """
+    max_in_flight = max(1, int(max_in_flight))
+    jobs = iter(enumerate(segments, 1))
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as synth_pool, \
+            ThreadPoolExecutor(max_workers=max(1, post_workers)) as post_pool:
+
+        def chain(index, segment):
+            result = Future()
+
+            def relay(future):
+                if future.cancelled():
+                    result.cancel()
+                elif future.exception() is not None:
+                    result.set_exception(future.exception())
+                else:
+                    result.set_result(future.result())
+
+            def on_synthesized(future):
+                if future.cancelled() or future.exception() is not None:
+                    relay(future)
+                    return
+                try:
+                    post_pool.submit(finalize, index, segment, future.result()).add_done_callback(relay)
+                except RuntimeError as e:  # 中断後にプールが閉じられた
+                    result.set_exception(e)
+
+            synth_pool.submit(synthesize, segment).add_done_callback(on_synthesized)
+            return result
+
+        def submit_next():
+            for index, segment in jobs:
+                pending.append((index, segment, chain(index, segment)))
+                return True
+            return False
+
+        try:
+            for _ in range(max_in_flight):
+                if not submit_next():
+                    break
+
+            while pending:
+                if should_stop and should_stop():
+                    break
+                index, segment, future = pending.popleft()
+                output = future.result()
+                submit_next()
+                yield index, segment, output
+        finally:
+            synth_pool.shutdown(wait=False, cancel_futures=True)
+            post_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def post_process_audio(wav, volume, pre, post, sample_rate=None, normalize=True):
+    """
+    音量調整と前後の無音追加 (NumPyで1つのバッファ上で処理)
+
+    Args:
+        wav: WAVデータ (bytes) またはWaveform
+        volume: 音量倍率
+        pre: 前の無音 (秒)
+        post: 後の無音 (秒)
+        sample_rate: 出力のサンプリングレート (Noneなら元のまま)
+        normalize: Waveformをピークで正規化するか (ストリーミングのチャンクではFalse)
+
+    Returns:
+        AudioBuffer: 処理済み音声
+    """
+    return AudioBuffer.from_source(wav, volume, pre, post, sample_rate=sample_rate, normalize=normalize)
+
+
+def export_audio(audio, path, ext):
+    """
+    音声をWAVまたはMP3で保存
+
+    Args:
+        audio: AudioBuffer
+        path: 保存先パス
+        ext: 'wav' または 'mp3'
+    """
+    audio.export(path, format=ext)
@@ -0,0 +1,244 @@
+"""
+voice_studio_cli.py
+
+ROGOAI Voice Studio のヘッドレスCLI (tkinter不要)
+
+フォルダ単位で音声合成 (TTS) と文字起こし (STT) を一括処理し、
+進捗を1行1件のJSONで標準出力に書き出す。
+
+使い方:
+    python -m voice_studio_cli stt <入力フォルダ> -o <出力フォルダ> --model base --workers 4
+    python -m voice_studio_cli tts <入力フォルダ> -o <出力フォルダ> --engine voicevox --speaker 3
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
+
+import tts_engine
+from synthesis_service import SynthesisRequest, SynthesisService
+from voicevox_client import VoicevoxClient
+
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.flac', '.ogg', '.mp4', '.mkv', '.avi'}
+
+_print_lock = threading.Lock()
+_json_stream = sys.stdout
+
+
+def emit(event, **fields):
+    """進捗イベントをJSON 1行で出力"""
+    record = {'event': event, 'time': round(time.time(), 3)}
+    record.update(fields)
+    with _print_lock:
+        print(json.dumps(record, ensure_ascii=False), file=_json_stream, flush=True)
+
+
+def run_stt(args):
+    """
+    フォルダ内の音声ファイルを一括文字起こし
+
+    Returns:
+        int: 終了コード
+    """
+    from whisper_engine import WhisperEngine, TranscriptionCache
+
+    input_dir = Path(args.input_dir)
+    output_dir = Path(args.output_dir or input_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    audio_files = sorted(p for p in input_dir.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+    if not audio_files:
+        emit('error', message=f"音声ファイルが見つかりません: {input_dir}")
+        return 1
+
+    cache = TranscriptionCache(args.cache_dir) if args.cache_dir else None
+    engine = WhisperEngine(model_size=args.model, device=args.device, cache=cache,
+                           mode=args.inference, batch_size=args.batch_size, profile=args.profile)
+
+    ext = "srt" if args.format == "srt" else "txt"
+    output_files = [output_dir / f"{audio_path.stem}.{ext}" for audio_path in audio_files]
+
+    emit('start', mode='stt', files=len(audio_files), workers=args.workers, inference=engine.mode)
+    # 各ファイルはセグメントごとに出力ファイルへ追記される (結果は書き込んだセグメント数)
+    results = engine.transcribe_many(
+        audio_files,
+        language=args.language,
+        output_format=args.format,
+        workers=args.workers,
+        progress_callback=lambda message: emit('progress', message=message),
+        output_paths=output_files
+    )
+
+    failed = 0
+    for audio_path, output_file, result in zip(audio_files, output_files, results):
+        if isinstance(result, Exception):
+            failed += 1
+            emit('file_error', file=str(audio_path), message=str(result))
+            continue
+        emit('file_done', file=str(audio_path), output=str(output_file), segments=result)
+
+    emit('done', mode='stt', succeeded=len(audio_files) - failed, failed=failed)
+    return 1 if failed else 0
+
+
+def run_tts(args):
+    """
+    フォルダ内のテキストファイルを一括音声合成
+
+    各ファイルを空行でセグメントに分割し、<ファイル名>_<連番>.<拡張子> で保存する。
+
+    Returns:
+        int: 終了コード
+    """
+    input_dir = Path(args.input_dir)
+    output_dir = Path(args.output_dir or input_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    txt_files = sorted(p for p in input_dir.glob("*.txt") if not p.name.endswith('_log.txt'))
+    if not txt_files:
+        emit('error', message=f"テキストファイルが見つかりません: {input_dir}")
+        return 1
+
+    tts_engine.setup_ffmpeg()
+
+    workers = args.workers
+    service = SynthesisService()
+    if args.engine == 'coqui':
+        if not args.speaker_wav:
+            emit('error', message="--speaker-wav を指定してください")
+            return 1
+        use_cuda = None if args.device == 'auto' else args.device == 'cuda'
+        emit('progress', message="Coqui TTSモデルをロード中...")
+        service.coqui_model = tts_engine.load_coqui_model(use_cuda=use_cuda)
+        service.latent_cache = tts_engine.SpeakerLatentCache()
+        workers = 1  # XTTSモデルはスレッド間で共有できないため逐次処理
+    else:
+        service.voicevox_client = VoicevoxClient(args.server_url, pool_size=max(workers, 1))
+
+    request = SynthesisRequest(
+        engine=args.engine, text='', speaker_id=args.speaker, speaker_wav=args.speaker_wav,
+        language=args.language, speed=args.speed, volume=args.volume, pitch=args.pitch,
+        intonation=args.intonation, pre_silence=args.pre_silence, post_silence=args.post_silence,
+        sentence_gap=args.sentence_gap, output_format=args.format, sample_rate=args.sample_rate
+    )
+
+    jobs = []
+    for txt_file in txt_files:
+        with open(txt_file, 'r', encoding='utf-8') as f:
+            segments = tts_engine.split_segments(f.read())
+        digits = max(3, len(str(len(segments))))
+        for index, segment in enumerate(segments, 1):
+            output_file = output_dir / f"{txt_file.stem}_{str(index).zfill(digits)}.{args.format}"
+            jobs.append((txt_file, index, segment, output_file))
+
+    def synthesize(job):
+        txt_file, index, segment, output_file = job
+        return service.synthesize_to_file(request.with_text(segment), output_file)
+
+    emit('start', mode='tts', engine=args.engine, files=len(txt_files),
+         segments=len(jobs), workers=workers)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(synthesize, job) for job in jobs]
+        for done, (job, future) in enumerate(zip(jobs, futures), 1):
+            txt_file, index = job[0], job[1]
+            try:
+                output_file = future.result()
+                emit('segment_done', file=str(txt_file), index=index, output=str(output_file),
+                     completed=done, total=len(jobs))
+            except Exception as e:
+                failed += 1
+                emit('segment_error', file=str(txt_file), index=index, message=str(e),
+                     completed=done, total=len(jobs))
+
+    emit('done', mode='tts', succeeded=len(jobs) - failed, failed=failed)
+    return 1 if failed else 0
+
+
+def positive_int(value):
+    """1以上の整数を受け付けるargparseの型"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上を指定してください: {value}")
+    return number
+
+
+def build_parser():
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(
+        prog="python -m voice_studio_cli",
+        description="ROGOAI Voice Studio のヘッドレス一括処理 (進捗はJSON Linesで出力)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    stt = subparsers.add_parser('stt', help="フォルダ内の音声ファイルを文字起こし")
+    stt.add_argument('input_dir', help="音声ファイルのフォルダ")
+    stt.add_argument('-o', '--output-dir', help="出力フォルダ (省略時は入力フォルダ)")
+    stt.add_argument('--model', default='base', choices=['base', 'medium', 'large-v3'])
+    stt.add_argument('--language', default='ja', help="言語コード (ja, en, ...)")
+    stt.add_argument('--format', default='text', choices=['text', 'srt'])
+    stt.add_argument('--device', default='auto', choices=['auto', 'cuda', 'cpu'])
+    stt.add_argument('--workers', type=positive_int, default=2, help="同時に処理するファイル数")
+    stt.add_argument('--inference', default='auto', choices=['sequential', 'batched', 'auto'],
+                     help="推論モード (auto: 長い音声だけバッチ推論)")
+    stt.add_argument('--batch-size', type=positive_int, default=8, help="バッチ推論のバッチサイズ")
+    stt.add_argument('--profile', default='balanced', choices=['fast', 'balanced', 'accurate'],
+                     help="デコードプロファイル (fast: 貪欲法で高速)")
+    stt.add_argument('--cache-dir', help="文字起こしキャッシュのフォルダ")
+    stt.set_defaults(func=run_stt)
+
+    tts = subparsers.add_parser('tts', help="フォルダ内のテキストファイルを音声合成")
+    tts.add_argument('input_dir', help="テキストファイル (.txt) のフォルダ")
+    tts.add_argument('-o', '--output-dir', help="出力フォルダ (省略時は入力フォルダ)")
+    tts.add_argument('--engine', default='voicevox', choices=['voicevox', 'coqui'])
+    tts.add_argument('--server-url', default=VoicevoxClient.DEFAULT_URL, help="VOICEVOXエンジンのURL")
+    tts.add_argument('--speaker', type=int, default=1, help="VOICEVOXの話者ID")
+    tts.add_argument('--speaker-wav', help="Coqui TTSのリファレンス音声")
+    tts.add_argument('--language', default='ja', help="Coqui TTSの言語コード")
+    tts.add_argument('--device', default='auto', choices=['auto', 'cuda', 'cpu'])
+    tts.add_argument('--speed', type=float, default=1.0)
+    tts.add_argument('--volume', type=float, default=1.0)
+    tts.add_argument('--pitch', type=float, default=0.0)
+    tts.add_argument('--intonation', type=float, default=1.0)
+    tts.add_argument('--pre-silence', type=float, default=0.1)
+    tts.add_argument('--post-silence', type=float, default=0.1)
+    tts.add_argument('--sentence-gap', type=float, default=0.3, help="Coqui TTSの文と文の間の無音 (秒)")
+    tts.add_argument('--format', default='wav', choices=['wav', 'mp3'])
+    tts.add_argument('--sample-rate', type=positive_int, help="出力のサンプリングレート (省略時はエンジンの出力のまま)")
+    tts.add_argument('--workers', type=positive_int, default=4, help="同時に合成するセグメント数 (VOICEVOXのみ)")
+    tts.set_defaults(func=run_tts)
+
+    return parser
+
+
+def main(argv=None):
+    global _json_stream
+    args = build_parser().parse_args(argv)
+    
+    # 標準出力はJSONイベント専用にし、エンジンのログは標準エラーへ回す
+    _json_stream = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.func(args)
+    except KeyboardInterrupt:
+        emit('error', message="中断されました")
+        return 130
+    except Exception as e:
+        emit('error', message=str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+voicevox_client.py
+
+VOICEVOXエンジン用のHTTPクライアント
+
+requests.Sessionでコネクションをプール・keep-aliveし、
+タイムアウトと指数バックオフ付きリトライをまとめて扱う。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from disk_lru import DiskLRU
+
+
+class AudioQueryCache:
+    """
+    audio_query結果のLRUキャッシュ (メモリ + 任意でディスク)
+
+    (テキスト, 話者ID, エンジンのバージョン) をキーに生のクエリJSONを保存する。
+    話速・音量などのスケールは取得後に上書きするため、スライダーを変えても
+    サーバーでアクセント解析をやり直さずに済む。
+    """
+
+    DEFAULT_MAX_ENTRIES = 512
+    DEFAULT_MAX_DISK_ENTRIES = 8192
+
+    def __init__(self, cache_dir=None, max_entries=None, max_disk_entries=None):
+        """
+        初期化
+
+        Args:
+            cache_dir: ディスクキャッシュの保存先 (Noneならメモリのみ)
+            max_entries: メモリに保持する最大件数
+            max_disk_entries: ディスクに保持する最大件数
+        """
+        self.max_entries = max_entries or self.DEFAULT_MAX_ENTRIES
+        self.max_disk_entries = max_disk_entries or self.DEFAULT_MAX_DISK_ENTRIES
+        self.disk = DiskLRU(cache_dir, '.json', max_entries=self.max_disk_entries,
+                            name='AudioQueryCache') if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, speaker_id, engine_version):
+        """
+        キャッシュキーを作成
+
+        Returns:
+            str: SHA-256のキー
+        """
+        raw = json.dumps([text, speaker_id, engine_version], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        キャッシュを取得
+
+        Args:
+            key: make_keyで作成したキー
+
+        Returns:
+            dict: クエリJSONのコピー (無ければNone)
+        """
+        with self._lock:
+            query = self._memory.get(key)
+            if query is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(query)
+
+        query = self._load(key)
+        with self._lock:
+            if query is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, query)
+        return copy.deepcopy(query)
+
+    def put(self, key, query):
+        """
+        キャッシュを保存
+
+        Args:
+            key: make_keyで作成したキー
+            query: audio_queryのJSON
+        """
+        query = copy.deepcopy(query)
+        with self._lock:
+            self._remember(key, query)
+        self._save(key, query)
+
+    def _remember(self, key, query):
+        """メモリに追加し、上限を超えたら最終利用が古いものを捨てる (ロック内で呼ぶ)"""
+        self._memory[key] = query
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        if not self.disk:
+            return None
+        return self.disk.get(key, decode=json.loads)
+
+    def _save(self, key, query):
+        if self.disk:
+            self.disk.put(key, json.dumps(query, ensure_ascii=False).encode('utf-8'))
+
+    def clear(self):
+        """キャッシュを全削除"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+    def stats(self):
+        """
+        キャッシュの統計を取得
+
+        Returns:
+            dict: ヒット数・ミス数・メモリ/ディスクのエントリ数
+        """
+        disk_entries = self.disk.stats()['entries'] if self.disk else 0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+            'disk_entries': disk_entries
+        }
+
+
+class VoicevoxClient:
+    """コネクションプール付きのVOICEVOXクライアント (スレッド間で共有可能)"""
+
+    DEFAULT_URL = "http://127.0.0.1:50021"
+
+    def __init__(self, server_url=DEFAULT_URL, timeout=(3.0, 60.0), retries=3,
+                 backoff_factor=0.3, pool_size=8, query_cache=None):
+        """
+        初期化
+
+        Args:
+            server_url: VOICEVOXエンジンのURL
+            timeout: (接続, 読み込み) のタイムアウト秒数
+            retries: 接続エラー・5xx応答時のリトライ回数
+            backoff_factor: リトライ間隔の係数 (0.3 → 0.3秒, 0.6秒, 1.2秒...)
+            pool_size: 同時に保持するコネクション数
+            query_cache: AudioQueryCache (Noneならキャッシュしない)
+        """
+        self.server_url = server_url.rstrip('/')
+        self.timeout = timeout
+        self.query_cache = query_cache
+        self._engine_version = None
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST'])
+        )
+        self.session = self._make_session(retry, pool_size)
+        # 接続確認用 (未起動時にリトライで待たされないようにする)
+        self._probe_session = self._make_session(Retry(total=0), 1)
+
+    def _make_session(self, retry, pool_size):
+        """リトライ設定とコネクションプールを持つSessionを作成"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _url(self, path):
+        return f"{self.server_url}{path}"
+
+    def version(self, timeout=2):
+        """
+        エンジンのバージョンを取得 (接続確認を兼ねる、リトライなし)
+
+        Args:
+            timeout: タイムアウト秒数
+
+        Returns:
+            str: バージョン文字列
+
+        Raises:
+            requests.RequestException: 接続できない場合
+        """
+        res = self._probe_session.get(self._url("/version"), timeout=timeout)
+        res.raise_for_status()
+        self._engine_version = res.json()
+        return self._engine_version
+
+    def is_available(self, timeout=1):
+        """エンジンに接続できればTrue"""
+        try:
+            self.version(timeout=timeout)
+            return True
+        except requests.RequestException:
+            return False
+
+    def speakers(self):
+        """
+        話者一覧を取得
+
+        Returns:
+            list: /speakers の応答 (話者ごとのstyles付き)
+        """
+        res = self.session.get(self._url("/speakers"), timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def initialize_speaker(self, speaker_id):
+        """
+        話者のモデルを事前に読み込ませる (初回の合成を速くする)
+
+        Args:
+            speaker_id: 話者 (スタイル) ID
+        """
+        res = self.session.post(
+            self._url("/initialize_speaker"),
+            params={'speaker': speaker_id, 'skip_reinit': 'true'},
+            timeout=self.timeout
+        )
+        res.raise_for_status()
+
+    def audio_query(self, text, speaker_id):
+        """
+        音声合成用クエリを作成 (query_cacheがあればキャッシュを使う)
+
+        Args:
+            text: 合成するテキスト
+            speaker_id: 話者 (スタイル) ID
+
+        Returns:
+            dict: audio_queryのJSON (呼び出し側で書き換えてよいコピー)
+        """
+        if self.query_cache is None:
+            return self._fetch_audio_query(text, speaker_id)
+
+        # エンジンが更新されると解析結果が変わりうるため、バージョンもキーに含める
+        engine_version = self._engine_version or self.version()
+        key = self.query_cache.make_key(text, speaker_id, engine_version)
+        query = self.query_cache.get(key)
+        if query is None:
+            query = self._fetch_audio_query(text, speaker_id)
+            self.query_cache.put(key, query)
+        return query
+
+    def _fetch_audio_query(self, text, speaker_id):
+        res = self.session.post(
+            self._url("/audio_query"),
+            params={'text': text, 'speaker': speaker_id},
+            timeout=self.timeout
+        )
+        res.raise_for_status()
+        return res.json()
+
+    def synthesis(self, query, speaker_id):
+        """
+        クエリから音声を合成
+
+        Args:
+            query: audio_queryのJSON
+            speaker_id: 話者 (スタイル) ID
+
+        Returns:
+            bytes: WAVデータ
+        """
+        res = self.session.post(
+            self._url("/synthesis"),
+            params={'speaker': speaker_id},
+            json=query,
+            timeout=self.timeout
+        )
+        res.raise_for_status()
+        return res.content
+
+    def close(self):
+        """コネクションを閉じる"""
+        self.session.close()
+        self._probe_session.close()
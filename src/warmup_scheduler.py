@@ -0,0 +1,164 @@
+"""
+warmup_scheduler.py
+
+使いそうなモデルのバックグラウンド・ウォームアップ
+
+config.json の engine_usage に残した最近の利用履歴から、次に使われそうなエンジン
+(Coqui TTS / Whisper / VOICEVOX) を予測し、優先度の高い順にバックグラウンドで
+ロードしてダミー推論まで済ませる。使っていないエンジンにはメモリを使わず、
+使うエンジンは最初のリクエストから速く応答できるようにする。
+
+Author: RogoAI
+Version: 1.0
+"""
+
+import threading
+import time
+
+
+USAGE_HISTORY = 50       # エンジンごとに保持する利用時刻の数
+HALF_LIFE_DAYS = 7.0     # 利用の重みが半分になる日数
+MIN_SCORE = 0.5          # これ未満のエンジンはウォームアップしない (1週間以内に1回使えば対象)
+
+
+def record_usage(usage, engine, now=None):
+    """
+    エンジンの利用を記録
+
+    Args:
+        usage: 利用履歴 (config['engine_usage']、エンジン名 -> UNIX時刻のリスト)
+        engine: エンジン名 ('coqui', 'voicevox', 'whisper')
+        now: 利用時刻 (省略時は現在)
+
+    Returns:
+        dict: 更新した利用履歴
+    """
+    stamps = usage.setdefault(engine, [])
+    stamps.append(round(now if now is not None else time.time()))
+    del stamps[:-USAGE_HISTORY]
+    return usage
+
+
+def usage_scores(usage, now=None):
+    """
+    エンジンごとの利用スコア (最近の利用ほど重い、指数減衰の合計)
+
+    Args:
+        usage: 利用履歴
+        now: 基準時刻 (省略時は現在)
+
+    Returns:
+        dict: エンジン名 -> スコア
+    """
+    now = now if now is not None else time.time()
+    half_life = HALF_LIFE_DAYS * 86400
+    return {
+        engine: sum(0.5 ** (max(now - stamp, 0) / half_life) for stamp in stamps)
+        for engine, stamps in usage.items()
+    }
+
+
+def predict_engines(usage, candidates, min_score=MIN_SCORE, now=None):
+    """
+    ウォームアップするエンジンを優先度順に予測
+
+    Args:
+        usage: 利用履歴
+        candidates: 対象にできるエンジン名 (インストール済みのもの)
+        min_score: これ未満のエンジンは除外
+        now: 基準時刻
+
+    Returns:
+        list: エンジン名 (スコアの高い順)
+    """
+    scores = usage_scores(usage, now)
+    ranked = sorted((engine for engine in candidates if scores.get(engine, 0) >= min_score),
+                    key=lambda engine: scores[engine], reverse=True)
+    return ranked
+
+
+class WarmupScheduler:
+    """
+    ウォームアップ処理を登録順に1つのバックグラウンドスレッドで実行する
+
+    各処理は cancel_event を受け取り、ロード後・ダミー推論前などの区切りで
+    キャンセルを確認する。ロードの途中では止められないため、キャンセルは
+    実行中の処理が区切りに達した時点で効く (ロード済みのモデルはそのまま使える)。
+    """
+
+    def __init__(self, progress_callback=None):
+        """
+        初期化
+
+        Args:
+            progress_callback: 状態の通知 callback(name, status)
+                status: 'loading' / 'ready' / 'failed' / 'cancelled' / 'done' (全体の終了、nameはNone)
+        """
+        self.progress_callback = progress_callback
+        self.tasks = []     # (name, func)
+        self.results = {}   # name -> 'ready' / 'failed' / 'cancelled'
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def add(self, name, func):
+        """
+        ウォームアップ処理を追加 (追加した順に実行する)
+
+        Args:
+            name: エンジン名
+            func: func(cancel_event) 失敗時は例外を送出する
+        """
+        self.tasks.append((name, func))
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """残りのウォームアップを中止"""
+        if not self._cancel.is_set():
+            self._cancel.set()
+            print("[WarmupScheduler] Cancel requested")
+
+    def start(self):
+        """バックグラウンドスレッドで開始"""
+        self._thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """
+        登録した処理を順に実行 (呼び出したスレッドで実行)
+
+        Returns:
+            dict: エンジン名 -> 結果
+        """
+        for name, func in self.tasks:
+            if self._cancel.is_set():
+                self.results[name] = 'cancelled'
+                continue
+
+            self._notify(name, 'loading')
+            started = time.perf_counter()
+            try:
+                func(self._cancel)
+                status = 'cancelled' if self._cancel.is_set() else 'ready'
+            except Exception as e:
+                print(f"[WarmupScheduler] {name} failed: {e}")
+                status = 'failed'
+            self.results[name] = status
+            print(f"[WarmupScheduler] {name}: {status} ({time.perf_counter() - started:.1f}s)")
+            self._notify(name, status)
+
+        self._notify(None, 'done')
+        return self.results
+
+    def _notify(self, name, status):
+        if self.progress_callback:
+            try:
+                self.progress_callback(name, status)
+            except Exception as e:
+                print(f"[WarmupScheduler] progress_callback failed: {e}")
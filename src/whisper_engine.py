@@ -3,19 +3,434 @@ whisper_engine.py
 
 faster-whisperを使った音声認識エンジン
 
+faster-whisper (CTranslate2) はモデルを初めてロードするときに読み込む。
+このモジュール自体のインポートは軽く、起動時間に影響しない。
+
 Author: RogoAI
 Version: 1.0
 """
 
-from faster_whisper import WhisperModel
-import torch
 from pathlib import Path
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import os
+import threading
+import time
 import warnings
 
+import numpy as np
+
+from disk_lru import DiskLRU
+from runtime_probe import timed_import, probe_cuda
+
 # FutureWarningを抑制
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 
+def _batched_pipeline_class():
+    """BatchedInferencePipelineを取得 (faster-whisper 1.1未満ならNone)"""
+    return getattr(timed_import('faster_whisper'), 'BatchedInferencePipeline', None)
+
+
+# 文字起こしセグメント (秒単位の開始・終了時刻とテキスト)
+TranscriptSegment = namedtuple('TranscriptSegment', ['start', 'end', 'text'])
+
+# Whisperが想定する入力のサンプリングレート
+WHISPER_SAMPLE_RATE = 16000
+# これ未満のサンプリングレートは音声認識に使えないものとして拒否する
+MIN_SAMPLE_RATE = 8000
+
+
+def prepare_audio(audio, sample_rate=None):
+    """
+    文字起こしの入力をfaster-whisperに渡せる形に揃える
+
+    パスはそのまま、ファイルライクオブジェクトは先頭から読み直せる形で、
+    NumPy配列は16kHzモノラルのfloat32に変換して返す
+    (すでにその形式なら配列をコピーしない)。
+
+    Args:
+        audio: 音声ファイルのパス (str or Path)、ファイルライクオブジェクト、
+               またはNumPy配列 ((サンプル数,) または (サンプル数, チャンネル数))
+        sample_rate: NumPy配列のサンプリングレート (省略時は16kHzとみなす)
+
+    Returns:
+        str, ファイルライクオブジェクト, または numpy.ndarray
+
+    Raises:
+        ValueError: サンプリングレートや配列の形式が不正な場合
+    """
+    if isinstance(audio, (str, Path)):
+        return str(audio)
+    if hasattr(audio, 'read'):
+        # キャッシュキーの計算後に読み直すため、シークできないストリームはメモリに読み込む
+        if not (hasattr(audio, 'seekable') and audio.seekable()):
+            audio = io.BytesIO(audio.read())
+        return audio
+
+    samples = np.asarray(audio)
+    if sample_rate is None:
+        sample_rate = WHISPER_SAMPLE_RATE
+    if isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, np.integer)) \
+            or sample_rate < MIN_SAMPLE_RATE:
+        raise ValueError(f"サンプリングレートが不正です: {sample_rate!r} "
+                         f"({MIN_SAMPLE_RATE}Hz以上の整数を指定してください)")
+    if samples.ndim not in (1, 2) or samples.size == 0:
+        raise ValueError(f"音声配列の形式が不正です: shape={samples.shape}")
+
+    # 整数PCMはフルスケールで-1.0〜1.0に変換
+    if samples.dtype.kind == 'i':
+        samples = samples.astype(np.float32) / float(1 << (8 * samples.dtype.itemsize - 1))
+    elif samples.dtype.kind == 'u':
+        full_scale = float(1 << (8 * samples.dtype.itemsize - 1))
+        samples = (samples.astype(np.float32) - full_scale) / full_scale
+    elif samples.dtype.kind == 'f':
+        samples = samples.astype(np.float32, copy=False)
+    else:
+        raise ValueError(f"音声配列の型に対応していません: {samples.dtype}")
+
+    # (サンプル数, チャンネル数) はモノラルにまとめる
+    if samples.ndim == 2:
+        samples = samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1, dtype=np.float32)
+
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        # 線形補間でリサンプリング
+        new_length = int(round(len(samples) * WHISPER_SAMPLE_RATE / sample_rate))
+        positions = np.arange(new_length, dtype=np.float64) * (sample_rate / WHISPER_SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+    return samples
+
+
+def describe_audio(audio):
+    """ログ・進捗表示用の入力の名前"""
+    if isinstance(audio, np.ndarray):
+        return f"<{len(audio) / WHISPER_SAMPLE_RATE:.1f}s audio>"
+    if hasattr(audio, 'read'):
+        return str(getattr(audio, 'name', '<stream>'))
+    return str(audio)
+
+
+class TranscriptionCache:
+    """
+    文字起こし結果のディスクキャッシュ
+
+    音声データのハッシュとモデル・言語・デコード設定からキーを作り、
+    生のセグメントをJSONで保存する。テキスト/SRTのどちらの出力にも
+    同じエントリを使える。合計サイズが上限を超えたら古いものから削除する。
+    """
+
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200MB
+
+    def __init__(self, cache_dir, max_bytes=None):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュ保存先フォルダ (例: user_data/transcription_cache)
+            max_bytes: キャッシュの合計サイズ上限 (バイト)
+        """
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        self.store = DiskLRU(cache_dir, '.json', max_bytes=self.max_bytes, name='TranscriptionCache')
+
+    def make_key(self, audio, **params):
+        """
+        キャッシュキーを作成
+
+        Args:
+            audio: 音声ファイルのパス、シーク可能なファイルライクオブジェクト、
+                   またはprepare_audio済みのNumPy配列
+            **params: モデル・言語・デコード設定など結果に影響するパラメータ
+
+        Returns:
+            str: SHA-256のキー
+        """
+        digest = hashlib.sha256()
+        if isinstance(audio, np.ndarray):
+            digest.update(np.ascontiguousarray(audio))
+        elif hasattr(audio, 'read'):
+            position = audio.tell()
+            for chunk in iter(lambda: audio.read(1024 * 1024), b''):
+                digest.update(chunk)
+            audio.seek(position)
+        else:
+            with open(audio, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        キャッシュを取得
+
+        Args:
+            key: make_keyで作成したキー
+
+        Returns:
+            dict: {'segments', 'language', 'language_probability'} (無ければNone)
+        """
+        data = self.store.get(key, decode=json.loads)
+        if data is None:
+            return None
+        data['segments'] = [TranscriptSegment(*seg) for seg in data['segments']]
+        return data
+
+    def put(self, key, segments, language=None, language_probability=None):
+        """
+        キャッシュを保存
+
+        Args:
+            key: make_keyで作成したキー
+            segments: TranscriptSegmentのリスト
+            language: 検出された言語
+            language_probability: 言語検出の確率
+        """
+        data = {
+            'segments': [list(seg) for seg in segments],
+            'language': language,
+            'language_probability': language_probability
+        }
+        self.store.put(key, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def clear(self):
+        """キャッシュを全削除"""
+        self.store.clear()
+
+    def stats(self):
+        """
+        キャッシュの統計を取得
+
+        Returns:
+            dict: ヒット数・ミス数・エントリ数・合計サイズ
+        """
+        return self.store.stats()
+
+
+class RTFHistory:
+    """
+    モデル・デバイスごとのRTF (処理時間 / 音声の長さ) の履歴
+
+    直近の実測値をJSONに保存し、処理開始前の所要時間の見積もりに使う。
+    """
+
+    MAX_ENTRIES = 20
+
+    def __init__(self, history_file):
+        """
+        初期化
+
+        Args:
+            history_file: 履歴の保存先JSONファイル
+        """
+        self.history_file = Path(history_file)
+        self._lock = threading.Lock()
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                self._history = json.load(f)
+        except (OSError, ValueError):
+            self._history = {}
+
+    def record(self, key, audio_seconds, elapsed_seconds):
+        """
+        実測値を記録
+
+        Args:
+            key: 'model/device/compute_type' 形式のキー
+            audio_seconds: 処理した音声の長さ (秒)
+            elapsed_seconds: 処理にかかった時間 (秒)
+        """
+        if audio_seconds <= 0:
+            return
+        with self._lock:
+            values = self._history.setdefault(key, [])
+            values.append(round(elapsed_seconds / audio_seconds, 4))
+            del values[:-self.MAX_ENTRIES]
+            try:
+                with open(self.history_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._history, f, indent=2)
+            except OSError as e:
+                print(f"[RTFHistory] Save failed: {e}")
+
+    def estimate_rtf(self, key):
+        """
+        直近の平均RTFを取得
+
+        Returns:
+            float: 平均RTF (履歴が無ければNone)
+        """
+        with self._lock:
+            values = self._history.get(key)
+            if not values:
+                return None
+            return sum(values) / len(values)
+
+    def estimate_seconds(self, key, audio_seconds):
+        """
+        音声の長さから処理時間を見積もる
+
+        Returns:
+            float: 推定処理秒数 (履歴が無ければNone)
+        """
+        rtf = self.estimate_rtf(key)
+        if rtf is None:
+            return None
+        return audio_seconds * rtf
+
+
+def probe_duration(audio_path):
+    """
+    デコードせずに音声・動画ファイルの長さを取得
+
+    Args:
+        audio_path: 音声ファイルのパス
+
+    Returns:
+        float: 長さ (秒)。取得できなければNone
+    """
+    try:
+        import av  # faster-whisperの依存パッケージ
+        with av.open(str(audio_path)) as container:
+            if container.duration:
+                return container.duration / av.time_base
+    except Exception:
+        pass
+    return None
+
+
+def format_duration(seconds):
+    """
+    秒数を "H:MM:SS" または "M:SS" 形式に変換
+
+    Args:
+        seconds: 秒数 (float)
+
+    Returns:
+        str: 整形した時間
+    """
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class WhisperModelPool:
+    """
+    プロセス全体で共有するWhisperModelのLRUプール
+
+    (model_size, device, compute_type) をキーにロード済みモデルを保持し、
+    メモリ予算を超えたら最も長く使われていないモデルから解放する。
+    """
+
+    DEFAULT_MEMORY_BUDGET_MB = 4096
+
+    def __init__(self, memory_budget_mb=None):
+        """
+        初期化
+
+        Args:
+            memory_budget_mb: 常駐させるモデルの合計メモリ上限 (MB)
+        """
+        self.memory_budget_mb = memory_budget_mb or self.DEFAULT_MEMORY_BUDGET_MB
+        self._models = OrderedDict()  # key -> (model, size_mb)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def acquire(self, model_size, device, compute_type, size_mb=0, **load_kwargs):
+        """
+        モデルを借り受ける (未ロードならロードしてプールに登録)
+
+        Args:
+            model_size: 'base', 'medium', 'large-v3'
+            device: 'cuda' または 'cpu'
+            compute_type: 'float16', 'int8' など
+            size_mb: モデルの推定メモリ使用量 (MB)
+            **load_kwargs: WhisperModelに渡す追加引数 (cpu_threads等)
+
+        Returns:
+            WhisperModel: ロード済みモデル
+        """
+        key = (model_size, device, compute_type) + tuple(sorted(load_kwargs.items()))
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                print(f"[WhisperModelPool] Reusing model: {key}")
+                return self._models[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # 同じモデルの二重ロードを防ぐ (別モデルのロードはブロックしない)
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+
+            print(f"[WhisperModelPool] Loading model: {key}")
+            model = timed_import('faster_whisper').WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                download_root=None,  # デフォルトキャッシュディレクトリを使用
+                **load_kwargs
+            )
+
+            with self._lock:
+                self._models[key] = (model, size_mb)
+                self._evict_locked(keep=key)
+                self._key_locks.pop(key, None)
+            return model
+
+    def _evict_locked(self, keep=None):
+        """メモリ予算を超えている間、LRU順にモデルを解放 (ロック取得済みで呼ぶ)"""
+        while self.total_size_mb() > self.memory_budget_mb and len(self._models) > 1:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            del self._models[oldest]
+            print(f"[WhisperModelPool] Evicted model: {oldest}")
+
+    def total_size_mb(self):
+        """常駐モデルの推定メモリ合計 (MB)"""
+        return sum(size_mb for _, size_mb in self._models.values())
+
+    def set_memory_budget(self, memory_budget_mb):
+        """メモリ予算を変更し、必要なら即座に解放する"""
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict_locked()
+
+    def release(self, model_size, device, compute_type, **load_kwargs):
+        """指定したモデルをプールから明示的に解放する"""
+        key = (model_size, device, compute_type) + tuple(sorted(load_kwargs.items()))
+        with self._lock:
+            if self._models.pop(key, None) is not None:
+                print(f"[WhisperModelPool] Released model: {key}")
+
+    def clear(self):
+        """全モデルを解放"""
+        with self._lock:
+            self._models.clear()
+
+    def loaded_keys(self):
+        """常駐モデルのキー一覧 (古い順)"""
+        with self._lock:
+            return list(self._models.keys())
+
+
+_model_pool = WhisperModelPool()
+
+
+def get_model_pool():
+    """プロセス共有のモデルプールを取得"""
+    return _model_pool
+
+
 class WhisperEngine:
     """faster-whisperを使った高速音声認識エンジン"""
     
@@ -61,35 +476,119 @@ class WhisperEngine:
         }
     }
     
-    def __init__(self, model_size='base', device='auto'):
+    # デコードプロファイル (速度と精度のトレードオフ、optionsはキャッシュキーにも使用)
+    DECODING_PROFILES = {
+        'fast': {
+            'description': '貪欲法・前文脈なし。内容をざっと確認したいとき向け',
+            'options': {
+                'vad_filter': True,
+                'word_timestamps': False,
+                'beam_size': 1,  # 貪欲法
+                'best_of': 1,
+                'temperature': 0.0,
+                'condition_on_previous_text': False  # 前のテキストを条件にしない (繰り返しも起きにくい)
+            }
+        },
+        'balanced': {
+            'description': '標準。ビームサーチで精度と速度のバランスが良い',
+            'options': {
+                'vad_filter': True,  # VAD (Voice Activity Detection) で無音部分を除去
+                'word_timestamps': False,  # 単語レベルのタイムスタンプは不要
+                'beam_size': 5,  # ビームサーチのサイズ
+                'best_of': 5,  # ベストN個から選択
+                'temperature': 0.0,  # 確定的な出力
+                'condition_on_previous_text': True  # 前のテキストを条件に含める
+            }
+        },
+        'accurate': {
+            'description': '高精度。認識に失敗した区間は温度を上げて再デコードする',
+            'options': {
+                'vad_filter': True,
+                'word_timestamps': False,
+                'beam_size': 5,
+                'best_of': 5,
+                'patience': 2.0,  # ビームサーチをより長く続ける
+                'temperature': [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],  # 失敗時のフォールバック
+                'condition_on_previous_text': True
+            }
+        }
+    }
+    DEFAULT_PROFILE = 'balanced'
+    
+    # 既定のデコード設定
+    DECODE_OPTIONS = DECODING_PROFILES[DEFAULT_PROFILE]['options']
+    
+    # 推論モード
+    INFERENCE_MODES = ['sequential', 'batched', 'auto']
+    DEFAULT_BATCH_SIZE = 8
+    # autoモードでバッチ推論に切り替える音声の長さ (秒)
+    BATCHED_MIN_SECONDS = 60
+    
+    def __init__(self, model_size='base', device='auto', pool=None, cache=None,
+                 rtf_history=None, mode='sequential', batch_size=None, profile=DEFAULT_PROFILE):
         """
         初期化
         
         Args:
             model_size: 'base', 'medium', 'large-v3'
             device: 'auto', 'cuda', 'cpu'
+            pool: モデルを借りるWhisperModelPool (省略時はプロセス共有プール)
+            cache: 結果を再利用するTranscriptionCache (省略時はキャッシュしない)
+            rtf_history: 処理速度を記録するRTFHistory (省略時は記録しない)
+            mode: 'sequential' (逐次デコード)、'batched' (BatchedInferencePipeline)、
+                  'auto' (BATCHED_MIN_SECONDS以上の音声だけバッチ推論)
+            batch_size: バッチ推論で同時にデコードするチャンク数
+            profile: デコードプロファイル ('fast', 'balanced', 'accurate')
         """
         if model_size not in self.AVAILABLE_MODELS:
             raise ValueError(f"Invalid model_size. Choose from {self.AVAILABLE_MODELS}")
+        if mode not in self.INFERENCE_MODES:
+            raise ValueError(f"Invalid mode. Choose from {self.INFERENCE_MODES}")
+        if profile not in self.DECODING_PROFILES:
+            raise ValueError(f"Invalid profile. Choose from {list(self.DECODING_PROFILES)}")
+        if mode != 'sequential' and _batched_pipeline_class() is None:
+            print("[WhisperEngine] BatchedInferencePipeline not available (faster-whisper >= 1.1 required), "
+                  "using sequential mode")
+            mode = 'sequential'
         
         self.model_size = model_size
         self.device = self._determine_device(device)
+        self.compute_type = 'float16' if self.device == 'cuda' else 'int8'  # GPU: float16 / CPU: int8
+        self.pool = pool or get_model_pool()
+        self.cache = cache
+        self.rtf_history = rtf_history
+        self.mode = mode
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.profile = profile
+        self.decode_options = self.DECODING_PROFILES[profile]['options']
         self.model = None
         
-        print(f"[WhisperEngine] Initialized with model='{model_size}', device='{self.device}'")
+        print(f"[WhisperEngine] Initialized with model='{model_size}', device='{self.device}', "
+              f"mode='{mode}', profile='{profile}'")
     
     def _determine_device(self, device):
-        """デバイスの自動判定"""
+        """デバイスの自動判定 (torchではなく、実際に推論するCTranslate2で確認)"""
         if device == 'auto':
-            cuda_available = torch.cuda.is_available()
+            cuda_available = timed_import('ctranslate2').get_cuda_device_count() > 0
             selected_device = 'cuda' if cuda_available else 'cpu'
             if cuda_available:
-                print(f"[WhisperEngine] CUDA available: {torch.cuda.get_device_name(0)}")
+                print(f"[WhisperEngine] CUDA available: {probe_cuda()[1] or 'GPU'}")
             else:
                 print("[WhisperEngine] CUDA not available, using CPU")
             return selected_device
         return device
     
+    def _batch_load_kwargs(self, workers):
+        """
+        並列バッチ用のWhisperModelのロード引数
+        
+        CPUの場合はコア数をワーカー数で割った cpu_threads を割り当てる。
+        """
+        load_kwargs = {'num_workers': workers}
+        if self.device == 'cpu':
+            load_kwargs['cpu_threads'] = max(1, (os.cpu_count() or 1) // workers)
+        return load_kwargs
+    
     def load_model(self, progress_callback=None):
         """
         モデルをロード (初回はダウンロード)
@@ -104,20 +603,14 @@ class WhisperEngine:
             progress_callback(f"モデル '{self.model_size}' をロード中...")
         
         try:
-            # compute_typeの決定
-            if self.device == 'cuda':
-                compute_type = 'float16'  # GPU: float16
-            else:
-                compute_type = 'int8'  # CPU: int8
+            print(f"[WhisperEngine] Loading model with compute_type='{self.compute_type}'")
             
-            print(f"[WhisperEngine] Loading model with compute_type='{compute_type}'")
-            
-            # モデルロード
-            self.model = WhisperModel(
+            # モデルロード (プールに常駐していれば再利用)
+            self.model = self.pool.acquire(
                 self.model_size,
-                device=self.device,
-                compute_type=compute_type,
-                download_root=None  # デフォルトキャッシュディレクトリを使用
+                self.device,
+                self.compute_type,
+                size_mb=self._estimate_model_memory_mb()
             )
             
             if progress_callback:
@@ -135,56 +628,210 @@ class WhisperEngine:
             
             return False
     
-    def transcribe(self, audio_path, language='ja', output_format='text', 
-                   progress_callback=None):
+    def warm_up(self, language='ja', progress_callback=None):
+        """
+        モデルをロードし、短い無音でダミー推論を1回行う
+        
+        初回の推論で発生する初期化 (CUDAカーネルの準備・バッファ確保・VADモデルの
+        読み込み) を先に済ませ、最初の文字起こしを速くする。
+        結果はキャッシュにもRTF履歴にも記録しない。
+        
+        Args:
+            language: 言語コード
+            progress_callback: 進捗通知用コールバック関数
+        
+        Returns:
+            bool: 成功したらTrue
+        """
+        if not self.model and not self.load_model(progress_callback):
+            return False
+        
+        started = time.perf_counter()
+        try:
+            silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+            options = dict(self.decode_options)
+            options['vad_filter'] = False  # 無音なのでVADを通すと推論されない
+            segments, _ = self.model.transcribe(silence, language=language, **options)
+            for _ in segments:
+                pass
+            
+            if self.decode_options.get('vad_filter'):
+                try:
+                    from faster_whisper.vad import get_speech_timestamps, VadOptions
+                    get_speech_timestamps(silence, VadOptions())
+                except ImportError:
+                    pass
+        except Exception as e:
+            print(f"[WhisperEngine] Warm-up failed: {e}")
+            return False
+        
+        print(f"[WhisperEngine] Warm-up done in {time.perf_counter() - started:.2f}s")
+        return True
+    
+    def transcribe(self, audio, language='ja', output_format='text', 
+                   progress_callback=None, segment_callback=None, sample_rate=None):
         """
-        音声ファイルを文字起こし
+        音声を文字起こし
+        
+        録音済みのPCMなどはWAVファイルに書き出さずにNumPy配列のまま渡せる。
         
         Args:
-            audio_path: 音声ファイルのパス (str or Path)
+            audio: 音声ファイルのパス (str or Path)、ファイルライクオブジェクト、
+                   またはNumPy配列 ((サンプル数,) または (サンプル数, チャンネル数))
             language: 言語コード ('ja', 'en', etc.)
             output_format: 'text' または 'srt'
             progress_callback: 進捗通知用コールバック関数
+            segment_callback: セグメントが確定するたびに呼ばれるコールバック関数
+            sample_rate: NumPy配列のサンプリングレート (16kHz以外はリサンプリング)
             
         Returns:
             str: 文字起こし結果
             
         Raises:
+            ValueError: NumPy配列のサンプリングレートや形式が不正な場合
             Exception: 処理に失敗した場合
         """
+        audio = prepare_audio(audio, sample_rate)
+        
         # モデルがロードされていない場合はロード
         if not self.model:
             success = self.load_model(progress_callback)
             if not success:
                 raise Exception("モデルのロードに失敗しました")
         
+        return self._transcribe_with(self.model, audio, language,
+                                     output_format, progress_callback, segment_callback)
+    
+    def transcribe_many(self, audios, language='ja', output_format='text',
+                        workers=2, progress_callback=None, segment_callback=None,
+                        sample_rate=None, output_paths=None):
+        """
+        複数の音声を並列で文字起こし
+        
+        workers が2以上なら、num_workers=workers (CPUでは cpu_threads=コア数/workers) の
+        モデルをバッチの間だけロードして全ワーカーで共有し、終了後にプールから解放する。
+        1ファイルの文字起こしやリアルタイム文字起こしが使う常駐モデル (全コアを使う) は
+        そのまま残る。workers が1なら常駐モデルで逐次処理する。
+        
+        Args:
+            audios: 音声ファイルのパス・ファイルライクオブジェクト・NumPy配列のリスト
+            language: 言語コード ('ja', 'en', etc.)
+            output_format: 'text' または 'srt'
+            workers: 同時に処理する数 (入力数を超える分は切り詰める)
+            progress_callback: 進捗通知用コールバック関数 (メッセージ先頭にファイル名が付く)
+            segment_callback: セグメントごとに (audio, segment) で呼ばれるコールバック関数
+            sample_rate: NumPy配列のサンプリングレート (全配列で共通)
+            output_paths: 入力ごとの出力ファイル (指定するとtranscribe_to_fileと同じく
+                          セグメントごとに追記し、結果は書き込んだセグメント数になる)
+            
+        Returns:
+            list: 入力順の文字起こし結果 (失敗した入力の位置にはExceptionが入る)
+        """
+        audios = list(audios)
+        output_paths = list(output_paths) if output_paths is not None else [None] * len(audios)
+        workers = max(1, min(workers, len(audios)))
+        
+        if workers == 1:
+            results = []
+            for audio, output_path in zip(audios, output_paths):
+                try:
+                    if output_path is not None:
+                        results.append(self.transcribe_to_file(
+                            audio, output_path, language, output_format,
+                            self._file_progress(audio, progress_callback),
+                            sample_rate, self._file_segments(audio, segment_callback)))
+                    else:
+                        results.append(self.transcribe(
+                            audio, language, output_format,
+                            self._file_progress(audio, progress_callback),
+                            self._file_segments(audio, segment_callback),
+                            sample_rate))
+                except Exception as e:
+                    results.append(e)
+            return results
+        
         if progress_callback:
-            progress_callback("文字起こし処理を開始...")
+            progress_callback(f"{len(audios)}ファイルを{workers}並列で処理します")
         
+        load_kwargs = self._batch_load_kwargs(workers)
         try:
-            audio_path = str(audio_path)
-            print(f"[WhisperEngine] Transcribing: {audio_path}")
-            print(f"[WhisperEngine] Language: {language}, Format: {output_format}")
-            
-            # 文字起こし実行
-            segments, info = self.model.transcribe(
-                audio_path,
-                language=language,
-                vad_filter=True,  # VAD (Voice Activity Detection) で無音部分を除去
-                word_timestamps=False,  # 単語レベルのタイムスタンプは不要
-                beam_size=5,  # ビームサーチのサイズ
-                best_of=5,  # ベストN個から選択
-                temperature=0.0,  # 確定的な出力
-                condition_on_previous_text=True  # 前のテキストを条件に含める
+            model = self.pool.acquire(
+                self.model_size,
+                self.device,
+                self.compute_type,
+                size_mb=self._estimate_model_memory_mb(),
+                **load_kwargs
             )
-            
-            # 検出された言語を表示
-            detected_lang = info.language
-            detected_prob = info.language_probability
-            print(f"[WhisperEngine] Detected language: {detected_lang} (probability: {detected_prob:.2f})")
-            
+        except Exception as e:
+            error_msg = f"モデルロードエラー: {str(e)}"
+            print(f"[WhisperEngine] {error_msg}")
             if progress_callback:
-                progress_callback(f"言語検出: {detected_lang} ({detected_prob*100:.1f}%)")
+                progress_callback(error_msg)
+            return [Exception(error_msg) for _ in audios]
+        
+        def run(audio, output_path):
+            if output_path is not None:
+                return self._transcribe_to_file_with(model, prepare_audio(audio, sample_rate), output_path,
+                                                     language, output_format,
+                                                     self._file_progress(audio, progress_callback),
+                                                     self._file_segments(audio, segment_callback),
+                                                     parallel=True)
+            return self._transcribe_with(model, prepare_audio(audio, sample_rate), language,
+                                         output_format, self._file_progress(audio, progress_callback),
+                                         self._file_segments(audio, segment_callback), parallel=True)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run, audio, output_path)
+                           for audio, output_path in zip(audios, output_paths)]
+                
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(e)
+        finally:
+            # バッチ用のモデルは常駐させない (1ファイル用の常駐モデルと二重に持ち続けない)
+            self.pool.release(self.model_size, self.device, self.compute_type, **load_kwargs)
+        
+        return results
+    
+    def _file_progress(self, audio, progress_callback):
+        """ファイル名付きで進捗を通知するコールバックを作成"""
+        if not progress_callback:
+            return None
+        name = Path(describe_audio(audio)).name
+        return lambda message: progress_callback(f"[{name}] {message}")
+    
+    def _file_segments(self, audio, segment_callback):
+        """入力付きでセグメントを通知するコールバックを作成"""
+        if not segment_callback:
+            return None
+        return lambda segment: segment_callback(audio, segment)
+    
+    def _transcribe_with(self, model, audio, language, output_format,
+                         progress_callback, segment_callback=None, parallel=False):
+        """
+        指定したモデルで1つの音声を文字起こし
+        
+        Args:
+            model: ロード済みのWhisperModel
+            audio: prepare_audio済みの入力
+            language: 言語コード
+            output_format: 'text' または 'srt'
+            progress_callback: 進捗通知用コールバック関数
+            segment_callback: セグメントごとに呼ばれるコールバック関数
+            parallel: 他のファイルと並列に処理中 (RTFを逐次処理とは別に記録する)
+            
+        Returns:
+            str: 文字起こし結果
+        """
+        try:
+            print(f"[WhisperEngine] Format: {output_format}")
+            segments = self._iter_segments_with(model, audio, language, progress_callback, parallel)
+            if segment_callback:
+                segments = self._notify_segments(segments, segment_callback)
             
             # 出力形式に応じて処理
             if output_format == 'srt':
@@ -204,6 +851,190 @@ class WhisperEngine:
             
             raise Exception(error_msg)
     
+    def iter_segments(self, audio, language='ja', progress_callback=None, sample_rate=None):
+        """
+        音声を文字起こしし、セグメントを生成された順に返す
+        
+        長時間の音声でも最初のセグメントからすぐに結果を扱え、
+        全体をメモリに溜め込まない。
+        
+        Args:
+            audio: 音声ファイルのパス、ファイルライクオブジェクト、またはNumPy配列
+            language: 言語コード ('ja', 'en', etc.)
+            progress_callback: 進捗通知用コールバック関数
+            sample_rate: NumPy配列のサンプリングレート
+            
+        Yields:
+            TranscriptSegment: 文字起こしセグメント
+            
+        Raises:
+            ValueError: NumPy配列のサンプリングレートや形式が不正な場合
+            Exception: モデルのロードに失敗した場合
+        """
+        audio = prepare_audio(audio, sample_rate)
+        if not self.model:
+            success = self.load_model(progress_callback)
+            if not success:
+                raise Exception("モデルのロードに失敗しました")
+        
+        yield from self._iter_segments_with(self.model, audio, language, progress_callback)
+    
+    def transcribe_to_file(self, audio, output_path, language='ja',
+                           output_format='text', progress_callback=None, sample_rate=None,
+                           segment_callback=None):
+        """
+        文字起こし結果をセグメントごとにファイルへ追記しながら保存
+        
+        Args:
+            audio: 音声ファイルのパス、ファイルライクオブジェクト、またはNumPy配列
+            output_path: 出力ファイルのパス
+            language: 言語コード ('ja', 'en', etc.)
+            output_format: 'text' または 'srt'
+            progress_callback: 進捗通知用コールバック関数
+            sample_rate: NumPy配列のサンプリングレート
+            segment_callback: セグメントが確定するたびに呼ばれるコールバック関数
+            
+        Returns:
+            int: 書き込んだセグメント数
+        """
+        audio = prepare_audio(audio, sample_rate)
+        if not self.model:
+            success = self.load_model(progress_callback)
+            if not success:
+                raise Exception("モデルのロードに失敗しました")
+        
+        return self._transcribe_to_file_with(self.model, audio, output_path, language,
+                                             output_format, progress_callback, segment_callback)
+    
+    def _transcribe_to_file_with(self, model, audio, output_path, language, output_format,
+                                 progress_callback, segment_callback=None, parallel=False):
+        """指定したモデルで1つの音声を文字起こしし、セグメントごとにファイルへ追記"""
+        segments = self._iter_segments_with(model, audio, language, progress_callback, parallel)
+        if segment_callback:
+            segments = self._notify_segments(segments, segment_callback)
+        
+        with SegmentWriter(output_path, output_format) as writer:
+            for segment in segments:
+                writer.write(segment)
+        
+        if progress_callback:
+            progress_callback(f"完了: {writer.count}セグメント処理")
+        return writer.count
+    
+    def _iter_segments_with(self, model, audio, language, progress_callback, parallel=False):
+        """
+        指定したモデルでセグメントを逐次生成 (キャッシュがあれば再利用)
+        
+        Args:
+            model: ロード済みのWhisperModel
+            audio: prepare_audio済みの入力 (パス、ファイルライクオブジェクト、16kHzの配列)
+            language: 言語コード
+            progress_callback: 進捗通知用コールバック関数
+            parallel: 他のファイルと並列に処理中 (モデルを共有して遅くなるため、
+                      RTFは見積もりに使う逐次処理の履歴とは別のキーに記録する)
+            
+        Yields:
+            TranscriptSegment: 文字起こしセグメント
+        """
+        if progress_callback:
+            progress_callback("文字起こし処理を開始...")
+        
+        mode = self._resolve_mode(audio)
+        options = self._decode_options(mode)
+        print(f"[WhisperEngine] Transcribing: {describe_audio(audio)}")
+        print(f"[WhisperEngine] Language: {language}, Mode: {mode}, Profile: {self.profile}")
+        
+        # キャッシュ確認 (同じ音声・設定なら出力形式に関係なく再利用)
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(
+                audio,
+                model_size=self.model_size,
+                compute_type=self.compute_type,
+                language=language,
+                **options
+            )
+            cached = self.cache.get(cache_key)
+            if cached:
+                print("[WhisperEngine] Cache hit")
+                if progress_callback:
+                    progress_callback("キャッシュから読み込みました")
+                self._report_language(cached['language'],
+                                      cached['language_probability'] or 0.0,
+                                      progress_callback)
+                yield from cached['segments']
+                return
+        
+        # 文字起こし実行
+        started = time.time()
+        if mode == 'batched':
+            if progress_callback:
+                progress_callback(f"バッチ推論 (batch_size={self.batch_size})")
+            pipeline = _batched_pipeline_class()(model=model)
+            segments, info = pipeline.transcribe(
+                audio,
+                language=language,
+                batch_size=self.batch_size,
+                **options
+            )
+        else:
+            segments, info = model.transcribe(
+                audio,
+                language=language,
+                **options
+            )
+        self._report_language(info.language, info.language_probability, progress_callback)
+        
+        duration = info.duration or 0.0
+        duration_after_vad = getattr(info, 'duration_after_vad', None)
+        if progress_callback and duration:
+            message = f"音声の長さ: {format_duration(duration)}"
+            if duration_after_vad is not None and duration_after_vad < duration:
+                message += f" (発話部分 {format_duration(duration_after_vad)})"
+            progress_callback(message)
+        
+        recorded = []
+        reported_step = 0
+        for segment in segments:
+            record = TranscriptSegment(segment.start, segment.end, segment.text)
+            if cache_key:
+                recorded.append(record)
+            
+            # 再生位置から進捗・RTF・残り時間を算出 (5%刻みで通知)
+            if progress_callback and duration and segment.end > 0:
+                percent = min(100.0, segment.end / duration * 100)
+                if int(percent // 5) > reported_step:
+                    reported_step = int(percent // 5)
+                    rtf = (time.time() - started) / segment.end
+                    eta = max(0.0, duration - segment.end) * rtf
+                    progress_callback(
+                        f"進捗: {percent:.0f}% (RTF {rtf:.2f}, 残り約{format_duration(eta)})")
+            
+            yield record
+        
+        elapsed = time.time() - started
+        if duration:
+            print(f"[WhisperEngine] {mode}/{self.profile} RTF: {elapsed / duration:.3f}")
+        if self.rtf_history and duration:
+            self.rtf_history.record(self._rtf_key(mode, parallel=parallel), duration, elapsed)
+        
+        # 最後まで処理できた場合のみキャッシュに保存
+        if cache_key:
+            self.cache.put(cache_key, recorded, info.language, info.language_probability)
+    
+    def _report_language(self, detected_lang, detected_prob, progress_callback):
+        """検出された言語を表示"""
+        print(f"[WhisperEngine] Detected language: {detected_lang} (probability: {detected_prob:.2f})")
+        
+        if progress_callback:
+            progress_callback(f"言語検出: {detected_lang} ({detected_prob*100:.1f}%)")
+    
+    def _notify_segments(self, segments, segment_callback):
+        """セグメントを通知しながらそのまま流す"""
+        for segment in segments:
+            segment_callback(segment)
+            yield segment
+    
     def _generate_text(self, segments, progress_callback):
         """
         テキスト形式で出力
@@ -223,9 +1054,6 @@ class WhisperEngine:
             if text:  # 空のセグメントは除外
                 result.append(text)
                 segment_count += 1
-                
-                if progress_callback and segment_count % 10 == 0:
-                    progress_callback(f"処理中: {segment_count}セグメント")
         
         if progress_callback:
             progress_callback(f"完了: {segment_count}セグメント処理")
@@ -261,16 +1089,14 @@ class WhisperEngine:
             result.append("")  # 空行
             
             segment_count += 1
-            
-            if progress_callback and segment_count % 10 == 0:
-                progress_callback(f"字幕生成中: {segment_count}セグメント")
         
         if progress_callback:
             progress_callback(f"完了: {segment_count}セグメント処理")
         
         return '\n'.join(result)
     
-    def _format_timestamp(self, seconds):
+    @staticmethod
+    def _format_timestamp(seconds):
         """
         秒数をSRT形式のタイムスタンプに変換
         
@@ -287,6 +1113,110 @@ class WhisperEngine:
         
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
     
+    def _decode_options(self, mode):
+        """
+        推論モードに応じたデコード設定
+        
+        バッチ推論はVADで区切った発話区間を独立にデコードするため、
+        前のテキストを条件にする設定を外す。
+        """
+        if mode == 'batched':
+            return {k: v for k, v in self.decode_options.items() if k != 'condition_on_previous_text'}
+        return self.decode_options
+    
+    def _rtf_key(self, mode='sequential', profile=None, parallel=False):
+        """RTF履歴のキー (モデル・デバイス・推論モード・デコードプロファイル・並列処理かどうかごと)"""
+        profile = profile or self.profile
+        key = f"{self.model_size}/{self.device}/{self.compute_type}"
+        if mode != 'sequential':
+            key += f"/{mode}"
+        if profile != self.DEFAULT_PROFILE:
+            key += f"/{profile}"
+        if parallel:
+            key += "/parallel"
+        return key
+    
+    def measured_rtf(self, profile=None, mode='sequential'):
+        """
+        プロファイルの実測RTF (処理時間 / 音声の長さ) を取得
+        
+        Returns:
+            float: 直近の平均RTF (履歴が無ければNone)
+        """
+        if not self.rtf_history:
+            return None
+        return self.rtf_history.estimate_rtf(self._rtf_key(mode, profile))
+    
+    def _resolve_mode(self, audio, duration=None):
+        """
+        入力に使う推論モードを決める
+        
+        Args:
+            audio: prepare_audio済みの入力
+            duration: 音声の長さ (秒、分かっていれば)
+            
+        Returns:
+            str: 'sequential' または 'batched'
+        """
+        if self.mode != 'auto':
+            return self.mode
+        if duration is None:
+            if isinstance(audio, np.ndarray):
+                duration = len(audio) / WHISPER_SAMPLE_RATE
+            elif isinstance(audio, str):
+                duration = probe_duration(audio)
+        # 長さが分からない場合は逐次デコード
+        return 'batched' if duration and duration >= self.BATCHED_MIN_SECONDS else 'sequential'
+    
+    def estimate_batch_seconds(self, audio_paths):
+        """
+        RTF履歴から複数ファイルの処理時間を見積もる (逐次処理時の目安)
+        
+        ファイルごとに使われる推論モードのRTFで見積もり、
+        履歴がまだ無ければ逐次デコード・既定プロファイルのRTFで代用する。
+        
+        Args:
+            audio_paths: 音声ファイルのパスのリスト
+            
+        Returns:
+            tuple: (推定処理秒数, 音声の合計秒数)。見積もれない場合の推定処理秒数はNone
+        """
+        durations = [probe_duration(audio_path) or 0.0 for audio_path in audio_paths]
+        total_audio = sum(durations)
+        
+        if not self.rtf_history or not total_audio:
+            return None, total_audio
+        
+        total_seconds = 0.0
+        for audio_path, duration in zip(audio_paths, durations):
+            mode = self._resolve_mode(str(audio_path), duration)
+            seconds = self.rtf_history.estimate_seconds(self._rtf_key(mode), duration)
+            if seconds is None:
+                seconds = self.rtf_history.estimate_seconds(
+                    self._rtf_key(profile=self.DEFAULT_PROFILE), duration)
+            if seconds is None:
+                return None, total_audio
+            total_seconds += seconds
+        return total_seconds, total_audio
+    
+    def _estimate_model_memory_mb(self):
+        """
+        MODEL_INFOのサイズ表記からモデルの常駐メモリを推定
+        
+        Returns:
+            int: 推定メモリ使用量 (MB)
+        """
+        size = self.MODEL_INFO.get(self.model_size, {}).get('size', '0MB')
+        size = size.lstrip('~').upper()
+        try:
+            if size.endswith('GB'):
+                return int(float(size[:-2]) * 1024)
+            if size.endswith('MB'):
+                return int(float(size[:-2]))
+        except ValueError:
+            pass
+        return 0
+    
     def get_model_info(self):
         """
         現在のモデル情報を取得
@@ -297,6 +1227,10 @@ class WhisperEngine:
         return {
             'model_size': self.model_size,
             'device': self.device,
+            'compute_type': self.compute_type,
+            'mode': self.mode,
+            'batch_size': self.batch_size,
+            'profile': self.profile,
             'loaded': self.model is not None,
             'details': self.MODEL_INFO.get(self.model_size, {})
         }
@@ -311,11 +1245,41 @@ class WhisperEngine:
         """
         return cls.MODEL_INFO
     
-    def unload_model(self):
-        """モデルをメモリから解放"""
+    @classmethod
+    def get_decoding_profiles(cls):
+        """
+        全デコードプロファイルを取得
+        
+        Returns:
+            dict: プロファイル名 -> {'description', 'options'}
+        """
+        return cls.DECODING_PROFILES
+    
+    def live_transcriber(self, language='ja', update_callback=None, **kwargs):
+        """
+        録音中のリアルタイム文字起こし用のLiveTranscriberを作成
+        
+        Args:
+            language: 言語コード
+            update_callback: 更新時に呼ばれる関数 callback(committed_text, partial_text)
+            **kwargs: LiveTranscriberのその他の設定
+            
+        Returns:
+            LiveTranscriber: start()で開始、feed()で音声を追加、stop()で確定
+        """
+        return LiveTranscriber(self, language, update_callback, **kwargs)
+    
+    def unload_model(self, evict=False):
+        """
+        モデルの参照を手放す
+        
+        Args:
+            evict: Trueならプールからも解放してメモリを空ける
+        """
         if self.model:
-            del self.model
             self.model = None
+            if evict:
+                self.pool.release(self.model_size, self.device, self.compute_type)
             print("[WhisperEngine] Model unloaded")
     
     def __del__(self):
@@ -323,6 +1287,283 @@ class WhisperEngine:
         self.unload_model()
 
 
+class SegmentWriter:
+    """
+    セグメントを1件ずつテキスト/SRT形式でファイルに追記するライター
+    
+    ブロックごとにflushするため、処理途中でもファイルを開いて確認できる。
+    """
+    
+    def __init__(self, output_path, output_format='text'):
+        """
+        初期化
+        
+        Args:
+            output_path: 出力ファイルのパス
+            output_format: 'text' または 'srt'
+        """
+        self.output_path = Path(output_path)
+        self.output_format = output_format
+        self.count = 0   # 書き込んだセグメント数
+        self.index = 0   # 受け取ったセグメント数 (SRTの番号は_generate_srtと同じく空のセグメントも数える)
+        self._file = None
+    
+    def __enter__(self):
+        self.open()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def open(self):
+        """出力ファイルを開く (既存の内容は上書き)"""
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+    
+    def write(self, segment):
+        """
+        セグメントを1件追記
+        
+        Args:
+            segment: start/end/textを持つセグメント
+            
+        Returns:
+            bool: 書き込んだらTrue (空のセグメントはFalse)
+        """
+        self.index += 1
+        text = segment.text.strip()
+        if not text:  # 空のセグメントは除外
+            return False
+        
+        self.count += 1
+        if self.output_format == 'srt':
+            start = WhisperEngine._format_timestamp(segment.start)
+            end = WhisperEngine._format_timestamp(segment.end)
+            block = f"{self.index}\n{start} --> {end}\n{text}\n\n"
+        else:
+            block = f"{text}\n"
+        
+        self._file.write(block)
+        self._file.flush()
+        return True
+    
+    def close(self):
+        """出力ファイルを閉じる"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class LiveTranscriber:
+    """
+    録音中の音声を逐次文字起こしする (ローリングウィンドウ + LocalAgreement)
+    
+    16kHz float32の音声をfeed()で受け取り、一定間隔で未確定部分のウィンドウを
+    文字起こしする。連続する2回の結果で一致した先頭の単語だけを確定し
+    (LocalAgreement)、残りは暫定テキストとして返す。新しい音声に発話が
+    無い間はデコードせず、それまでの暫定テキストを確定する。
+    """
+    
+    SAMPLE_RATE = WHISPER_SAMPLE_RATE
+    
+    def __init__(self, engine, language='ja', update_callback=None, step_seconds=1.0,
+                 trim_seconds=10.0, max_window_seconds=20.0):
+        """
+        初期化
+        
+        Args:
+            engine: WhisperEngine
+            language: 言語コード
+            update_callback: 更新時に呼ばれる関数 callback(committed_text, partial_text)
+                             (文字起こしスレッドから呼ばれる)
+            step_seconds: 文字起こしの間隔 (秒)
+            trim_seconds: ウィンドウがこれより長くなったら確定済み部分を切り捨てる (秒)
+            max_window_seconds: 確定が進まない場合でもウィンドウをこの長さに抑える (秒)
+        """
+        self.engine = engine
+        self.language = language
+        self.update_callback = update_callback
+        self.step_seconds = step_seconds
+        self.trim_seconds = trim_seconds
+        self.max_window_seconds = max_window_seconds
+        
+        self._window = np.zeros(0, dtype=np.float32)  # 未確定部分を含む音声
+        self._offset = 0.0          # ウィンドウ先頭の時刻 (秒)
+        self._unprocessed = 0       # 前回のデコード以降に追加されたサンプル数
+        self._incoming = []
+        self._committed = []        # 確定した単語
+        self._committed_end = 0.0   # 確定した最後の単語の終了時刻 (秒)
+        self._previous = []         # 前回の未確定の単語 (TranscriptSegment)
+        
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.error = None
+    
+    @property
+    def text(self):
+        """確定済みのテキスト"""
+        return "".join(self._committed).strip()
+    
+    @property
+    def partial_text(self):
+        """未確定のテキスト (確定済みテキストの後ろにそのまま続けられる形)"""
+        return "".join(w.text for w in self._previous).rstrip()
+    
+    def start(self):
+        """文字起こしスレッドを開始 (モデルのロードもスレッド内で行う)"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def feed(self, audio):
+        """
+        音声を追加 (録音スレッドから呼んでよい、ブロックしない)
+        
+        Args:
+            audio: 16kHzのfloat32音声 (モノラル)
+        """
+        if self.error:
+            return
+        with self._lock:
+            self._incoming.append(np.asarray(audio, dtype=np.float32).ravel())
+        self._wakeup.set()
+    
+    def stop(self):
+        """
+        録音終了後に残りを文字起こしして確定
+        
+        Returns:
+            str: 確定した全テキスト
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.error:
+            raise self.error
+        return self.text
+    
+    def _run(self):
+        try:
+            if not self.engine.model:
+                self.engine.load_model()
+            
+            step = int(self.step_seconds * self.SAMPLE_RATE)
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.step_seconds)
+                self._wakeup.clear()
+                self._take_incoming()
+                if self._unprocessed >= step:
+                    self._process()
+            
+            self._take_incoming()
+            self._process(final=True)
+        except Exception as e:
+            print(f"[LiveTranscriber] Error: {e}")
+            self.error = e
+    
+    def _take_incoming(self):
+        """受け取った音声をウィンドウに追加"""
+        with self._lock:
+            incoming, self._incoming = self._incoming, []
+        if incoming:
+            new_audio = np.concatenate(incoming)
+            self._window = np.concatenate((self._window, new_audio))
+            self._unprocessed += len(new_audio)
+    
+    def _process(self, final=False):
+        """ウィンドウを文字起こしし、一致した部分を確定"""
+        new_audio = self._window[len(self._window) - self._unprocessed:]
+        self._unprocessed = 0
+        if len(self._window) == 0:
+            return
+        window_end = self._offset + len(self._window) / self.SAMPLE_RATE
+        
+        if not final and not self._has_speech(new_audio):
+            # 発話の切れ目: 暫定テキストを確定し、無音部分は捨てる
+            if self._previous:
+                self._commit(self._previous)
+                self._previous = []
+                self._notify()
+            self._trim(window_end)
+            return
+        
+        words = [w for w in self._transcribe_window() if w.end > self._committed_end + 0.01]
+        
+        if final:
+            agreed = len(words)
+        else:
+            agreed = 0
+            for new, old in zip(words, self._previous):
+                if self._normalize(new.text) != self._normalize(old.text):
+                    break
+                agreed += 1
+            # 確定が進まないままウィンドウが長くなりすぎた場合は古い単語を確定
+            if self._offset + self.max_window_seconds < window_end:
+                limit = window_end - self.step_seconds * 2
+                while agreed < len(words) and words[agreed].end <= limit:
+                    agreed += 1
+        
+        self._commit(words[:agreed])
+        self._previous = words[agreed:]
+        self._notify()
+        
+        if window_end - self._offset > self.trim_seconds:
+            self._trim(self._committed_end)
+    
+    def _transcribe_window(self):
+        """
+        ウィンドウを文字起こし
+        
+        Returns:
+            list: 単語ごとのTranscriptSegment (時刻は録音開始からの秒)
+        """
+        options = dict(self.engine.decode_options)
+        options.update(
+            vad_filter=False,  # 発話の有無は_has_speechで判定済み
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=self.text[-200:] or None  # 確定済みの文脈を渡す
+        )
+        segments, _ = self.engine.model.transcribe(self._window, language=self.language, **options)
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                words.append(TranscriptSegment(self._offset + word.start, self._offset + word.end, word.word))
+        return words
+    
+    def _has_speech(self, audio):
+        """新しい音声に発話が含まれるか (Silero VAD、使えなければ音量で判定)"""
+        if len(audio) == 0:
+            return False
+        try:
+            from faster_whisper.vad import get_speech_timestamps, VadOptions
+            return bool(get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=300)))
+        except ImportError:
+            return float(np.sqrt(np.mean(np.square(audio)))) > 0.01
+    
+    def _commit(self, words):
+        if words:
+            self._committed.extend(w.text for w in words)
+            self._committed_end = words[-1].end
+    
+    def _trim(self, until):
+        """指定時刻より前の音声をウィンドウから捨てる"""
+        cut = int((until - self._offset) * self.SAMPLE_RATE)
+        if cut > 0:
+            self._window = self._window[cut:]
+            self._offset += cut / self.SAMPLE_RATE
+    
+    @staticmethod
+    def _normalize(word):
+        return word.strip().lower().strip(".,!?、。！？")
+    
+    def _notify(self):
+        if self.update_callback:
+            self.update_callback(self.text, self.partial_text)
+
+
 # テスト用
 if __name__ == "__main__":
     print("=== WhisperEngine Test ===")